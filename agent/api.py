@@ -2,39 +2,51 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
+import json
+import time
 import tempfile
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 
-from src.utils import read_pdf, compute_confidence
-from agent.templates import parser
-from agent.reasoning import create_compliance_agent
+from src.text_cache import pdf_text_cache
+from src.llm_registry import llm_registry
+from src.embedding_cache import query_embedding_cache
+from agent.verdict_cache import verdict_cache
+from agent.semantic_cache import semantic_cache
+from agent.registry import agent_registry
+from agent.readiness import readiness
+from agent.metrics import REQUEST_SECONDS, register_cache_metrics, render_metrics
+from agent.batch import run_agent_batch, BatchTooLargeError
+from agent.jobs import get_job_manager, SUCCEEDED, FAILED
+from agent.runner import run_agent, build_response, build_error_response, EmptyDocumentError, DOCUMENT_MODES
 
 
+llm_type = os.getenv("LLM_TYPE", "openai")
+model_name = os.getenv("MODEL_NAME", "gpt-4o")
+execution_mode = os.getenv("EXECUTION_MODE", "agent")
+
 app = Flask(__name__)
 
-def run_agent(agent_executor, query, pdf_path):
-    document_pages = read_pdf(pdf_path)
-    texts = [
-        page.extract_text()
-        for page in document_pages
-        if page.extract_text()
-    ]
+register_cache_metrics({
+    "pdf_text": pdf_text_cache.stats,
+    "query_embeddings": query_embedding_cache.stats,
+    "verdicts": verdict_cache.stats,
+    "semantic_verdicts": semantic_cache.stats,
+})
 
-    if not texts:
-        return jsonify({"error": "No text extracted from PDF"}), 400
 
-    full_text = "\n\n".join(texts)
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
 
-    response = agent_executor.invoke(
-        {
-            "query": query,
-            "chunk": full_text,
-        }
-    )
 
-    structured_response = parser.parse(response.get("output"))
-
-    return structured_response
+@app.after_request
+def record_request(response):
+    if "request_start" in g:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.labels(endpoint=endpoint, status=str(response.status_code)).observe(
+            time.perf_counter() - g.request_start
+        )
+    return response
 
 
 @app.route("/health", methods=["GET"])
@@ -42,6 +54,40 @@ def health():
     return jsonify({"status": "ok"}), 200
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness probe: 503 until the embedding model is loaded and the agent is built.
+    The first call starts the warm-up if the server did not.
+    """
+    if not readiness.ready:
+        readiness.start([(llm_type, model_name, execution_mode)])
+    return jsonify(readiness.status()), 200 if readiness.ready else 503
+
+
+@app.route("/agents", methods=["GET"])
+def agents():
+    return jsonify({"agents": agent_registry.stats(), "llms": llm_registry.stats()}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, mimetype=content_type)
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(
+        {
+            "pdf_text": pdf_text_cache.stats(),
+            "query_embeddings": query_embedding_cache.stats(),
+            "verdicts": verdict_cache.stats(),
+            "semantic_verdicts": semantic_cache.stats(),
+        }
+    ), 200
+
+
 @app.route("/compliance/check", methods=["POST"])
 def process():
     """
@@ -49,10 +95,11 @@ def process():
     - multipart/form-data:
         - file: PDF
         - query: string
+        - mode: optional, "select" or "map_reduce"
     """
 
     try:
-        agent_executor = create_compliance_agent(llm_type="openai", model_name="gpt-4o")
+        agent_executor = agent_registry.get(llm_type, model_name, execution_mode)
         if "file" not in request.files:
             return jsonify({"error": "PDF file is required"}), 400
 
@@ -62,43 +109,147 @@ def process():
         if not query:
             return jsonify({"error": "Query is required"}), 400
 
+        mode = request.form.get("mode")
+        if mode and mode not in DOCUMENT_MODES:
+            return jsonify({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}), 400
+
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
             pdf_file.save(tmp.name)
             pdf_path = tmp.name
 
-        structured_response = run_agent(agent_executor, query, pdf_path)
-        confidence_score = compute_confidence(structured_response)
-
-        return jsonify(
-            {
-                "verdict": structured_response.compliance_status,
-                "compliant_policies": structured_response.compliant_policies,
-                "violated_policies": structured_response.violated_policies,
-                "tools_used": structured_response.tools_used,
-                "similar_documents": structured_response.similar_documents,
-                "reasoning": structured_response.reasoning,
-                "confidence": confidence_score,
-            }
-        ), 200
+        structured_response = run_agent(agent_executor, query, pdf_path, document_mode=mode)
+
+        return jsonify(build_response(structured_response)), 200
+
+    except EmptyDocumentError as e:
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
-        return jsonify(
-            {
-                "verdict": "unknown",
-                "policies": [],
-                "tools_used": [],
-                "similar_documents": [],
-                "reasoning": "",
-                "confidence": 0.0,
-                "error": str(e),
-            }
-        ), 500
+        return jsonify(build_error_response(e)), 500
 
     finally:
         if "pdf_path" in locals() and os.path.exists(pdf_path):
             os.remove(pdf_path)
 
 
+@app.route("/compliance/check/batch", methods=["POST"])
+def process_batch():
+    """
+    Accepts:
+    - multipart/form-data:
+        - file: one or more PDFs
+        - query: one or more strings
+        - mode: optional, "select" or "map_reduce"
+
+    Returns one result per (file, query) in the /compliance/check response shape.
+    """
+
+    pdf_paths = []
+    try:
+        pdf_files = request.files.getlist("file")
+        queries = [query for query in request.form.getlist("query") if query]
+
+        if not pdf_files:
+            return jsonify({"error": "At least one PDF file is required"}), 400
+
+        if not queries:
+            return jsonify({"error": "At least one query is required"}), 400
+
+        mode = request.form.get("mode")
+        if mode and mode not in DOCUMENT_MODES:
+            return jsonify({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}), 400
+
+        agent_executor = agent_registry.get(llm_type, model_name, execution_mode)
+
+        documents = []
+        for pdf_file in pdf_files:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+                pdf_file.save(tmp.name)
+                pdf_paths.append(tmp.name)
+                documents.append((pdf_file.filename, tmp.name))
+
+        results = run_agent_batch(agent_executor, queries, documents, document_mode=mode)
+
+        return jsonify({"results": results}), 200
+
+    except BatchTooLargeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        return jsonify(build_error_response(e)), 500
+
+    finally:
+        for pdf_path in pdf_paths:
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+
+@app.route("/compliance/jobs", methods=["POST"])
+def submit_job():
+    """
+    Queue a compliance check and return immediately with its job ID.
+
+    Accepts the same multipart/form-data fields as /compliance/check.
+    """
+
+    pdf_path = None
+    try:
+        if "file" not in request.files:
+            return jsonify({"error": "PDF file is required"}), 400
+
+        pdf_file = request.files["file"]
+        query = request.form.get("query")
+
+        if not query:
+            return jsonify({"error": "Query is required"}), 400
+
+        mode = request.form.get("mode")
+        if mode and mode not in DOCUMENT_MODES:
+            return jsonify({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}), 400
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            pdf_path = tmp.name
+            pdf_file.save(pdf_path)
+
+        job = get_job_manager().submit(
+            pdf_path, query, document_name=pdf_file.filename, mode=mode,
+            llm_type=llm_type, model_name=model_name,
+        )
+
+        return jsonify({"job_id": job.id, "status": job.status}), 202
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        # A queued job has moved the upload away; anything left here was never queued
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+
+@app.route("/compliance/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(job.to_dict()), 200
+
+
+@app.route("/compliance/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job.status == SUCCEEDED:
+        return jsonify(json.loads(job.result)), 200
+
+    if job.status == FAILED:
+        return jsonify(build_error_response(job.error)), 500
+
+    return jsonify(job.to_dict()), 202
+
 
 if __name__ == "__main__":
+    readiness.start([(llm_type, model_name, execution_mode)])
     app.run(host="0.0.0.0", port=8000, debug=False)
@@ -0,0 +1,261 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+import json
+import time
+import asyncio
+import tempfile
+from typing import List
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, Response
+
+from src.qdrant_pool import qdrant_pool
+from src.text_cache import pdf_text_cache
+from src.llm_registry import llm_registry
+from src.embedding_cache import query_embedding_cache
+from agent.verdict_cache import verdict_cache
+from agent.semantic_cache import semantic_cache
+from agent.registry import agent_registry
+from agent.readiness import readiness
+from agent.metrics import REQUEST_SECONDS, register_cache_metrics, render_metrics
+from agent.batch import arun_agent_batch, BatchTooLargeError
+from agent.jobs import get_job_manager, SUCCEEDED, FAILED
+from agent.runner import arun_agent, build_response, build_error_response, EmptyDocumentError, DOCUMENT_MODES
+
+
+llm_type = os.getenv("LLM_TYPE", "openai")
+model_name = os.getenv("MODEL_NAME", "gpt-4o")
+execution_mode = os.getenv("EXECUTION_MODE", "agent")
+
+# Upper bound on concurrent agent runs per process. Requests are almost entirely
+# waiting on the LLM, so this can be far higher than the number of CPU cores.
+max_inflight = int(os.getenv("MAX_INFLIGHT_REQUESTS", "256"))
+inflight = asyncio.Semaphore(max_inflight)
+
+
+def save_upload(data: bytes):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(data)
+        return tmp.name
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models in the background so the server starts accepting connections immediately
+    readiness.start([(llm_type, model_name, execution_mode)])
+    yield
+    await qdrant_pool.aclose()
+    await llm_registry.http_pool.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+register_cache_metrics({
+    "pdf_text": pdf_text_cache.stats,
+    "query_embeddings": query_embedding_cache.stats,
+    "verdicts": verdict_cache.stats,
+    "semantic_verdicts": semantic_cache.stats,
+})
+
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(endpoint=route.path if route else "unmatched", status=str(response.status_code)).observe(
+        time.perf_counter() - start
+    )
+    return response
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    if not readiness.ready:
+        readiness.start([(llm_type, model_name, execution_mode)])
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/agents")
+async def agents():
+    return {"agents": agent_registry.stats(), "llms": llm_registry.stats()}
+
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "pdf_text": pdf_text_cache.stats(),
+        "query_embeddings": query_embedding_cache.stats(),
+        "verdicts": verdict_cache.stats(),
+        "semantic_verdicts": semantic_cache.stats(),
+    }
+
+
+@app.post("/compliance/check")
+async def process(file: UploadFile = File(None), query: str = Form(None), mode: str = Form(None)):
+    """
+    Accepts:
+    - multipart/form-data:
+        - file: PDF
+        - query: string
+        - mode: optional, "select" or "map_reduce"
+    """
+    if file is None:
+        return JSONResponse({"error": "PDF file is required"}, status_code=400)
+
+    if not query:
+        return JSONResponse({"error": "Query is required"}, status_code=400)
+
+    if mode and mode not in DOCUMENT_MODES:
+        return JSONResponse({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}, status_code=400)
+
+    pdf_path = None
+    try:
+        agent_executor = agent_registry.get(llm_type, model_name, execution_mode)
+
+        data = await file.read()
+        pdf_path = await asyncio.to_thread(save_upload, data)
+
+        async with inflight:
+            structured_response = await arun_agent(agent_executor, query, pdf_path, document_mode=mode)
+
+        return JSONResponse(build_response(structured_response), status_code=200)
+
+    except EmptyDocumentError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    except Exception as e:
+        return JSONResponse(build_error_response(e), status_code=500)
+
+    finally:
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+@app.post("/compliance/check/batch")
+async def process_batch(
+    file: List[UploadFile] = File(None),
+    query: List[str] = Form(None),
+    mode: str = Form(None),
+):
+    """
+    Accepts:
+    - multipart/form-data:
+        - file: one or more PDFs
+        - query: one or more strings
+        - mode: optional, "select" or "map_reduce"
+
+    Returns one result per (file, query) in the /compliance/check response shape.
+    """
+    queries = [q for q in (query or []) if q]
+
+    if not file:
+        return JSONResponse({"error": "At least one PDF file is required"}, status_code=400)
+
+    if not queries:
+        return JSONResponse({"error": "At least one query is required"}, status_code=400)
+
+    if mode and mode not in DOCUMENT_MODES:
+        return JSONResponse({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}, status_code=400)
+
+    pdf_paths = []
+    try:
+        agent_executor = agent_registry.get(llm_type, model_name, execution_mode)
+
+        documents = []
+        for upload in file:
+            pdf_path = await asyncio.to_thread(save_upload, await upload.read())
+            pdf_paths.append(pdf_path)
+            documents.append((upload.filename, pdf_path))
+
+        async with inflight:
+            results = await arun_agent_batch(agent_executor, queries, documents, document_mode=mode)
+
+        return JSONResponse({"results": results}, status_code=200)
+
+    except BatchTooLargeError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    except Exception as e:
+        return JSONResponse(build_error_response(e), status_code=500)
+
+    finally:
+        for pdf_path in pdf_paths:
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+
+@app.post("/compliance/jobs")
+async def submit_job(file: UploadFile = File(None), query: str = Form(None), mode: str = Form(None)):
+    """
+    Queue a compliance check and return immediately with its job ID.
+
+    Accepts the same multipart/form-data fields as /compliance/check.
+    """
+    if file is None:
+        return JSONResponse({"error": "PDF file is required"}, status_code=400)
+
+    if not query:
+        return JSONResponse({"error": "Query is required"}, status_code=400)
+
+    if mode and mode not in DOCUMENT_MODES:
+        return JSONResponse({"error": f"mode must be one of {list(DOCUMENT_MODES)}"}, status_code=400)
+
+    pdf_path = None
+    try:
+        pdf_path = await asyncio.to_thread(save_upload, await file.read())
+        job = await asyncio.to_thread(
+            get_job_manager().submit,
+            pdf_path, query, file.filename, mode, llm_type, model_name,
+        )
+
+        return JSONResponse({"job_id": job.id, "status": job.status}, status_code=202)
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+    finally:
+        # A queued job has moved the upload away; anything left here was never queued
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+
+@app.get("/compliance/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await asyncio.to_thread(get_job_manager().get, job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    return job.to_dict()
+
+
+@app.get("/compliance/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = await asyncio.to_thread(get_job_manager().get, job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    if job.status == SUCCEEDED:
+        return JSONResponse(json.loads(job.result), status_code=200)
+
+    if job.status == FAILED:
+        return JSONResponse(build_error_response(job.error), status_code=500)
+
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,144 @@
+import os
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.text_cache import file_sha256
+from agent.context import retrieve_policy_texts_batch, needs_selection
+from agent.runner import (
+    DOCUMENT_MODE,
+    load_document_pages,
+    cache_scope,
+    cached_verdict,
+    store_verdict,
+    evaluate_pages,
+    aevaluate_pages,
+    build_response,
+    build_error_response,
+)
+
+
+# Maximum documents x queries per batch request and LLM calls in flight per batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+class BatchTooLargeError(ValueError):
+    """
+    Raised when a batch request exceeds BATCH_MAX_ITEMS documents x queries.
+    """
+
+
+def _check_size(documents, queries):
+    if len(documents) * len(queries) > BATCH_MAX_ITEMS:
+        raise BatchTooLargeError(
+            f"Batch of {len(documents)} documents x {len(queries)} queries exceeds {BATCH_MAX_ITEMS} items"
+        )
+
+
+def _result(name, query, structured_response=None, error=None):
+    body = build_error_response(error) if error is not None else build_response(structured_response)
+    return {"document": name, "query": query, **body}
+
+
+def _load_documents(documents):
+    """
+    Extract every document once. Returns a (page texts, content hash, error) tuple per document.
+    """
+    loaded = []
+    for _, pdf_path in documents:
+        try:
+            loaded.append((load_document_pages(pdf_path), file_sha256(pdf_path), None))
+        except Exception as e:
+            loaded.append((None, None, e))
+    return loaded
+
+
+def _queries_needing_policies(loaded, queries, document_mode):
+    """
+    Policies are only used to select context from documents over the token budget.
+    """
+    if (document_mode or DOCUMENT_MODE) == "map_reduce":
+        return []
+    if not any(page_texts and needs_selection(page_texts) for page_texts, _, _ in loaded):
+        return []
+    return list(dict.fromkeys(queries))
+
+
+def run_agent_batch(agent_executor, queries, documents, document_mode: str = None, max_concurrency: int = None):
+    """
+    Evaluate every query against every document, sharing work across the batch.
+
+    Each document is extracted once and policies for all distinct queries are
+    retrieved in one batched call; pairs already in the verdict cache are answered from it and the remaining
+    agent calls run concurrently.
+
+    Args:
+        agent_executor: The compliance agent.
+        queries (list): Compliance questions.
+        documents (list): (name, pdf path) tuples.
+        document_mode (str, optional): "select" or "map_reduce".
+        max_concurrency (int, optional): Agent calls in flight (BATCH_CONCURRENCY).
+
+    Returns:
+        list: One /compliance/check-shaped result per (document, query), in input
+        order, each with "document" and "query" keys added.
+    """
+    _check_size(documents, queries)
+    loaded = _load_documents(documents)
+    unique_queries = _queries_needing_policies(loaded, queries, document_mode)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency or BATCH_CONCURRENCY) as executor:
+        policy_texts = retrieve_policy_texts_batch(unique_queries)
+
+        def evaluate(name, query, page_texts, content_hash, error):
+            if error is not None:
+                return _result(name, query, error=error)
+            try:
+                scope = cache_scope(agent_executor, content_hash, document_mode)
+                response = cached_verdict(scope, query)
+                if response is None:
+                    response = evaluate_pages(agent_executor, query, page_texts, document_mode, policy_texts.get(query))
+                    store_verdict(scope, query, response)
+                return _result(name, query, response)
+            except Exception as e:
+                return _result(name, query, error=e)
+
+        futures = [
+            executor.submit(contextvars.copy_context().run, evaluate, name, query, page_texts, content_hash, error)
+            for (name, _), (page_texts, content_hash, error) in zip(documents, loaded)
+            for query in queries
+        ]
+        return [future.result() for future in futures]
+
+
+async def arun_agent_batch(agent_executor, queries, documents, document_mode: str = None, max_concurrency: int = None):
+    """
+    Async counterpart of run_agent_batch.
+    """
+    _check_size(documents, queries)
+    loaded = await asyncio.to_thread(_load_documents, documents)
+    unique_queries = _queries_needing_policies(loaded, queries, document_mode)
+
+    policy_texts = await asyncio.to_thread(retrieve_policy_texts_batch, unique_queries)
+    semaphore = asyncio.Semaphore(max_concurrency or BATCH_CONCURRENCY)
+
+    async def evaluate(name, query, page_texts, content_hash, error):
+        if error is not None:
+            return _result(name, query, error=error)
+        try:
+            scope = await asyncio.to_thread(cache_scope, agent_executor, content_hash, document_mode)
+            response = await asyncio.to_thread(cached_verdict, scope, query)
+            if response is None:
+                async with semaphore:
+                    response = await aevaluate_pages(agent_executor, query, page_texts, document_mode, policy_texts.get(query))
+                await asyncio.to_thread(store_verdict, scope, query, response)
+            return _result(name, query, response)
+        except Exception as e:
+            return _result(name, query, error=e)
+
+    return await asyncio.gather(*(
+        evaluate(name, query, page_texts, content_hash, error)
+        for (name, _), (page_texts, content_hash, error) in zip(documents, loaded)
+        for query in queries
+    ))
@@ -0,0 +1,184 @@
+import os
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.logger import logging
+from src.embedding_cache import EmbeddingCache
+from agent.metrics import timed
+from agent.tools import (
+    embedding_model_name,
+    load_embedding_model,
+    embed_query,
+    find_matching_policies,
+    find_matching_policies_batch,
+)
+
+
+# Maximum number of document tokens sent to the LLM. Documents that fit are sent
+# whole; longer ones are reduced to their most relevant sections. 0 disables selection.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+
+# Weight of query similarity versus similarity to the retrieved policies
+QUERY_WEIGHT = float(os.getenv("CONTEXT_QUERY_WEIGHT", "0.6"))
+
+# Chunk embeddings are reused when the same document is checked with another query
+chunk_embedding_cache = EmbeddingCache(max_size=int(os.getenv("CHUNK_EMBEDDING_CACHE_SIZE", "20000")))
+
+splitter = RecursiveCharacterTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200,
+    separators=["\n\n", "\n", ".", " ", ""]
+)
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken's cl100k_base encoding, falling back to a
+    4-characters-per-token estimate when the encoding is unavailable.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text down to at most max_tokens tokens, as counted by count_tokens().
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max(max_tokens - 1, 0) * 4]
+
+
+def split_pages(page_texts):
+    """
+    Split page texts into chunks.
+
+    Returns:
+        list: (page index, chunk text) tuples in document order.
+    """
+    chunks = []
+    for page, text in enumerate(page_texts):
+        if text:
+            chunks.extend((page, chunk) for chunk in splitter.split_text(text))
+    return chunks
+
+
+def _normalize(matrix):
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def retrieve_policy_texts(query: str):
+    try:
+        return [point.payload.get("text", "") for point in find_matching_policies(query)]
+    except Exception as e:
+        logging.warning(f"Policy retrieval for context selection failed: {e}")
+        return []
+
+
+def retrieve_policy_texts_batch(queries):
+    """
+    Policy texts for several queries with one batched embedding and Qdrant call.
+
+    Returns:
+        dict: Query to list of policy texts.
+    """
+    queries = list(dict.fromkeys(queries))
+    try:
+        results = find_matching_policies_batch(queries)
+    except Exception as e:
+        logging.warning(f"Batched policy retrieval for context selection failed: {e}")
+        return {query: [] for query in queries}
+
+    return {
+        query: [point.payload.get("text", "") for point in points]
+        for query, points in zip(queries, results)
+    }
+
+
+def needs_selection(page_texts, token_budget: int = None) -> bool:
+    """
+    Whether a document exceeds the token budget and has to be reduced.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    full_text = "\n\n".join(text for text in page_texts if text)
+    return token_budget > 0 and count_tokens(full_text) > token_budget
+
+
+@timed("context_selection")
+def select_context(page_texts, query: str, policy_texts=None, token_budget: int = None):
+    """
+    Reduce a document to the sections most relevant to the query and to the matching policies.
+
+    Chunks are scored by cosine similarity to the query and to the retrieved policy
+    texts, the best ones are kept until the token budget is reached, and the kept
+    chunks are returned in document order labelled with their page numbers. If no
+    chunk fits, the top-scoring one is kept, truncated to the budget.
+
+    Args:
+        page_texts (list): Text of each page ("" for pages without text).
+        query (str): The compliance question.
+        policy_texts (list, optional): Policy texts to score against; retrieved when omitted.
+        token_budget (int, optional): Maximum document tokens (CONTEXT_TOKEN_BUDGET).
+
+    Returns:
+        str: The document context to place in the prompt.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+
+    if not needs_selection(page_texts, token_budget):
+        return "\n\n".join(text for text in page_texts if text)
+
+    chunks = split_pages(page_texts)
+    chunk_vectors = _normalize(
+        chunk_embedding_cache.encode(load_embedding_model(), [chunk for _, chunk in chunks], model_name=embedding_model_name)
+    )
+
+    scores = chunk_vectors @ _normalize(embed_query(query))[0]
+
+    if policy_texts is None:
+        policy_texts = retrieve_policy_texts(query)
+    policy_texts = [text for text in policy_texts if text]
+    if policy_texts:
+        policy_vectors = _normalize(
+            chunk_embedding_cache.encode(load_embedding_model(), policy_texts, model_name=embedding_model_name)
+        )
+        policy_scores = (chunk_vectors @ policy_vectors.T).max(axis=1)
+        scores = QUERY_WEIGHT * scores + (1 - QUERY_WEIGHT) * policy_scores
+
+    selected = []
+    used_tokens = 0
+    for i in np.argsort(-scores):
+        chunk_tokens = count_tokens(chunks[i][1])
+        if used_tokens + chunk_tokens > token_budget:
+            continue
+        selected.append(i)
+        used_tokens += chunk_tokens
+
+    if not selected:
+        best = int(np.argmax(scores))
+        page, text = chunks[best]
+        logging.info(f"No chunk fits the {token_budget}-token budget; truncating the most relevant one")
+        return f"[Page {page + 1}]\n{truncate_tokens(text, token_budget)}"
+
+    selected.sort()
+    logging.info(f"Selected {len(selected)}/{len(chunks)} chunks ({used_tokens} tokens) for the prompt")
+
+    return "\n\n".join(f"[Page {chunks[i][0] + 1}]\n{chunks[i][1]}" for i in selected)
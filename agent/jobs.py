@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from sqlalchemy import create_engine, event, inspect, text, update, String, Text, Float
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from src.logger import logging
+from agent.registry import get_compliance_agent
+from agent.runner import run_agent, build_response
+
+
+JOB_DB_URL = os.getenv("JOB_DB_URL", f"sqlite:///{os.path.join(os.getcwd(), 'jobs', 'jobs.db')}")
+JOB_FILES_DIR = os.getenv("JOB_FILES_DIR", os.path.join(os.getcwd(), "jobs", "files"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "threads")
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+# A running job's owner renews its lease every third of this; once it lapses the
+# owner is presumed dead and the job may be requeued by another process
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Job(Base):
+    __tablename__ = "compliance_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), index=True)
+    query: Mapped[str] = mapped_column(Text)
+    mode: Mapped[str] = mapped_column(String(16), nullable=True)
+    document_name: Mapped[str] = mapped_column(Text, nullable=True)
+    pdf_path: Mapped[str] = mapped_column(Text)
+    llm_type: Mapped[str] = mapped_column(String(32))
+    model_name: Mapped[str] = mapped_column(String(128))
+    result: Mapped[str] = mapped_column(Text, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[float] = mapped_column(Float, index=True)
+    started_at: Mapped[float] = mapped_column(Float, nullable=True)
+    finished_at: Mapped[float] = mapped_column(Float, nullable=True)
+    owner: Mapped[str] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[float] = mapped_column(Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "query": self.query,
+            "mode": self.mode,
+            "document": self.document_name,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+def worker_id() -> str:
+    """
+    Identity of the current process as a job owner.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobStore:
+    """
+    Persists job state in a local database (SQLite by default) so that status and
+    results survive restarts and are visible to every worker process.
+    """
+
+    def __init__(self, db_url: str = None):
+        self.db_url = db_url or JOB_DB_URL
+        if self.db_url.startswith("sqlite:///"):
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_url[len("sqlite:///"):])), exist_ok=True)
+
+        self.engine = create_engine(
+            self.db_url,
+            connect_args={"check_same_thread": False, "timeout": 30} if self.db_url.startswith("sqlite") else {},
+        )
+        if self.db_url.startswith("sqlite"):
+            event.listen(self.engine, "connect", self._enable_wal)
+
+        Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
+        self.Session = sessionmaker(self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _enable_wal(dbapi_connection, connection_record):
+        # WAL lets readers poll job state while workers write results
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    def _add_missing_columns(self):
+        # create_all() does not alter tables created by an earlier version
+        existing = {c["name"] for c in inspect(self.engine).get_columns(Job.__tablename__)}
+        with self.engine.begin() as connection:
+            for column in Job.__table__.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {Job.__tablename__} ADD COLUMN {column.name} {column_type}"))
+
+    def create(self, query, pdf_path, document_name, mode, llm_type, model_name):
+        job = Job(
+            id=str(uuid.uuid4()),
+            status=QUEUED,
+            query=query,
+            mode=mode,
+            document_name=document_name,
+            pdf_path=pdf_path,
+            llm_type=llm_type,
+            model_name=model_name,
+            created_at=time.time(),
+        )
+        with self.Session.begin() as session:
+            session.add(job)
+        return job
+
+    def get(self, job_id: str):
+        with self.Session() as session:
+            return session.get(Job, job_id)
+
+    def delete(self, job_id: str):
+        with self.Session.begin() as session:
+            session.query(Job).filter(Job.id == job_id).delete(synchronize_session=False)
+
+    def start(self, job_id: str, owner: str, lease_seconds: float = None):
+        """
+        Claim a queued job for `owner` and move it to running. The claim is a single
+        conditional UPDATE, so when several processes dispatch the same job only one
+        gets it; the others receive None.
+        """
+        lease_seconds = JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        now = time.time()
+        with self.Session.begin() as session:
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == QUEUED)
+                .values(status=RUNNING, started_at=now, owner=owner, lease_expires_at=now + lease_seconds)
+            ).rowcount
+        return self.get(job_id) if claimed == 1 else None
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float = None) -> bool:
+        """
+        Extend the lease of a running job. Returns False if `owner` no longer holds it.
+        """
+        lease_seconds = JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        with self.Session.begin() as session:
+            return session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == RUNNING, Job.owner == owner)
+                .values(lease_expires_at=time.time() + lease_seconds)
+            ).rowcount == 1
+
+    def finish(self, job_id: str, owner: str, result: dict = None, error: str = None) -> bool:
+        """
+        Record the outcome of a job. Ignored (returns False) when `owner` lost the
+        lease and the job was handed to another process in the meantime.
+        """
+        with self.Session.begin() as session:
+            return session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == RUNNING, Job.owner == owner)
+                .values(
+                    status=FAILED if error is not None else SUCCEEDED,
+                    result=json.dumps(result) if result is not None else None,
+                    error=error,
+                    finished_at=time.time(),
+                    lease_expires_at=None,
+                )
+            ).rowcount == 1
+
+    def requeue_interrupted(self):
+        """
+        Put running jobs whose lease has expired (their owner stopped or crashed)
+        back in the queue. Jobs held by live processes are left alone.
+
+        Returns:
+            list: IDs of all queued jobs, oldest first.
+        """
+        now = time.time()
+        with self.Session.begin() as session:
+            session.query(Job).filter(
+                Job.status == RUNNING,
+                (Job.lease_expires_at == None) | (Job.lease_expires_at < now),  # noqa: E711
+            ).update(
+                {"status": QUEUED, "started_at": None, "owner": None, "lease_expires_at": None},
+                synchronize_session=False,
+            )
+            return [job.id for job in session.query(Job).filter(Job.status == QUEUED).order_by(Job.created_at)]
+
+    def purge_expired(self, retention_seconds: float = None):
+        """
+        Delete finished jobs older than the retention window.
+        """
+        retention_seconds = JOB_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        cutoff = time.time() - retention_seconds
+        with self.Session.begin() as session:
+            return (
+                session.query(Job)
+                .filter(Job.status.in_([SUCCEEDED, FAILED]), Job.finished_at < cutoff)
+                .delete(synchronize_session=False)
+            )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store(db_url: str = None) -> JobStore:
+    db_url = db_url or JOB_DB_URL
+    with _stores_lock:
+        if db_url not in _stores:
+            _stores[db_url] = JobStore(db_url)
+        return _stores[db_url]
+
+
+def execute_job(db_url: str, job_id: str):
+    """
+    Run one job to completion. Runs in a worker thread or a worker process; in a
+    process the agent and the job store are built once and reused for later jobs.
+    """
+    store = get_job_store(db_url)
+    owner = worker_id()
+    job = store.start(job_id, owner)
+    if job is None:
+        return
+
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(JOB_LEASE_SECONDS / 3):
+            if not store.renew(job_id, owner):
+                logging.warning(f"Lost the lease on job {job_id}")
+                return
+
+    threading.Thread(target=heartbeat, daemon=True, name=f"job-lease-{job_id}").start()
+
+    finished = False
+    try:
+        agent_executor = get_compliance_agent(job.llm_type, job.model_name)
+        structured_response = run_agent(agent_executor, job.query, job.pdf_path, document_mode=job.mode)
+        finished = store.finish(job_id, owner, result=build_response(structured_response))
+
+    except Exception as e:
+        logging.error(f"Job {job_id} failed: {e}")
+        finished = store.finish(job_id, owner, error=str(e))
+
+    finally:
+        stop.set()
+        # A job whose lease was lost now belongs to another run, which still needs the file
+        if finished and job.pdf_path and os.path.exists(job.pdf_path):
+            os.remove(job.pdf_path)
+
+
+class JobManager:
+    """
+    Local job queue: uploads are stored under JOB_FILES_DIR, job state in the JobStore,
+    and jobs run on a pool of JOB_WORKERS threads or processes (JOB_WORKER_MODE).
+
+    Several processes may share one job database. On start-up a manager requeues
+    only jobs whose lease has expired and dispatches the queued ones; each job is
+    claimed atomically, so a job dispatched by two processes still runs once.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = None, worker_mode: str = None, files_dir: str = None):
+        self.store = store or get_job_store()
+        self.files_dir = files_dir or JOB_FILES_DIR
+        os.makedirs(self.files_dir, exist_ok=True)
+
+        workers = workers or JOB_WORKERS
+        worker_mode = worker_mode or JOB_WORKER_MODE
+        if worker_mode == "processes":
+            self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        elif worker_mode == "threads":
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compliance-job")
+        else:
+            raise ValueError(f"Unknown JOB_WORKER_MODE: {worker_mode}")
+
+        for job_id in self.store.requeue_interrupted():
+            self._dispatch(job_id)
+
+    def _dispatch(self, job_id: str):
+        self.executor.submit(execute_job, self.store.db_url, job_id)
+
+    def submit(self, pdf_path: str, query: str, document_name: str = None, mode: str = None,
+               llm_type: str = "openai", model_name: str = "gpt-4o"):
+        """
+        Queue a compliance check. The PDF is moved into the job files directory; if the
+        job cannot be queued, the moved file and any job row are removed again.
+
+        Returns:
+            Job: The queued job.
+        """
+        stored_path = os.path.join(self.files_dir, f"{uuid.uuid4()}.pdf")
+        job = None
+        try:
+            shutil.move(pdf_path, stored_path)
+            job = self.store.create(query, stored_path, document_name, mode, llm_type, model_name)
+            self._dispatch(job.id)
+        except Exception:
+            # No worker will run the job, so nothing else would ever delete its file
+            if job is not None:
+                self.store.delete(job.id)
+            if os.path.exists(stored_path):
+                os.remove(stored_path)
+            raise
+
+        self.store.purge_expired()
+
+        return job
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def result(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job.result is None:
+            return None
+        return json.loads(job.result)
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Process-wide job manager, started on first use.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
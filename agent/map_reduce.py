@@ -0,0 +1,141 @@
+import os
+import asyncio
+import contextvars
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logger import logging
+from agent.templates import parser, PolicyComplianceResponse
+from agent.context import count_tokens, splitter
+from agent.metrics import track_stage
+
+
+# Maximum document tokens per section and number of sections evaluated at once
+SECTION_TOKENS = int(os.getenv("MAP_REDUCE_SECTION_TOKENS", "6000"))
+MAX_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+
+
+def split_sections(page_texts, section_tokens: int = None):
+    """
+    Group consecutive pages into sections of at most `section_tokens` tokens.
+    Pages that are larger than a section on their own are split into chunks.
+
+    Returns:
+        list: (first page, last page, text) tuples with 1-based page numbers.
+    """
+    section_tokens = section_tokens or SECTION_TOKENS
+
+    pieces = []
+    for page, text in enumerate(page_texts, start=1):
+        if not text:
+            continue
+        if count_tokens(text) <= section_tokens:
+            pieces.append((page, text))
+        else:
+            pieces.extend((page, chunk) for chunk in splitter.split_text(text))
+
+    sections = []
+    current, current_tokens = [], 0
+    for page, text in pieces:
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > section_tokens:
+            sections.append(current)
+            current, current_tokens = [], 0
+        current.append((page, text))
+        current_tokens += tokens
+    if current:
+        sections.append(current)
+
+    return [
+        (section[0][0], section[-1][0], "\n\n".join(text for _, text in section))
+        for section in sections
+    ]
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def merge_responses(section_results):
+    """
+    Merge per-section verdicts into one PolicyComplianceResponse.
+
+    A policy violated in any section is violated for the document, and the document
+    is Non-Compliant if any section is. The merged lists follow the same rules as the
+    prompt: a Compliant verdict has no violated policies and vice versa.
+
+    Args:
+        section_results (list): ((first page, last page), PolicyComplianceResponse) tuples.
+    """
+    responses = [response for _, response in section_results]
+
+    violated = _unique(p for r in responses for p in r.violated_policies)
+    compliant = _unique(p for r in responses for p in r.compliant_policies if p not in violated)
+    statuses = [r.compliance_status for r in responses]
+
+    if violated or "Non-Compliant" in statuses:
+        status = "Non-Compliant"
+        compliant = []
+    elif statuses and all(s == "Compliant" for s in statuses):
+        status = "Compliant"
+    else:
+        status = Counter(statuses).most_common(1)[0][0] if statuses else "unknown"
+
+    reasoning = "\n\n".join(
+        f"Pages {first}-{last}: {response.reasoning}"
+        for (first, last), response in section_results
+    )
+
+    return PolicyComplianceResponse(
+        compliant_policies=compliant,
+        violated_policies=violated,
+        compliance_status=status,
+        reasoning=reasoning,
+        tools_used=_unique(t for r in responses for t in r.tools_used),
+        similar_documents=_unique(d for r in responses for d in r.similar_documents),
+    )
+
+
+def _evaluate_section(agent_executor, query, section):
+    with track_stage("agent"):
+        response = agent_executor.invoke({"query": query, "chunk": section[2]})
+    with track_stage("parsing"):
+        return parser.parse(response.get("output"))
+
+
+def run_map_reduce(agent_executor, query, page_texts, max_concurrency: int = None):
+    """
+    Evaluate each section of a large document concurrently and merge the verdicts.
+    """
+    sections = split_sections(page_texts)
+    logging.info(f"Map-reduce evaluation over {len(sections)} sections")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency or MAX_CONCURRENCY) as executor:
+        # Each section runs in a copy of the caller's context so context-scoped
+        # callbacks (e.g. track_usage) see its LLM calls
+        futures = [
+            executor.submit(contextvars.copy_context().run, _evaluate_section, agent_executor, query, s)
+            for s in sections
+        ]
+        responses = [future.result() for future in futures]
+
+    return merge_responses([((s[0], s[1]), r) for s, r in zip(sections, responses)])
+
+
+async def arun_map_reduce(agent_executor, query, page_texts, max_concurrency: int = None):
+    """
+    Async counterpart of run_map_reduce, bounded by a semaphore.
+    """
+    sections = await asyncio.to_thread(split_sections, page_texts)
+    semaphore = asyncio.Semaphore(max_concurrency or MAX_CONCURRENCY)
+
+    async def evaluate(section):
+        async with semaphore:
+            with track_stage("agent"):
+                response = await agent_executor.ainvoke({"query": query, "chunk": section[2]})
+        with track_stage("parsing"):
+            return parser.parse(response.get("output"))
+
+    responses = await asyncio.gather(*(evaluate(s) for s in sections))
+
+    return merge_responses([((s[0], s[1]), r) for s, r in zip(sections, responses)])
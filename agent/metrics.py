@@ -0,0 +1,257 @@
+import time
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+
+# Stages take from milliseconds (cache lookups, search) to minutes (map-reduce runs)
+_STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "compliance_stage_seconds",
+    "Time spent in each stage of a compliance check",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "compliance_request_seconds",
+    "End-to-end API request latency",
+    ["endpoint", "status"],
+    buckets=_STAGE_BUCKETS,
+)
+ERRORS = Counter(
+    "compliance_errors_total",
+    "Errors raised per stage, by exception type",
+    ["stage", "error_type"],
+)
+LLM_TOKENS = Counter(
+    "compliance_llm_tokens_total",
+    "Tokens reported by the LLM provider",
+    ["kind"],
+)
+LLM_CALLS = Counter(
+    "compliance_llm_calls_total",
+    "LLM calls (one per agent turn)",
+)
+TOOL_CALLS = Counter(
+    "compliance_tool_calls_total",
+    "Retrieval tool calls, by tool",
+    ["tool"],
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a block as `stage` and count any exception it raises by type.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.labels(stage=stage, error_type=type(e).__name__).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """
+    Decorator form of track_stage for functions and coroutines.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track_stage(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _token_usage(response):
+    """
+    (prompt tokens, completion tokens) from an LLMResult, whichever way the provider reports them.
+    """
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            info = generation.generation_info or {}
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+            elif "prompt_eval_count" in info:
+                # Ollama
+                prompt_tokens += info.get("prompt_eval_count") or 0
+                completion_tokens += info.get("eval_count") or 0
+
+    if not prompt_tokens and not completion_tokens:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens", 0)
+        completion_tokens = token_usage.get("completion_tokens", 0)
+
+    return prompt_tokens, completion_tokens
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback that times every LLM turn and counts tokens and tool calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+
+    def _start(self, run_id):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id):
+        with self._lock:
+            start = self._started.pop(run_id, None)
+        return None if start is None else time.perf_counter() - start
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        elapsed = self._elapsed(run_id)
+        if elapsed is not None:
+            STAGE_SECONDS.labels(stage="llm").observe(elapsed)
+        LLM_CALLS.inc()
+
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_TOKENS.labels(kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(kind="completion").inc(completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._elapsed(run_id)
+        ERRORS.labels(stage="llm", error_type=type(error).__name__).inc()
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        TOOL_CALLS.labels(tool=(serialized or {}).get("name", "unknown")).inc()
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        ERRORS.labels(stage="tool", error_type=type(error).__name__).inc()
+
+
+metrics_callback = MetricsCallbackHandler()
+
+# Handlers passed to a chain's constructor only see that chain's own run. As an
+# inheritable configure hook the handler is attached to every LangChain run in the
+# process, including the LLM and tool runs nested inside an AgentExecutor.
+_metrics_callback_var = ContextVar("compliance_metrics_callback", default=metrics_callback)
+register_configure_hook(_metrics_callback_var, inheritable=True)
+
+
+class UsageCounter(BaseCallbackHandler):
+    """
+    LLM calls and tokens of the runs made inside one track_usage() block.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def stats(self):
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+_usage_counter = ContextVar("compliance_usage_counter", default=None)
+register_configure_hook(_usage_counter, inheritable=True)
+
+
+@contextmanager
+def track_usage():
+    """
+    Count the LLM calls and tokens of every LangChain run started in this context
+    (thread or task), e.g. for per-case totals in evaluations.
+    """
+    counter = UsageCounter()
+    token = _usage_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _usage_counter.reset(token)
+
+
+class CacheStatsCollector:
+    """
+    Exposes the hit/miss counters the caches already keep, read at scrape time.
+
+    Args:
+        caches (dict): Cache name to a callable returning a stats() dict.
+    """
+
+    def __init__(self, caches: dict):
+        self.caches = caches
+
+    def collect(self):
+        lookups = CounterMetricFamily(
+            "compliance_cache_lookups", "Cache lookups by cache and result", labels=["cache", "result"]
+        )
+        entries = GaugeMetricFamily("compliance_cache_entries", "Entries held by each cache", labels=["cache"])
+
+        for name, stats_fn in self.caches.items():
+            stats = stats_fn()
+            for result in ("hits", "disk_hits", "misses"):
+                if result in stats:
+                    lookups.add_metric([name, result], stats[result])
+            if "entries" in stats:
+                entries.add_metric([name], stats["entries"])
+
+        yield lookups
+        yield entries
+
+
+_collector_lock = threading.Lock()
+_collector_registered = False
+
+
+def register_cache_metrics(caches: dict):
+    """
+    Register the cache collector once per process.
+    """
+    global _collector_registered
+    with _collector_lock:
+        if not _collector_registered:
+            REGISTRY.register(CacheStatsCollector(caches))
+            _collector_registered = True
+
+
+def render_metrics():
+    """
+    Returns:
+        tuple: (body, content type) for a /metrics response.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
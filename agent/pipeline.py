@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logger import logging
+from agent.templates import pipeline_prompt
+from agent.metrics import track_stage, TOOL_CALLS
+from agent.tools import (
+    find_matching_policies,
+    afind_matching_policies,
+    find_similar_documents,
+    afind_similar_documents,
+)
+
+
+# Payload fields added at ingestion time that carry no meaning for the model
+_INTERNAL_METADATA = {"collection_version", "active"}
+
+
+def format_points(points) -> str:
+    """
+    Render retrieved Qdrant points as a numbered list for the prompt.
+    """
+    if not points:
+        return "None found."
+
+    lines = []
+    for i, point in enumerate(points, start=1):
+        payload = point.payload or {}
+        metadata = {
+            k: v for k, v in (payload.get("metadata") or {}).items()
+            if k not in _INTERNAL_METADATA
+        }
+        details = ", ".join(f"{k}={v}" for k, v in metadata.items())
+        lines.append(f"{i}. {payload.get('text', '')}" + (f" ({details})" if details else ""))
+    return "\n".join(lines)
+
+
+def _output(message) -> str:
+    return getattr(message, "content", message)
+
+
+class CompliancePipeline:
+    """
+    Fixed retrieve-then-answer execution of a compliance check.
+
+    Matching policies and similar documents are retrieved concurrently up front and
+    placed in the prompt, and the LLM is called exactly once. It exposes the same
+    invoke/ainvoke interface as the tool-calling AgentExecutor, returning
+    {"output": <model text>}, so it can be used anywhere the agent is.
+    """
+
+    def __init__(self, llm, prompt=pipeline_prompt):
+        self.llm = llm
+        self.prompt = prompt
+        self.chain = prompt | llm
+
+    @staticmethod
+    def _count_retrievals():
+        TOOL_CALLS.labels(tool="find_matching_policies").inc()
+        TOOL_CALLS.labels(tool="find_similar_documents").inc()
+
+    def retrieve(self, query: str):
+        """
+        Returns:
+            tuple: (matching policies, similar documents) for the query.
+        """
+        self._count_retrievals()
+        with track_stage("retrieval"), ThreadPoolExecutor(max_workers=2) as executor:
+            policies = executor.submit(find_matching_policies, query)
+            similar = executor.submit(find_similar_documents, query)
+            return policies.result(), similar.result()
+
+    async def aretrieve(self, query: str):
+        self._count_retrievals()
+        with track_stage("retrieval"):
+            return await asyncio.gather(afind_matching_policies(query), afind_similar_documents(query))
+
+    def _inputs(self, inputs, policies, similar):
+        return {
+            "query": inputs["query"],
+            "chunk": inputs["chunk"],
+            "policies": format_points(policies),
+            "similar_documents": format_points(similar),
+        }
+
+    def invoke(self, inputs: dict, config=None):
+        policies, similar = self.retrieve(inputs["query"])
+        logging.info(f"Pipeline retrieved {len(policies)} policies and {len(similar)} similar documents")
+        message = self.chain.invoke(self._inputs(inputs, policies, similar), config=config)
+        return {"output": _output(message)}
+
+    async def ainvoke(self, inputs: dict, config=None):
+        policies, similar = await self.aretrieve(inputs["query"])
+        logging.info(f"Pipeline retrieved {len(policies)} policies and {len(similar)} similar documents")
+        message = await self.chain.ainvoke(self._inputs(inputs, policies, similar), config=config)
+        return {"output": _output(message)}
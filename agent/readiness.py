@@ -0,0 +1,74 @@
+import time
+import threading
+
+from src.logger import logging
+
+
+class Readiness:
+    """
+    Start-up warm-up and readiness state for the API processes.
+
+    Heavy dependencies (torch, the embedding model, LLM clients) are loaded lazily,
+    so the server can accept connections straight away. warm_up() loads them ahead
+    of the first request, and /ready reports ready only once it has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = False
+        self._error = None
+        self._steps = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _step(self, name: str, func):
+        start = time.perf_counter()
+        func()
+        self._steps[name] = round(time.perf_counter() - start, 4)
+        logging.info(f"Warm-up step {name} took {self._steps[name]:.3f}s")
+
+    def warm_up(self, agent_configs):
+        """
+        Load the embedding model and build the agents for `agent_configs`
+        (tuples as accepted by AgentRegistry.warm_up).
+        """
+        from agent.tools import load_embedding_model, embed_query
+        from agent.registry import agent_registry
+
+        try:
+            self._step("embedding_model", load_embedding_model)
+            # The first encode initializes kernels and tokenizer state
+            self._step("embedding_inference", lambda: embed_query("warm-up"))
+            self._step("agents", lambda: agent_registry.warm_up(agent_configs))
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+            logging.error(f"Warm-up failed: {self._error}")
+            return
+
+        self._error = None
+        self._ready = True
+        logging.info("Warm-up complete, ready to serve")
+
+    def start(self, agent_configs):
+        """
+        Run warm_up() in a background thread unless it is already running or done.
+        """
+        with self._lock:
+            if self._ready or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self.warm_up, args=(agent_configs,), daemon=True)
+            self._thread.start()
+
+    def status(self):
+        return {
+            "ready": self._ready,
+            "warming_up": self._thread is not None and self._thread.is_alive(),
+            "steps": dict(self._steps),
+            "error": self._error,
+        }
+
+
+readiness = Readiness()
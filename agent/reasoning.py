@@ -1,16 +1,29 @@
+import os
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 
 from src.utils import get_llm
 from agent.templates import system_prompt
 from agent.tools import chunk_embedding_tool, matching_policy_tool, similar_document_tool
+from agent.pipeline import CompliancePipeline
 
 
+# "agent" lets the LLM decide when to call the retrieval tools; "pipeline" retrieves
+# up front and makes a single LLM call.
+EXECUTION_MODES = ("agent", "pipeline")
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "agent")
 
-def create_compliance_agent(llm_type="openai", model_name="gpt-4o"):
+
+def create_compliance_agent(llm_type="openai", model_name="gpt-4o", execution_mode=None):
     """
     Create a policy-compliant agent
     Returns a callable agent object with .invoke() method.
     """
+    execution_mode = execution_mode or EXECUTION_MODE
+    if execution_mode == "pipeline":
+        return create_compliance_pipeline(llm_type, model_name)
+    if execution_mode != "agent":
+        raise ValueError(f"Unknown execution mode: {execution_mode}")
+
     # Create the LLM
     llm = get_llm(llm_type, model_name=model_name)
 
@@ -26,3 +39,13 @@ def create_compliance_agent(llm_type="openai", model_name="gpt-4o"):
     )
 
     return agent_executor
+
+
+def create_compliance_pipeline(llm_type="openai", model_name="gpt-4o"):
+    """
+    Create the single-LLM-call compliance pipeline. It has the same .invoke() and
+    .ainvoke() interface as the agent.
+    """
+    llm = get_llm(llm_type, model_name=model_name)
+
+    return CompliancePipeline(llm)
@@ -0,0 +1,99 @@
+import time
+import threading
+
+from src.logger import logging
+from agent.reasoning import create_compliance_agent, EXECUTION_MODE
+
+
+class AgentRegistry:
+    """
+    Process-wide, thread-safe cache of compliance agents keyed by (llm_type, model_name, execution_mode).
+
+    Building an agent creates the LLM client, the tool-calling agent and the
+    AgentExecutor, so it is done once per key and the executor is shared by all requests.
+    """
+
+    def __init__(self, factory=create_compliance_agent):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._agents = {}
+        self._stats = {}
+
+    def get(self, llm_type: str = "openai", model_name: str = "gpt-4o", execution_mode: str = None):
+        """
+        Return the agent for (llm_type, model_name, execution_mode), building it on first use.
+
+        Args:
+            llm_type (str): The type of language model ("openai" or "ollama").
+            model_name (str): The name of the model to use.
+            execution_mode (str, optional): "agent" or "pipeline" (EXECUTION_MODE).
+
+        Returns:
+            AgentExecutor: The shared agent executor, or a CompliancePipeline in pipeline mode.
+        """
+        execution_mode = execution_mode or EXECUTION_MODE
+        key = (llm_type, model_name, execution_mode)
+
+        with self._lock:
+            agent_executor = self._agents.get(key)
+            if agent_executor is None:
+                start = time.perf_counter()
+                agent_executor = self._factory(llm_type=llm_type, model_name=model_name, execution_mode=execution_mode)
+                build_seconds = time.perf_counter() - start
+
+                self._agents[key] = agent_executor
+                self._stats[key] = {
+                    "llm_type": llm_type,
+                    "model_name": model_name,
+                    "execution_mode": execution_mode,
+                    "build_seconds": round(build_seconds, 4),
+                    "built_at": time.time(),
+                    "hits": 0,
+                }
+                logging.info(f"Built compliance agent {key} in {build_seconds:.3f}s")
+            else:
+                self._stats[key]["hits"] += 1
+
+        return agent_executor
+
+    def key_for(self, agent_executor):
+        """
+        The (llm_type, model_name, execution_mode) an agent was built for, or None if it is not registered.
+        """
+        with self._lock:
+            for key, registered in self._agents.items():
+                if registered is agent_executor:
+                    return key
+        return None
+
+    def warm_up(self, configs):
+        """
+        Build agents ahead of the first request.
+
+        Args:
+            configs (list): List of (llm_type, model_name) or (llm_type, model_name, execution_mode) tuples.
+        """
+        for config in configs:
+            self.get(*config)
+
+    def stats(self):
+        """
+        Returns build time and hit counts for every registered agent.
+        """
+        with self._lock:
+            return [dict(s) for s in self._stats.values()]
+
+    def clear(self):
+        with self._lock:
+            self._agents.clear()
+            self._stats.clear()
+
+
+agent_registry = AgentRegistry()
+
+
+def get_compliance_agent(llm_type: str = "openai", model_name: str = "gpt-4o", execution_mode: str = None):
+    """
+    Shortcut for the process-wide agent registry.
+    """
+    return agent_registry.get(llm_type, model_name, execution_mode)
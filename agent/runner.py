@@ -0,0 +1,204 @@
+import os
+import asyncio
+
+from src.utils import compute_confidence
+from src.text_cache import get_pdf_pages, file_sha256
+from agent.templates import parser
+from agent.context import select_context
+from agent.map_reduce import run_map_reduce, arun_map_reduce
+from agent.registry import agent_registry
+from agent.verdict_cache import verdict_cache
+from agent.semantic_cache import semantic_cache
+from agent.metrics import timed, track_stage
+
+
+# "select" sends the most relevant sections in one call; "map_reduce" evaluates
+# every section of the document separately and merges the verdicts.
+DOCUMENT_MODES = ("select", "map_reduce")
+DOCUMENT_MODE = os.getenv("DOCUMENT_MODE", "select")
+
+
+class EmptyDocumentError(ValueError):
+    """
+    Raised when no text can be extracted from the submitted PDF.
+    """
+
+
+@timed("extraction")
+def load_document_pages(pdf_path):
+    """
+    Per-page text of a PDF, served from the PDF text cache on repeat submissions.
+
+    Raises:
+        EmptyDocumentError: If no page contains text.
+    """
+    page_texts = get_pdf_pages(pdf_path)
+
+    if not any(page_texts):
+        raise EmptyDocumentError("No text extracted from PDF")
+
+    return page_texts
+
+
+def evaluate_pages(agent_executor, query, page_texts, document_mode: str = None, policy_texts=None):
+    """
+    Run the agent for one query over already extracted page texts.
+
+    Args:
+        agent_executor: The compliance agent.
+        query (str): The compliance question.
+        page_texts (list): Text of each page.
+        document_mode (str, optional): "select" or "map_reduce" (DOCUMENT_MODE).
+        policy_texts (list, optional): Pre-retrieved policy texts for context selection.
+
+    Returns:
+        PolicyComplianceResponse: The parsed verdict.
+    """
+    if (document_mode or DOCUMENT_MODE) == "map_reduce":
+        return run_map_reduce(agent_executor, query, page_texts)
+
+    context = select_context(page_texts, query, policy_texts=policy_texts)
+
+    with track_stage("agent"):
+        response = agent_executor.invoke(
+            {
+                "query": query,
+                "chunk": context,
+            }
+        )
+
+    with track_stage("parsing"):
+        structured_response = parser.parse(response.get("output"))
+
+    return structured_response
+
+
+async def aevaluate_pages(agent_executor, query, page_texts, document_mode: str = None, policy_texts=None):
+    """
+    Async counterpart of evaluate_pages. Context selection runs in a worker thread
+    so the event loop stays free while the LLM and Qdrant calls are awaited.
+    """
+    if (document_mode or DOCUMENT_MODE) == "map_reduce":
+        return await arun_map_reduce(agent_executor, query, page_texts)
+
+    context = await asyncio.to_thread(select_context, page_texts, query, policy_texts)
+
+    with track_stage("agent"):
+        response = await agent_executor.ainvoke(
+            {
+                "query": query,
+                "chunk": context,
+            }
+        )
+
+    with track_stage("parsing"):
+        structured_response = parser.parse(response.get("output"))
+
+    return structured_response
+
+
+def _caching_enabled():
+    return verdict_cache.enabled or semantic_cache.enabled
+
+
+def cache_scope(agent_executor, content_hash, document_mode: str = None):
+    """
+    Verdict cache scope (document, policy version, model, prompt and modes) for a check,
+    or None when caching is disabled or the agent was not built by the registry.
+    """
+    if not _caching_enabled():
+        return None
+
+    agent_key = agent_registry.key_for(agent_executor)
+    if agent_key is None:
+        return None
+
+    llm_type, model_name, execution_mode = agent_key
+    return verdict_cache.scope_key(content_hash, llm_type, model_name, document_mode or DOCUMENT_MODE, execution_mode)
+
+
+@timed("cache_lookup")
+def cached_verdict(scope, query):
+    """
+    An exact match for the query first, then a semantically equivalent earlier question.
+    """
+    if scope is None:
+        return None
+
+    cached = verdict_cache.get(verdict_cache.make_key(scope, query))
+    if cached is None:
+        cached = semantic_cache.get(scope, query)
+    return cached
+
+
+def store_verdict(scope, query, structured_response):
+    if scope is None:
+        return
+    verdict_cache.put(verdict_cache.make_key(scope, query), structured_response)
+    semantic_cache.put(scope, query, structured_response)
+
+
+def _lookup(agent_executor, query, pdf_path, document_mode):
+    if not _caching_enabled():
+        return None, None
+
+    scope = cache_scope(agent_executor, file_sha256(pdf_path), document_mode)
+    return scope, cached_verdict(scope, query)
+
+
+def run_agent(agent_executor, query, pdf_path, document_mode: str = None):
+    """
+    Check a PDF against a query, answering from the verdict cache when the same
+    document and question were already evaluated against the current policies.
+    """
+    scope, cached = _lookup(agent_executor, query, pdf_path, document_mode)
+    if cached is not None:
+        return cached
+
+    page_texts = load_document_pages(pdf_path)
+    structured_response = evaluate_pages(agent_executor, query, page_texts, document_mode)
+
+    store_verdict(scope, query, structured_response)
+    return structured_response
+
+
+async def arun_agent(agent_executor, query, pdf_path, document_mode: str = None):
+    """
+    Async counterpart of run_agent; hashing, cache lookups and PDF extraction run in worker threads.
+    """
+    scope, cached = await asyncio.to_thread(_lookup, agent_executor, query, pdf_path, document_mode)
+    if cached is not None:
+        return cached
+
+    page_texts = await asyncio.to_thread(load_document_pages, pdf_path)
+    structured_response = await aevaluate_pages(agent_executor, query, page_texts, document_mode)
+
+    await asyncio.to_thread(store_verdict, scope, query, structured_response)
+    return structured_response
+
+
+def build_response(structured_response):
+    """
+    Convert a PolicyComplianceResponse into the /compliance/check response body.
+    """
+    return {
+        "verdict": structured_response.compliance_status,
+        "compliant_policies": structured_response.compliant_policies,
+        "violated_policies": structured_response.violated_policies,
+        "tools_used": structured_response.tools_used,
+        "similar_documents": structured_response.similar_documents,
+        "reasoning": structured_response.reasoning,
+        "confidence": compute_confidence(structured_response),
+    }
+
+
+def build_error_response(error):
+    return {
+        "verdict": "unknown",
+        "policies": [],
+        "tools_used": [],
+        "similar_documents": [],
+        "reasoning": "",
+        "confidence": 0.0,
+        "error": str(error),
+    }
@@ -0,0 +1,143 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.logger import logging
+from agent.templates import PolicyComplianceResponse
+
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+# Minimum cosine similarity between two questions for one verdict to answer the other
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+
+# Documents with an index, and questions remembered per document
+SEMANTIC_CACHE_MAX_DOCUMENTS = int(os.getenv("SEMANTIC_CACHE_MAX_DOCUMENTS", "512"))
+SEMANTIC_CACHE_MAX_QUERIES = int(os.getenv("SEMANTIC_CACHE_MAX_QUERIES", "64"))
+
+
+def _embed_query(query: str):
+    # Imported on first use so the cache can be built without loading the model
+    from agent.tools import embed_query
+    return embed_query(query)
+
+
+class _DocumentIndex:
+    """
+    Normalised query vectors and their verdicts for one document scope.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.vectors = None
+        self.responses = []
+
+    def add(self, query, vector, response, max_queries):
+        self.vectors = vector[None, :] if self.vectors is None else np.vstack([self.vectors, vector])
+        self.queries.append(query)
+        self.responses.append(response)
+        if len(self.queries) > max_queries:
+            self.vectors = self.vectors[1:]
+            self.queries.pop(0)
+            self.responses.pop(0)
+
+    def best_match(self, vector):
+        if self.vectors is None:
+            return None, 0.0
+        similarities = self.vectors @ vector
+        i = int(np.argmax(similarities))
+        return i, float(similarities[i])
+
+
+class SemanticVerdictCache:
+    """
+    Reuses a verdict for a differently worded but equivalent question about the same
+    document.
+
+    Each document scope (see VerdictCache.scope_key) keeps a small in-memory index of
+    the questions already answered. A lookup embeds the new question and returns the
+    verdict of the most similar one if their cosine similarity reaches `threshold`.
+    """
+
+    def __init__(self, enabled: bool = None, threshold: float = None, max_documents: int = None,
+                 max_queries: int = None, embed=None):
+        self.enabled = SEMANTIC_CACHE_ENABLED if enabled is None else enabled
+        self.threshold = SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_documents = max_documents or SEMANTIC_CACHE_MAX_DOCUMENTS
+        self.max_queries = max_queries or SEMANTIC_CACHE_MAX_QUERIES
+        self._embed = embed or _embed_query
+
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _vector(self, query: str):
+        vector = np.asarray(self._embed(query), dtype=np.float32).reshape(-1)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, scope: str, query: str):
+        """
+        Return the verdict of the closest earlier question in this scope, or None.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            index = self._indexes.get(scope)
+        if index is None:
+            self.misses += 1
+            return None
+
+        vector = self._vector(query)
+        with self._lock:
+            self._indexes.move_to_end(scope)
+            i, similarity = index.best_match(vector)
+            if i is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            matched_query, response = index.queries[i], index.responses[i]
+            self.hits += 1
+
+        logging.info(f"Semantic cache hit ({similarity:.3f}): {query!r} ~ {matched_query!r}")
+        return PolicyComplianceResponse(**response)
+
+    def put(self, scope: str, query: str, structured_response: PolicyComplianceResponse):
+        if not self.enabled:
+            return
+
+        vector = self._vector(query)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = _DocumentIndex()
+                while len(self._indexes) > self.max_documents:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(scope)
+            index.add(query, vector, structured_response.model_dump(), self.max_queries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = sum(len(index.queries) for index in self._indexes.values())
+            documents = len(self._indexes)
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "documents": documents,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+semantic_cache = SemanticVerdictCache()
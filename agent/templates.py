@@ -16,6 +16,9 @@ class PolicyComplianceResponse(BaseModel):
     tools_used: List[str] = Field(default_factory=list)
     similar_documents: List[str] = Field(default_factory=list)
 
+# Bump whenever the prompt or the response schema changes so cached verdicts are retired
+PROMPT_VERSION = "2"
+
 # Output parser
 parser = PydanticOutputParser(pydantic_object=PolicyComplianceResponse)
 
@@ -40,7 +43,7 @@ system_prompt = ChatPromptTemplate.from_messages(
             - Third-party relationships (e.g., distributors, licensees)
             - Prohibited actions and rights limitations
 
-            3. Use `find_matching_policies` to retrieve policies based on:
+            3. Use `find_matching_policies` to retrieve policies, passing all of your lookups as a list in one call, based on:
             - Contract type (e.g., Franchise, License_Agreements, Joint Venture, Manufacturing)
             - Policy domain (contracts, security, privacy, HIPAA, IT security)
             - Severity and category if relevant
@@ -77,3 +80,54 @@ system_prompt = ChatPromptTemplate.from_messages(
         ("placeholder", "{agent_scratchpad}")
     ]
 ).partial(format_instructions=parser.get_format_instructions())
+
+
+# Prompt for the pipeline execution mode: retrieval has already been done, so the
+# matching policies and similar documents are given and the model answers in one call.
+pipeline_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+            You are a Compliance Auditor Assistant responsible for reviewing legal contract documents and evaluating them against defined policy rules.
+
+            ⚠️ Respond ONLY with a single valid JSON object. Do NOT include explanations or commentary outside the JSON.
+
+            Your task:
+            1. Read the document chunk and the user's compliance question.
+
+            2. Identify the key elements relevant to the question (terms and obligations, data handling,
+            security and privacy clauses, intellectual property, exclusivity, third parties, prohibited actions).
+
+            3. Evaluate the document against the Matching Policies below, using the Similar Documents
+            as supporting examples where relevant.
+
+            4. Assess whether the document is Compliant or Non-Compliant, clearly citing:
+            - compliant_policies
+            - violated_policies
+            - Supporting clauses
+            - Analogies to similar documents
+
+            📄 Document Chunk:
+            \"\"\"{chunk}\"\"\"
+
+            📚 Matching Policies:
+            {policies}
+
+            🗂 Similar Documents:
+            {similar_documents}
+
+            📝 Structure your answer EXACTLY as a valid JSON object following this format:
+
+            {format_instructions}
+
+            Rules:
+            - If compliance_status = "Compliant", violated_policies MUST be empty
+            - If compliance_status = "Non-Compliant", compliant_policies MUST be empty
+            - Every policy mentioned in reasoning MUST appear in exactly one list
+            - tools_used MUST be ["find_matching_policies", "find_similar_documents"]
+            """
+        ),
+        ("human", "{query}"),
+    ]
+).partial(format_instructions=parser.get_format_instructions())
@@ -1,9 +1,18 @@
 import os
+import asyncio
+import threading
+from typing import List, Union
 from dotenv import load_dotenv
-from langchain.tools import Tool
+from pydantic import BaseModel, Field
+from qdrant_client.http import models as qmodels
+from langchain.tools import Tool, StructuredTool
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.utils import get_embedding_model, db_client_connect
+from src.utils import get_embedding_model
+from src.qdrant_pool import qdrant_pool
+from src.pdf_extraction import extract_page_texts
+from src.embedding_cache import query_embedding_cache
+from agent.metrics import timed, track_stage
 
 load_dotenv()
 
@@ -13,7 +22,35 @@ qdrant_api_key = os.getenv("QDRANT_API_KEY")
 policy_collection = os.getenv("POLICY_COLLECTION_NAME")
 contract_collection = os.getenv("CONTRACT_COLLECTION_NAME")
 
-embedding_model = get_embedding_model()
+embedding_model_name = "all-MiniLM-L6-v2"
+
+# Loaded on first use (or by the start-up warm-up) rather than at import time
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+
+def load_embedding_model():
+    """
+    Returns the shared query embedding model, loading it on first use.
+    """
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                _embedding_model = get_embedding_model(embedding_model_name)
+    return _embedding_model
+
+
+def embedding_model_loaded() -> bool:
+    return _embedding_model is not None
+
+
+@timed("embedding")
+def embed_query(query: str):
+    """
+    Embed a retrieval query, reusing cached vectors for repeated queries.
+    """
+    return query_embedding_cache.encode(load_embedding_model(), query, model_name=embedding_model_name)
 
 
 def create_chunk_embeddings(document_pages: list):
@@ -34,12 +71,11 @@ def create_chunk_embeddings(document_pages: list):
     )
 
     chunks = []
-    for i, page in enumerate(document_pages):
-        text = page.extract_text()
+    for text in extract_page_texts(document_pages):
         if text:
             chunks.extend(splitter.split_text(text))
 
-    embeddings = embedding_model.encode(chunks, show_progress_bar=True, batch_size=32)
+    embeddings = load_embedding_model().encode(chunks, show_progress_bar=True, batch_size=32)
 
     return embeddings
 
@@ -58,23 +94,128 @@ def find_matching_policies(query: str, top_k: int=3):
         top_k (int): The number of top matching policies to return.
     """
 
-    client = db_client_connect(policy_collection)
+    qdrant_pool.ensure_collection(policy_collection)
+    client = qdrant_pool.client()
 
-    query_embedding = embedding_model.encode(query).tolist()
+    query_embedding = embed_query(query).tolist()
 
-    results = client.search(
-        collection_name=policy_collection,
-        query_vector=query_embedding,
-        limit=top_k,
-        with_payload=True,
-    )
+    with track_stage("qdrant_search"):
+        results = client.search(
+            collection_name=policy_collection,
+            query_vector=query_embedding,
+            limit=top_k,
+            with_payload=True,
+        )
 
     return results
 
-matching_policy_tool = Tool(
+
+async def afind_matching_policies(query: str, top_k: int=3):
+    """
+    Async version of find_matching_policies using the shared async Qdrant client.
+    The query is encoded in a worker thread to keep the event loop free.
+    """
+
+    await qdrant_pool.aensure_collection(policy_collection)
+    client = qdrant_pool.async_client()
+
+    query_embedding = (await asyncio.to_thread(embed_query, query)).tolist()
+
+    with track_stage("qdrant_search"):
+        results = await client.search(
+            collection_name=policy_collection,
+            query_vector=query_embedding,
+            limit=top_k,
+            with_payload=True,
+        )
+
+    return results
+
+
+@timed("embedding")
+def _batch_requests(queries: list, top_k: int):
+    query_embeddings = query_embedding_cache.encode(load_embedding_model(), list(queries), model_name=embedding_model_name)
+    return [
+        qmodels.QueryRequest(query=embedding.tolist(), limit=top_k, with_payload=True)
+        for embedding in query_embeddings
+    ]
+
+
+def find_matching_policies_batch(queries: list, top_k: int=3):
+    """
+    Find matching policies for several queries at once: the queries are encoded in a
+    single batch and searched with one Qdrant batch request.
+
+    Args:
+        queries (list): The queries to find matching policies for.
+        top_k (int): The number of top matching policies to return per query.
+
+    Returns:
+        list: The matching policies for each query, in query order.
+    """
+    if not queries:
+        return []
+
+    qdrant_pool.ensure_collection(policy_collection)
+    client = qdrant_pool.client()
+
+    requests = _batch_requests(queries, top_k)
+    with track_stage("qdrant_search"):
+        responses = client.query_batch_points(
+            collection_name=policy_collection,
+            requests=requests,
+        )
+
+    return [response.points for response in responses]
+
+
+async def afind_matching_policies_batch(queries: list, top_k: int=3):
+    """
+    Async version of find_matching_policies_batch.
+    """
+    if not queries:
+        return []
+
+    await qdrant_pool.aensure_collection(policy_collection)
+    client = qdrant_pool.async_client()
+
+    requests = await asyncio.to_thread(_batch_requests, queries, top_k)
+    with track_stage("qdrant_search"):
+        responses = await client.query_batch_points(
+            collection_name=policy_collection,
+            requests=requests,
+        )
+
+    return [response.points for response in responses]
+
+
+class MatchingPolicyInput(BaseModel):
+    queries: Union[str, List[str]] = Field(
+        description="A query, or a list of queries to look up together in one batch"
+    )
+    top_k: int = Field(default=3, description="The number of top matching policies to return per query")
+
+
+def match_policies(queries: Union[str, List[str]], top_k: int=3):
+    if isinstance(queries, str):
+        return find_matching_policies(queries, top_k)
+    return dict(zip(queries, find_matching_policies_batch(queries, top_k)))
+
+
+async def amatch_policies(queries: Union[str, List[str]], top_k: int=3):
+    if isinstance(queries, str):
+        return await afind_matching_policies(queries, top_k)
+    return dict(zip(queries, await afind_matching_policies_batch(queries, top_k)))
+
+
+matching_policy_tool = StructuredTool.from_function(
     name="find_matching_policies",
-    func=find_matching_policies,
-    description="Find matching policies based on a query using embeddings. Returns top K matching policies with their documents and metadata."
+    func=match_policies,
+    coroutine=amatch_policies,
+    args_schema=MatchingPolicyInput,
+    description="Find matching policies based on a query using embeddings. Accepts one query or a list of queries; "
+                "pass every lookup you need as a list in a single call. Returns top K matching policies with their "
+                "documents and metadata, grouped by query when a list is given."
 )
 
 
@@ -87,16 +228,39 @@ def find_similar_documents(query: str, top_k: int=3):
         top_k (int): The number of top similar documents to return.
     """
     
-    client = db_client_connect(policy_collection)
+    qdrant_pool.ensure_collection(policy_collection)
+    client = qdrant_pool.client()
     # q_embedding = model.encode([query])[0]
-    query_embedding = embedding_model.encode(query).tolist()
+    query_embedding = embed_query(query).tolist()
 
-    results = client.search(
-        collection_name=policy_collection,
-        query_vector=query_embedding,
-        limit=top_k,
-        with_payload=True,
-    )
+    with track_stage("qdrant_search"):
+        results = client.search(
+            collection_name=policy_collection,
+            query_vector=query_embedding,
+            limit=top_k,
+            with_payload=True,
+        )
+
+    return results
+
+
+async def afind_similar_documents(query: str, top_k: int=3):
+    """
+    Async version of find_similar_documents using the shared async Qdrant client.
+    """
+
+    await qdrant_pool.aensure_collection(policy_collection)
+    client = qdrant_pool.async_client()
+
+    query_embedding = (await asyncio.to_thread(embed_query, query)).tolist()
+
+    with track_stage("qdrant_search"):
+        results = await client.search(
+            collection_name=policy_collection,
+            query_vector=query_embedding,
+            limit=top_k,
+            with_payload=True,
+        )
 
     return results
 
@@ -104,5 +268,6 @@ def find_similar_documents(query: str, top_k: int=3):
 similar_document_tool = Tool(
     name="find_similar_documents",
     func=find_similar_documents,
+    coroutine=afind_similar_documents,
     description="Find similar documents based on a query and policies to give more context to back up answer. Returns top K similar documents with their metadata."
 )
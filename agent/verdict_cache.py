@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.logger import logging
+from src.qdrant_pool import qdrant_pool
+from src.collection_revision import get_collection_revision
+from src.embedding_cache import normalize_text
+from src.utils import compute_confidence, get_latest_collection_version
+from agent.templates import PolicyComplianceResponse, PROMPT_VERSION
+
+
+# "memory" (LRU), "disk" (JSON files shared between processes) or "none"
+VERDICT_CACHE_BACKEND = os.getenv("VERDICT_CACHE_BACKEND", "memory")
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "1024"))
+VERDICT_CACHE_DIR = os.getenv("VERDICT_CACHE_DIR", os.path.join(os.getcwd(), "verdict_cache"))
+# Disk backend bounds: entry count, entry age in seconds (0 disables either) and how
+# many writes happen between prunes
+VERDICT_CACHE_DISK_SIZE = int(os.getenv("VERDICT_CACHE_DISK_SIZE", "10000"))
+VERDICT_CACHE_MAX_AGE = float(os.getenv("VERDICT_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+VERDICT_CACHE_PRUNE_EVERY = int(os.getenv("VERDICT_CACHE_PRUNE_EVERY", "100"))
+
+# How long the latest policy collection version is trusted before Qdrant is asked again
+POLICY_VERSION_TTL = float(os.getenv("POLICY_VERSION_TTL", "60"))
+
+
+class MemoryVerdictBackend:
+    """
+    Thread-safe in-process LRU of cached verdicts.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = VERDICT_CACHE_SIZE if max_size is None else max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def prune(self, policy_version: str = None) -> int:
+        """
+        Drop entries produced against a policy version other than `policy_version`.
+        """
+        if policy_version is None:
+            return 0
+        with self._lock:
+            retired = [
+                key for key, entry in self._entries.items()
+                if entry.get("policy_version", policy_version) != policy_version
+            ]
+            for key in retired:
+                del self._entries[key]
+        return len(retired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskVerdictBackend:
+    """
+    Cached verdicts stored as one JSON file per key, so they survive restarts and are
+    shared by every API and job worker process on the host.
+
+    Entries older than `max_age` seconds are treated as misses. Every `prune_every`
+    writes the directory is pruned: expired entries are removed, then the oldest ones
+    beyond `max_entries`.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None, max_age: float = None,
+                 prune_every: int = None):
+        self.cache_dir = cache_dir or VERDICT_CACHE_DIR
+        self.max_entries = VERDICT_CACHE_DISK_SIZE if max_entries is None else max_entries
+        self.max_age = VERDICT_CACHE_MAX_AGE if max_age is None else max_age
+        self.prune_every = max(1, VERDICT_CACHE_PRUNE_EVERY if prune_every is None else prune_every)
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.max_age > 0 and now - mtime > self.max_age
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            if self._expired(os.path.getmtime(path), time.time()):
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self, policy_version: str = None) -> int:
+        """
+        Remove expired entries and, when `policy_version` is given, entries produced
+        against any other policy version; then the oldest entries beyond max_entries.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        now = time.time()
+        kept = []
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+                retired = self._expired(mtime, now)
+                if not retired and policy_version is not None:
+                    with open(path) as f:
+                        retired = json.load(f).get("policy_version", policy_version) != policy_version
+                if retired:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    kept.append((mtime, path))
+            except (FileNotFoundError, json.JSONDecodeError):
+                # Removed or being replaced by another process
+                continue
+
+        if 0 < self.max_entries < len(kept):
+            kept.sort()
+            for _, path in kept[:len(kept) - self.max_entries]:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+
+        if removed:
+            logging.info(f"Pruned {removed} verdict cache entries from {self.cache_dir}")
+        return removed
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.cache_dir) if name.endswith(".json"))
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+def create_backend(kind: str = None):
+    """
+    Build the verdict cache backend named by VERDICT_CACHE_BACKEND.
+    """
+    kind = kind or VERDICT_CACHE_BACKEND
+    if kind == "memory":
+        return MemoryVerdictBackend()
+    if kind == "disk":
+        return DiskVerdictBackend()
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown VERDICT_CACHE_BACKEND: {kind}")
+
+
+class PolicyVersion:
+    """
+    Identifies the policy set verdicts were produced against: the configured policy
+    collection plus the latest POLICY_COLLECTION_BASENAME_vN in Qdrant and that
+    collection's content revision (set by incremental ingestion). Ingesting a new
+    policy version, or changing policies in place, changes the value, which retires
+    every cached verdict.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = POLICY_VERSION_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._resolved_at = 0.0
+
+    def _resolve(self):
+        collection_name = os.getenv("POLICY_COLLECTION_NAME", "")
+        base_name = os.getenv("POLICY_COLLECTION_BASENAME")
+        if not base_name:
+            match = re.match(r"^(.+)_v\d+$", collection_name)
+            base_name = match.group(1) if match else None
+        client = qdrant_pool.client()
+        if not base_name:
+            return f"{collection_name}@{get_collection_revision(client, collection_name) or ''}"
+
+        latest = f"{base_name}_v{get_latest_collection_version(client, base_name)}"
+        return f"{collection_name}|{latest}@{get_collection_revision(client, latest) or ''}"
+
+    def get(self):
+        with self._lock:
+            if self._value is not None and time.monotonic() - self._resolved_at < self.ttl:
+                return self._value
+            try:
+                self._value = self._resolve()
+            except Exception as e:
+                # Keep serving against the last known version while Qdrant is unreachable
+                logging.warning(f"Could not resolve policy collection version: {e}")
+                if self._value is None:
+                    return os.getenv("POLICY_COLLECTION_NAME", "")
+            self._resolved_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+    @property
+    def resolved(self) -> bool:
+        """
+        Whether the value came from Qdrant rather than the unreachable-Qdrant fallback.
+        """
+        return self._value is not None
+
+
+class VerdictCache:
+    """
+    Cache of parsed compliance verdicts keyed by (document content hash, normalised
+    query, policy collection version, llm_type, model_name, prompt version, document and
+    execution mode).
+
+    Entries hold the PolicyComplianceResponse, its confidence and the policy version.
+    Because the policy version is part of the key, verdicts against an older policy set
+    are never served; the first write after the version changes prunes them.
+    """
+
+    def __init__(self, backend=None, policy_version: PolicyVersion = None):
+        self.backend = backend
+        self.policy_version = policy_version or PolicyVersion()
+        self.hits = 0
+        self.misses = 0
+        self._pruned_version = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def scope_key(self, content_hash: str, llm_type: str, model_name: str, document_mode: str,
+                  execution_mode: str = "agent") -> str:
+        """
+        Everything but the query: checks within one scope differ only in the question asked.
+        """
+        parts = [
+            content_hash, self.policy_version.get(), llm_type, model_name, PROMPT_VERSION, document_mode, execution_mode,
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(scope: str, query: str) -> str:
+        return hashlib.sha256(f"{scope}:{normalize_text(query).lower()}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Return the cached PolicyComplianceResponse, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return PolicyComplianceResponse(**entry["response"])
+
+    def put(self, key: str, structured_response: PolicyComplianceResponse):
+        if not self.enabled:
+            return
+        policy_version = self.policy_version.get()
+        self.backend.put(
+            key,
+            {
+                "response": structured_response.model_dump(),
+                "confidence": compute_confidence(structured_response),
+                "policy_version": policy_version,
+                "created_at": time.time(),
+            },
+        )
+        if policy_version != self._pruned_version and self.policy_version.resolved:
+            self._pruned_version = policy_version
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Remove entries produced against retired policy versions.
+        """
+        if not self.enabled:
+            return 0
+        return self.backend.prune(self.policy_version.get())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.enabled else None,
+            "entries": len(self.backend) if self.enabled else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+        self.policy_version.invalidate()
+        self._pruned_version = None
+        self.hits = 0
+        self.misses = 0
+
+
+verdict_cache = VerdictCache(create_backend())
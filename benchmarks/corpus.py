@@ -0,0 +1,128 @@
+import os
+import random
+
+import yaml
+
+
+CLAUSES = [
+    "The Supplier shall process personal data only on documented instructions from the Customer.",
+    "Either party may terminate this Agreement upon ninety days written notice to the other party.",
+    "This Agreement shall be governed by and construed in accordance with the laws of the State of New York.",
+    "The Licensee shall not sublicense, assign or otherwise transfer the Licensed Intellectual Property.",
+    "All confidential information shall be encrypted at rest and in transit using industry standard methods.",
+    "The Distributor is appointed as the exclusive distributor of the Products within the Territory.",
+    "Protected health information shall be handled in accordance with HIPAA and the Business Associate Agreement.",
+    "The Franchisee shall pay a royalty fee of six percent of gross sales on a monthly basis.",
+    "Security incidents affecting Customer data shall be reported within seventy two hours of discovery.",
+    "The Manufacturer warrants that the Products conform to the Specifications for a period of twelve months.",
+    "Neither party shall be liable for indirect, incidental or consequential damages arising from this Agreement.",
+    "The Endorser shall not promote competing products during the Term of this Agreement.",
+]
+
+POLICY_CATEGORIES = ["privacy", "security", "hipaa", "contracts", "intellectual_property"]
+
+
+def contract_pages(rng: random.Random, pages: int, lines_per_page: int = 40):
+    """
+    Text of a synthetic contract, one list of lines per page.
+    """
+    return [
+        [f"{page + 1}.{line + 1} {rng.choice(CLAUSES)}" for line in range(lines_per_page)]
+        for page in range(pages)
+    ]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages):
+    """
+    Write a minimal text PDF (Helvetica, one line per entry) without extra dependencies.
+
+    Args:
+        path (str): Output file.
+        pages (list): Lines of text for each page.
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = len(objects) + 1 + 2 * len(pages)
+
+    page_ids = []
+    for lines in pages:
+        stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        stream = stream.encode("latin-1", "replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    add(b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_contracts(directory: str, count: int, pages: int, seed: int = 0):
+    """
+    Write `count` synthetic contract PDFs of `pages` pages each.
+
+    Returns:
+        list: Paths of the written PDFs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"contract_{i:04d}.pdf")
+        write_pdf(path, contract_pages(rng, pages))
+        paths.append(path)
+    return paths
+
+
+def write_policies(directory: str, files: int, rules_per_category: int = 10, seed: int = 0):
+    """
+    Write synthetic policy YAML files in the layout parse_policies expects.
+
+    Returns:
+        list: Paths of the written YAML files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        data = {
+            category: [
+                {
+                    "content": f"Policy {category.upper()}-{i:03d}-{j:03d}: {rng.choice(CLAUSES)}",
+                    "metadata": {"policy_id": f"{category.upper()}-{i:03d}-{j:03d}", "severity": rng.choice(["low", "high"])},
+                }
+                for j in range(rules_per_category)
+            ]
+            for category in POLICY_CATEGORIES
+        }
+        path = os.path.join(directory, f"policies_{i:03d}.yaml")
+        with open(path, "w") as f:
+            yaml.safe_dump(data, f)
+        paths.append(path)
+    return paths
@@ -0,0 +1,134 @@
+import re
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+from typing import List
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class FakeComplianceChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model for benchmarks.
+
+    Every call sleeps for `latency` seconds. When tools are bound (agent mode) the
+    first turn asks for `find_matching_policies` and the next turn answers; without
+    tools (pipeline mode) it answers straight away. The verdict depends only on the
+    question, so repeated runs produce identical results.
+    """
+
+    latency: float = 0.5
+    call_tools: bool = True
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-compliance"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    @staticmethod
+    def _query(messages) -> str:
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                return message.content
+        return ""
+
+    def _respond(self, messages) -> AIMessage:
+        query = self._query(messages)
+        prompt_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+
+        if self.tool_names and self.call_tools and not any(isinstance(m, ToolMessage) for m in messages):
+            tool = "find_matching_policies" if "find_matching_policies" in self.tool_names else self.tool_names[0]
+            call_id = "call_" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": tool, "args": {"queries": query}, "id": call_id}],
+                usage_metadata={"input_tokens": prompt_tokens, "output_tokens": 20, "total_tokens": prompt_tokens + 20},
+            )
+
+        compliant = zlib.crc32(query.encode("utf-8")) % 2 == 0
+        content = json.dumps({
+            "compliant_policies": ["BENCH-001"] if compliant else [],
+            "violated_policies": [] if compliant else ["BENCH-001"],
+            "compliance_status": "Compliant" if compliant else "Non-Compliant",
+            "reasoning": f"Synthetic verdict for: {query}",
+            "tools_used": ["find_matching_policies"] if self.tool_names else [],
+            "similar_documents": [],
+        })
+        output_tokens = _estimate_tokens(content)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+class HashEmbeddingModel:
+    """
+    Feature-hashing stand-in for the SentenceTransformer model: texts that share
+    words get similar vectors. Only for runs where the real model is unavailable;
+    embedding timings are then meaningless.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _vector(self, text: str):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.array([self._vector(text) for text in texts], dtype=np.float32).reshape(-1, self.dim)
+
+
+def install_fakes(llm_latency: float, hash_embeddings: bool = False):
+    """
+    Route LLM construction (and optionally the embedding model) to the offline stand-ins.
+
+    Must run before agent or ingestion modules are imported, since they bind
+    get_embedding_model at import time. The fake LLM is registered as every
+    provider in the LLM registry, so it is cached and record/replay-wrapped like
+    a real client.
+    """
+    import src.utils
+    from src.llm_registry import llm_registry
+
+    if hash_embeddings:
+        model = HashEmbeddingModel()
+        src.utils.get_embedding_model = lambda model_name="all-MiniLM-L6-v2": model
+
+    def build_fake(model_name, http_pool, **params):
+        return FakeComplianceChatModel(latency=llm_latency)
+
+    for llm_type in llm_registry.providers():
+        llm_registry.register(llm_type, build_fake)
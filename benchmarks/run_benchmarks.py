@@ -0,0 +1,360 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+import io
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.corpus import write_contracts, write_policies, CLAUSES
+
+
+QUERIES = [
+    "Does this contract have a termination clause?",
+    "Is this contract compliant with GDPR laws?",
+    "Are governing law and jurisdiction specified?",
+    "Does the document restrict IP usage and sublicensing appropriately?",
+    "Does the contract comply with HIPAA and internal IT security policies?",
+    "Are security incidents reported within a defined time frame?",
+]
+
+
+def configure_environment(args):
+    """
+    Point the application at the local stand-ins. Runs before any agent or
+    ingestion module is imported, since they read their settings at import time.
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ["QDRANT_URL"] = ""
+    if args.qdrant_path:
+        os.environ["QDRANT_PATH"] = args.qdrant_path
+    else:
+        os.environ["QDRANT_LOCATION"] = ":memory:"
+    os.environ["POLICY_COLLECTION_NAME"] = "bench_policies_v1"
+    os.environ["CONTRACT_COLLECTION_NAME"] = "bench_contracts_v1"
+    # Measure the work itself, not the result caches
+    os.environ["VERDICT_CACHE_BACKEND"] = "none"
+    os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+    os.environ["EMBEDDING_STORE_DIR"] = ""
+
+    from benchmarks.fakes import install_fakes
+    install_fakes(llm_latency=args.llm_latency, hash_embeddings=args.hash_embeddings)
+
+
+def summarize(latencies):
+    """
+    Latency distribution in milliseconds.
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    if not len(values):
+        return {"count": 0}
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "min_ms": round(float(values.min()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def timed_calls(func, repeat: int):
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    return latencies, result
+
+
+def bench_pdf_extraction(corpus, args):
+    from src.pdf_extraction import extract_pdf_pages, shutdown_executor
+
+    pdf_path = corpus["large_contract"]
+    sequential, pages = timed_calls(lambda: extract_pdf_pages(pdf_path, parallel_threshold=10**9), args.repeat)
+    parallel, _ = timed_calls(lambda: extract_pdf_pages(pdf_path, parallel_threshold=1), args.repeat)
+    shutdown_executor()
+
+    return {
+        "pages": len(pages),
+        "sequential": summarize(sequential),
+        "parallel": summarize(parallel),
+    }
+
+
+def bench_chunking(corpus, args):
+    from src.pdf_extraction import extract_pdf_pages
+    from agent.context import split_pages
+    from ingestion.chunking import Chunker
+
+    page_texts = extract_pdf_pages(corpus["large_contract"])
+    split_latencies, chunks = timed_calls(lambda: split_pages(page_texts), args.repeat)
+
+    chunker = Chunker()
+    policy_latencies, (texts, _, _) = timed_calls(lambda: chunker.parse_policies(corpus["policies"][0]), args.repeat)
+
+    return {
+        "contract_chunks": len(chunks),
+        "split_pages": summarize(split_latencies),
+        "policy_rules": len(texts),
+        "parse_policies": summarize(policy_latencies),
+    }
+
+
+def bench_embedding(corpus, args):
+    from src.utils import get_embedding_model
+
+    model = get_embedding_model("all-MiniLM-L6-v2")
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(CLAUSES) for _ in range(4)) for _ in range(args.embedding_texts)]
+
+    single, _ = timed_calls(lambda: model.encode([texts[0]]), args.repeat)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=32)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "hash_embeddings": args.hash_embeddings,
+        "single_query": summarize(single),
+        "batch_texts": len(texts),
+        "batch_seconds": round(batch_seconds, 4),
+        "texts_per_second": round(len(texts) / batch_seconds, 1) if batch_seconds else None,
+    }
+
+
+def bench_upsert(corpus, args):
+    from src.qdrant_pool import qdrant_pool
+    from ingestion.embed_upsert import EmbedUpsert
+
+    embed_upsert = EmbedUpsert(qdrant_pool.client(), store_dir="")
+    rng = random.Random(1)
+    count = args.upsert_points
+    texts = [f"{i} {rng.choice(CLAUSES)}" for i in range(count)]
+    metadatas = [{"source": "benchmark", "chunk": i} for i in range(count)]
+    embeddings = np.asarray(embed_upsert.get_embeddings(texts), dtype=np.float32)
+
+    results = {"points": count}
+    for batch_size in (64, 256):
+        collection = f"bench_upsert_{batch_size}"
+        ids = list(range(count))
+        start = time.perf_counter()
+        embed_upsert.upsert(texts, metadatas, ids, embeddings, collection, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        results[f"batch_{batch_size}"] = {
+            "seconds": round(seconds, 4),
+            "points_per_second": round(count / seconds, 1) if seconds else None,
+        }
+        qdrant_pool.client().delete_collection(collection)
+        qdrant_pool.invalidate(collection)
+    return results
+
+
+def ingest_policies(paths):
+    """
+    Load the synthetic policies into the policy collection the agent searches.
+
+    Returns:
+        int: Number of policy points upserted.
+    """
+    from src.qdrant_pool import qdrant_pool
+    from ingestion.chunking import Chunker
+    from ingestion.embed_upsert import EmbedUpsert
+    from ingestion.streaming import StreamingPipeline
+
+    chunker = Chunker()
+    pipeline = StreamingPipeline(EmbedUpsert(qdrant_pool.client(), store_dir=""), os.environ["POLICY_COLLECTION_NAME"])
+    count = pipeline.run(chunker.parse_policies(path) for path in paths)
+    qdrant_pool.invalidate()
+    return count
+
+
+def bench_retrieval(corpus, args):
+    from agent.tools import find_matching_policies, find_matching_policies_batch
+
+    single, _ = timed_calls(lambda: [find_matching_policies(q) for q in QUERIES], args.repeat)
+    batched, results = timed_calls(lambda: find_matching_policies_batch(QUERIES), args.repeat)
+
+    return {
+        "queries_per_call": len(QUERIES),
+        "sequential_single_queries": summarize(single),
+        "one_batch_call": summarize(batched),
+        "results_per_query": [len(points) for points in results],
+    }
+
+
+def bench_end_to_end(corpus, args):
+    import agent.api as api
+
+    with open(corpus["contract"], "rb") as f:
+        pdf_bytes = f.read()
+
+    def check(query):
+        client = api.app.test_client()
+        start = time.perf_counter()
+        response = client.post(
+            "/compliance/check",
+            data={"query": query, "file": (io.BytesIO(pdf_bytes), "contract.pdf")},
+            content_type="multipart/form-data",
+        )
+        return time.perf_counter() - start, response.status_code
+
+    results = {}
+    for execution_mode in ("agent", "pipeline"):
+        api.execution_mode = execution_mode
+        api.agent_registry.warm_up([(api.llm_type, api.model_name, execution_mode)])
+
+        mode_results = {}
+        for concurrency in args.concurrency:
+            requests_count = max(args.requests, concurrency)
+            queries = [QUERIES[i % len(QUERIES)] for i in range(requests_count)]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = list(executor.map(check, queries))
+            wall = time.perf_counter() - start
+
+            mode_results[f"concurrency_{concurrency}"] = {
+                "requests": requests_count,
+                "errors": sum(1 for _, status in outcomes if status != 200),
+                "wall_seconds": round(wall, 4),
+                "requests_per_second": round(requests_count / wall, 2),
+                "latency": summarize([latency for latency, _ in outcomes]),
+            }
+        results[execution_mode] = mode_results
+
+    results["llm_latency_seconds"] = args.llm_latency
+    return results
+
+
+def bench_ingestion(corpus, args):
+    from src.qdrant_pool import qdrant_pool
+    from ingestion.embed_upsert import EmbedUpsert
+    from ingestion.parallel import parse_files
+    from ingestion.streaming import StreamingPipeline
+
+    embed_upsert = EmbedUpsert(qdrant_pool.client(), store_dir="")
+    pipeline = StreamingPipeline(embed_upsert, "bench_ingestion")
+
+    start = time.perf_counter()
+    points = pipeline.run(parse_files(corpus["corpus"], "contracts", workers=args.workers))
+    seconds = time.perf_counter() - start
+
+    qdrant_pool.client().delete_collection("bench_ingestion")
+    qdrant_pool.invalidate("bench_ingestion")
+
+    return {
+        "documents": len(corpus["corpus"]),
+        "pages_per_document": args.corpus_pages,
+        "points": points,
+        "seconds": round(seconds, 4),
+        "documents_per_second": round(len(corpus["corpus"]) / seconds, 2) if seconds else None,
+    }
+
+
+BENCHMARKS = {
+    "pdf_extraction": bench_pdf_extraction,
+    "chunking": bench_chunking,
+    "embedding": bench_embedding,
+    "upsert": bench_upsert,
+    "retrieval": bench_retrieval,
+    "end_to_end": bench_end_to_end,
+    "ingestion": bench_ingestion,
+}
+
+
+def build_corpus(directory, args):
+    return {
+        "contract": write_contracts(os.path.join(directory, "contract"), 1, args.contract_pages, seed=1)[0],
+        "large_contract": write_contracts(os.path.join(directory, "large"), 1, args.large_pages, seed=2)[0],
+        "corpus": write_contracts(os.path.join(directory, "corpus"), args.corpus_documents, args.corpus_pages, seed=3),
+        "policies": write_policies(os.path.join(directory, "policies"), args.policy_files),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks (fake LLM, local Qdrant).")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="End-to-end concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per end-to-end concurrency level")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions for micro-benchmarks")
+    parser.add_argument("--contract-pages", type=int, default=8)
+    parser.add_argument("--large-pages", type=int, default=120)
+    parser.add_argument("--corpus-documents", type=int, default=40)
+    parser.add_argument("--corpus-pages", type=int, default=6)
+    parser.add_argument("--policy-files", type=int, default=4)
+    parser.add_argument("--embedding-texts", type=int, default=512)
+    parser.add_argument("--upsert-points", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None, help="Parse workers for the ingestion benchmark")
+    parser.add_argument("--qdrant-path", help="Use on-disk local Qdrant at this path instead of in-memory")
+    parser.add_argument("--hash-embeddings", action="store_true",
+                        help="Use a hashing stand-in instead of the SentenceTransformer model (no model download)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_environment(args)
+
+    names = args.only or list(BENCHMARKS)
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "benchmarks": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="compliance-bench-") as directory:
+        corpus = build_corpus(directory, args)
+        results["meta"]["policy_points"] = ingest_policies(corpus["policies"])
+
+        for name in names:
+            print(f"Running {name}...", flush=True)
+            start = time.perf_counter()
+            try:
+                results["benchmarks"][name] = BENCHMARKS[name](corpus, args)
+            except Exception as e:
+                results["benchmarks"][name] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"  done in {time.perf_counter() - start:.1f}s", flush=True)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results",
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Results written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -2,41 +2,201 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
-from evals.validate import validate_output
-from agent.api import run_agent
-from agent.reasoning import create_compliance_agent
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
+from src.logger import logging
+from src.text_cache import file_sha256
+from evals.report import build_report
+from evals.validate import validate_output, load_ground_truth
+from agent.metrics import track_usage
+from agent.registry import agent_registry
+from agent.runner import load_document_pages, evaluate_pages, DOCUMENT_MODE
+from agent.templates import PolicyComplianceResponse
+from agent.verdict_cache import verdict_cache, VerdictCache, DiskVerdictBackend
 
-test_prompts = {
-    "test_1": "Does this contract have a termination clause?",
-    "test_2": "Is this contract compliant with GDPR laws?",
-}
 
+ROOT_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+EVALS_DIR = os.path.join(ROOT_DIR, "evals")
 
-def run_evaluation():
-    results = []
-    agent_executor = create_compliance_agent(llm_type="openai", model_name="gpt-4o")
-    test_contract = os.path.join(os.getcwd(), "tests", "test_contract.pdf")
+EVAL_MANIFEST = os.getenv("EVAL_MANIFEST", os.path.join(EVALS_DIR, "manifest.json"))
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "4"))
+EVAL_CACHE_DIR = os.getenv("EVAL_CACHE_DIR", os.path.join(EVALS_DIR, "cache"))
+EVAL_REPORT_DIR = os.path.join(EVALS_DIR, "reports")
 
-    for test_id, query in test_prompts.items():
-        structured_output = run_agent(
-            agent_executor,
-            query=query,
-            pdf_path=test_contract
+
+def _resolve(path: str, base_dir: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def load_manifest(manifest_path: str = EVAL_MANIFEST):
+    """
+    Read evaluation cases from a manifest.
+
+    The manifest lists named documents and the cases to run against them:
+    {"documents": {"name": "path.pdf"}, "cases": [{"id", "document", "query", "expected"?}]}.
+    A case's "document" is a document name or a path; paths are relative to the
+    repository root. Cases without "expected" take their verdict from the ground
+    truth file ("ground_truth", default evals/true_output.json) by id.
+
+    Returns:
+        list: Cases as dicts with id, query, pdf_path and true_verdict.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    documents = {name: _resolve(path, ROOT_DIR) for name, path in manifest.get("documents", {}).items()}
+    ground_truth = load_ground_truth(_resolve(manifest["ground_truth"], ROOT_DIR)) if "ground_truth" in manifest \
+        else load_ground_truth()
+
+    cases = []
+    for case in manifest["cases"]:
+        document = case["document"]
+        cases.append({
+            "id": case["id"],
+            "query": case["query"],
+            "pdf_path": documents.get(document) or _resolve(document, ROOT_DIR),
+            "true_verdict": case.get("expected") or ground_truth[case["id"]]["verdict"],
+        })
+    return cases
+
+
+class EvalCache:
+    """
+    Agent outputs from earlier evaluation runs, with their latency and token usage.
+
+    Entries are keyed like the verdict cache (document contents, policy version,
+    model, prompt version, document and execution mode, question), so changing any
+    of those re-runs the affected cases.
+    """
+
+    def __init__(self, cache_dir: str = EVAL_CACHE_DIR):
+        self.backend = DiskVerdictBackend(cache_dir)
+
+    @staticmethod
+    def key(agent_key, case) -> str:
+        llm_type, model_name, execution_mode = agent_key
+        scope = verdict_cache.scope_key(
+            file_sha256(case["pdf_path"]), llm_type, model_name, DOCUMENT_MODE, execution_mode
         )
-        validation_result = validate_output(test_id, structured_output)
-        validation_result.update({"test_query": query})
-        results.append(validation_result)
+        return VerdictCache.make_key(scope, case["query"])
+
+    def get(self, key: str):
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, None
+        return PolicyComplianceResponse.model_validate(entry["response"]), entry["run"]
 
-    return results
+    def put(self, key: str, structured_output, run: dict):
+        self.backend.put(key, {"response": structured_output.model_dump(), "run": run})
+
+
+def evaluate_case(agent_executor, case, cache: EvalCache = None):
+    """
+    Run one case (or take its output from the cache) and score it.
+    """
+    agent_key = agent_registry.key_for(agent_executor)
+    key = EvalCache.key(agent_key, case) if cache is not None and agent_key else None
+
+    structured_output, run = cache.get(key) if key else (None, None)
+    cached = structured_output is not None
+
+    if not cached:
+        start = time.perf_counter()
+        try:
+            # Straight to the agent: the API's verdict and semantic caches would turn
+            # cases into cache hits and skew latency and token figures
+            page_texts = load_document_pages(case["pdf_path"])
+            with track_usage() as usage:
+                structured_output = evaluate_pages(agent_executor, case["query"], page_texts)
+        except Exception as e:
+            logging.error(f"Evaluation case {case['id']} failed: {e}")
+            return {
+                "test_id": case["id"],
+                "test_query": case["query"],
+                "true_verdict": case["true_verdict"],
+                "pred_verdict": None,
+                "correct": False,
+                "confidence_score": None,
+                "error": str(e),
+            }
+        run = {"latency_seconds": time.perf_counter() - start, **usage.stats()}
+        if key:
+            cache.put(key, structured_output, run)
+
+    result = validate_output(case["id"], structured_output, true_verdict=case["true_verdict"])
+    result.update({"test_query": case["query"], "cached": cached, **run})
+    return result
+
+
+def run_evaluation(
+    manifest_path: str = EVAL_MANIFEST,
+    concurrency: int = EVAL_CONCURRENCY,
+    use_cache: bool = True,
+    llm_type: str = "openai",
+    model_name: str = "gpt-4o",
+    execution_mode: str = None,
+):
+    """
+    Run every case of a manifest, `concurrency` at a time.
+
+    Returns:
+        tuple: (per-case results in manifest order, report dict).
+    """
+    cases = load_manifest(manifest_path)
+    agent_executor = agent_registry.get(llm_type=llm_type, model_name=model_name, execution_mode=execution_mode)
+    cache = EvalCache() if use_cache else None
+
+    logging.info(f"Evaluating {len(cases)} cases with concurrency {concurrency}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        results = list(executor.map(lambda case: evaluate_case(agent_executor, case, cache), cases))
+    wall_seconds = time.perf_counter() - start
+
+    return results, build_report(results, wall_seconds)
 
 
 
 if __name__ == "__main__":
-    eval_results = run_evaluation()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--manifest", default=EVAL_MANIFEST, help="Evaluation manifest (JSON)")
+    arg_parser.add_argument("--concurrency", type=int, default=EVAL_CONCURRENCY, help="Cases run at the same time")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Re-run every case instead of reusing stored outputs")
+    arg_parser.add_argument("--llm-type", default="openai")
+    arg_parser.add_argument("--model-name", default="gpt-4o")
+    arg_parser.add_argument("--execution-mode", default=None, help="agent or pipeline (default: EXECUTION_MODE)")
+    arg_parser.add_argument("--output", default=None, help="Report path (default: evals/reports/<timestamp>.json)")
+    args = arg_parser.parse_args()
+
+    eval_results, report = run_evaluation(
+        manifest_path=args.manifest,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+        llm_type=args.llm_type,
+        model_name=args.model_name,
+        execution_mode=args.execution_mode,
+    )
     for result in eval_results:
         print(f"Test ID: {result['test_id']}")
         print(f"True Verdict: {result['true_verdict']}")
         print(f"Pred Verdict: {result['pred_verdict']}")
         print(f"Confidence Score: {result['confidence_score']}")
-        print("-" * 40)
\ No newline at end of file
+        if result.get("error"):
+            print(f"Error: {result['error']}")
+        print("-" * 40)
+
+    print(f"Accuracy: {report['correct']}/{report['cases']} ({report['accuracy']})")
+    print(f"Latency: {report['latency']}")
+    print(f"Tokens: {report['tokens']}")
+    print(f"Expected calibration error: {report['calibration']['expected_calibration_error']}")
+
+    output = args.output or os.path.join(
+        EVAL_REPORT_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"report": report, "results": eval_results}, f, indent=2)
+    print(f"Report written to {output}")
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def _percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values, dtype=float) * 1000
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 1),
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p90_ms": round(float(np.percentile(values, 90)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+        "max_ms": round(float(values.max()), 1),
+    }
+
+
+def calibration(results, bins: int = 5):
+    """
+    How well confidence scores predict correctness.
+
+    Returns:
+        dict: Per-bin counts, mean confidence and accuracy, the expected calibration
+            error (bin-weighted |accuracy - confidence|) and the Brier score.
+    """
+    scored = [r for r in results if r.get("confidence_score") is not None]
+    if not scored:
+        return {"bins": [], "expected_calibration_error": None, "brier_score": None}
+
+    confidence = np.array([r["confidence_score"] for r in scored], dtype=float)
+    correct = np.array([1.0 if r["correct"] else 0.0 for r in scored])
+    index = np.minimum((confidence * bins).astype(int), bins - 1)
+
+    rows = []
+    ece = 0.0
+    for b in range(bins):
+        mask = index == b
+        if not mask.any():
+            continue
+        mean_confidence = float(confidence[mask].mean())
+        accuracy = float(correct[mask].mean())
+        ece += mask.sum() / len(scored) * abs(accuracy - mean_confidence)
+        rows.append({
+            "range": [round(b / bins, 2), round((b + 1) / bins, 2)],
+            "count": int(mask.sum()),
+            "mean_confidence": round(mean_confidence, 3),
+            "accuracy": round(accuracy, 3),
+        })
+
+    return {
+        "bins": rows,
+        "expected_calibration_error": round(float(ece), 4),
+        "brier_score": round(float(np.mean((confidence - correct) ** 2)), 4),
+    }
+
+
+def build_report(results, wall_seconds: float = None):
+    """
+    Summarize evaluation results: accuracy, confusion counts, latency percentiles of
+    the cases that ran the agent, token usage and confidence calibration.
+    """
+    total = len(results)
+    errors = [r for r in results if r.get("error")]
+    fresh = [r for r in results if not r.get("cached") and not r.get("error")]
+
+    confusion = {}
+    for r in results:
+        if r.get("error"):
+            continue
+        row = confusion.setdefault(r["true_verdict"], {})
+        row[r["pred_verdict"]] = row.get(r["pred_verdict"], 0) + 1
+
+    prompt_tokens = sum(r.get("prompt_tokens", 0) for r in fresh)
+    completion_tokens = sum(r.get("completion_tokens", 0) for r in fresh)
+
+    return {
+        "cases": total,
+        "correct": sum(1 for r in results if r.get("correct")),
+        "accuracy": round(sum(1 for r in results if r.get("correct")) / total, 4) if total else None,
+        "errors": len(errors),
+        "cached": sum(1 for r in results if r.get("cached")),
+        "wall_seconds": round(wall_seconds, 2) if wall_seconds is not None else None,
+        "confusion": confusion,
+        "latency": _percentiles([r["latency_seconds"] for r in fresh]),
+        "tokens": {
+            "llm_calls": sum(r.get("llm_calls", 0) for r in fresh),
+            "prompt": prompt_tokens,
+            "completion": completion_tokens,
+            "mean_per_case": round((prompt_tokens + completion_tokens) / len(fresh), 1) if fresh else None,
+        },
+        "calibration": calibration([r for r in results if not r.get("error")]),
+    }
@@ -1,16 +1,35 @@
 import os
 import json
+import functools
 
 from src.utils import compute_confidence
 
 
-def validate_output(test_id: str, output: dict):
-    true_json_path = os.path.join(os.getcwd(), "evals", "true_output.json")
-    
-    with open(true_json_path) as f:
-        true_output = json.load(f)
+TRUE_OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "true_output.json")
 
-    true_verdict = true_output[test_id]["verdict"]
+
+@functools.lru_cache(maxsize=None)
+def load_ground_truth(path: str = TRUE_OUTPUT_PATH):
+    """
+    Expected verdicts keyed by test id, read once per file.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def validate_output(test_id: str, output: dict, ground_truth: dict = None, true_verdict: str = None):
+    """
+    Compare a structured agent response with the expected verdict.
+
+    Args:
+        test_id (str): Test case id.
+        output: PolicyComplianceResponse returned by the agent.
+        ground_truth (dict): Expected outputs by test id (default: true_output.json).
+        true_verdict (str): Expected verdict, overriding the ground truth lookup.
+    """
+    if true_verdict is None:
+        true_output = ground_truth if ground_truth is not None else load_ground_truth()
+        true_verdict = true_output[test_id]["verdict"]
 
     pred_verdict = output.compliance_status
     confidence_score = compute_confidence(output)
@@ -19,7 +38,6 @@ def validate_output(test_id: str, output: dict):
         "test_id": test_id,
         "true_verdict": true_verdict,
         "pred_verdict": pred_verdict,
+        "correct": pred_verdict.lower() == true_verdict.lower(),
         "confidence_score": confidence_score
     }
-
-
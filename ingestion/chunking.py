@@ -1,13 +1,40 @@
 import os
 import sys
 import uuid
+import hashlib
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import get_device, read_yaml, read_pdf
+from src.utils import get_device, read_yaml
+from src.text_cache import get_pdf_pages
+
+
+# Fixed namespace so that point IDs are stable across runs and machines
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c2d0e-7a43-4b59-9d1e-3c8a5b2f4e71")
+
+
+def chunk_id(source: str, section, index: int, content: str) -> str:
+    """
+    Deterministic point ID derived from (source file, page or category, chunk index, content hash).
+    The same chunk always maps to the same ID; any change to its text yields a new one.
+    """
+    content_hash = hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{source}|{section}|{index}|{content_hash}"))
+
+
+def source_name(path: str, root_dir: str = None) -> str:
+    """
+    Name recorded for a source file in chunk IDs, metadata and ingestion manifests:
+    its path relative to the ingestion root, so same-named files in different
+    subdirectories stay distinct. Without a root it is the file name. Files directly
+    in the root get the same name either way.
+    """
+    if root_dir is None:
+        return os.path.basename(path)
+    return os.path.relpath(path, root_dir).replace(os.sep, "/")
 
 
 class Chunker:
@@ -22,50 +49,49 @@ class Chunker:
             separators=["\n\n", "\n", ".", " ", ""]
         )
     
-    def parse_contracts(self, pdf_path):
+    def parse_contracts(self, pdf_path, source: str = None):
         try:
             texts = []
             metadatas = []
             ids = []
 
-            reader_pages = read_pdf(pdf_path)
-            for i, page in enumerate(reader_pages):
-                text = page.extract_text()
+            source = source or source_name(pdf_path)
+            page_texts = get_pdf_pages(pdf_path)
+            for i, text in enumerate(page_texts):
                 if text:
                     chunks = self.splitter.split_text(text)
                     for idx, chunk in enumerate(chunks):
                         texts.append(chunk)
-                        metadatas.append({"page": i, "chunk": idx, "source": os.path.basename(pdf_path)})
-                        # ids.append(f"{os.path.basename(pdf_path)}_page{i}_chunk{idx}")
-            # ids = [i for i in range(len(texts))]
-            ids = [str(uuid.uuid4()) for i in range(len(texts))]
+                        metadatas.append({"page": i, "chunk": idx, "source": source})
+                        ids.append(chunk_id(source, i, idx, chunk))
 
             return texts, metadatas, ids
         
         except Exception as e:
             raise CustomException(e, sys)
 
-    def parse_policies(self, yaml_path):
+    def parse_policies(self, yaml_path, source: str = None):
         try:
             texts = []
             metadatas = []
             ids = []
 
+            source_file = source or source_name(yaml_path)
             data = read_yaml(yaml_path)
 
             for policy_category, rules in data.items():
-                for rule in rules:
+                for idx, rule in enumerate(rules):
                     content = rule.get("content")
                     metadata = rule.get("metadata", {}).copy()
 
                     metadata.update({
-                        "source_file": os.path.basename(yaml_path),
+                        "source_file": source_file,
                         "policy_category": policy_category,
                     })
 
                     texts.append(content)
                     metadatas.append(metadata)
-                    ids.append(str(uuid.uuid4()))
+                    ids.append(chunk_id(source_file, policy_category, idx, content))
 
             return texts, metadatas, ids
 
@@ -1,56 +1,84 @@
 import os
 import sys
+import argparse
 from tqdm import tqdm
-from qdrant_client import QdrantClient
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
 from dotenv import load_dotenv
 
 from ingestion.chunking import Chunker
 from ingestion.embed_upsert import EmbedUpsert
+from ingestion.streaming import StreamingPipeline
+from ingestion.parallel import parse_files
+from ingestion.incremental import IngestionManifest, get_manifest_path, ingest_incremental
 from src.exception import CustomException
-from src.utils import get_next_collection_name
+from src.qdrant_pool import qdrant_pool
+from src.utils import get_next_collection_name, get_current_collection_name
 
 
 load_dotenv()
 
 
 class ContractIngestor:
-    def __init__(self):
-        qdrant_url = os.getenv("QDRANT_URL")
-        qdrant_api_key = os.getenv("QDRANT_API_KEY")
+    def __init__(self, incremental: bool = False, workers: int = None):
         base_name = os.getenv("CONTRACT_COLLECTION_BASENAME")
         
         # Qdrant setup
-        self.client = QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key
-            )
+        self.client = qdrant_pool.client()
         
-        self.collection_name = get_next_collection_name(self.client, base_name)
+        # Incremental runs update the latest collection in place instead of writing a new version
+        self.incremental = incremental
+        if incremental:
+            self.collection_name = get_current_collection_name(self.client, base_name)
+            self.manifest = IngestionManifest(get_manifest_path(base_name))
+        else:
+            self.collection_name = get_next_collection_name(self.client, base_name)
         self.contracts_dir = os.path.join(os.getcwd(), base_name)
         self.chunker = Chunker()
+        self.workers = workers
         self.embed_upsert = EmbedUpsert(self.client)
 
+    def list_contract_files(self):
+        return sorted(
+            os.path.join(root, file)
+            for root, dirs, files in os.walk(self.contracts_dir)
+            for file in files
+            if file.endswith((".pdf", ".PDF"))
+        )
+
+    def iter_contracts(self):
+        """
+        Yields (texts, metadatas, ids) for every contract file, in file order, parsed by the worker pool.
+        """
+        pdf_paths = self.list_contract_files()
+        results = parse_files(pdf_paths, "contracts", workers=self.workers, root_dir=self.contracts_dir)
+        yield from tqdm(results, total=len(pdf_paths), desc="Processing contract files")
+
     def run_pipeline(self):
-        try:
-            texts_list = []
-            metadatas_list = []
-            ids_list = []
+        if self.incremental:
+            return self.run_incremental()
 
-            for root, dirs, files in os.walk(self.contracts_dir):
-                for file in tqdm(files, total=len(files), desc="Processing contract files"):
-                    if file.endswith((".pdf", ".PDF")):
-                        pdf_path = os.path.join(root, file)
+        try:
+            pipeline = StreamingPipeline(self.embed_upsert, self.collection_name)
+            return pipeline.run(self.iter_contracts())
 
-                        texts, metadatas, ids = self.chunker.parse_contracts(pdf_path)
+        except Exception as e:
+            raise CustomException(e, sys)
 
-                        texts_list.extend(texts)
-                        metadatas_list.extend(metadatas)
-                        ids_list.extend(ids)
+    def run_incremental(self):
+        try:
+            pdf_paths = self.list_contract_files()
 
-            embedings = self.embed_upsert.get_embeddings(texts_list)
-            self.embed_upsert.upsert(texts_list, metadatas_list, ids_list, embedings, self.collection_name)
+            return ingest_incremental(
+                self.client,
+                self.embed_upsert,
+                self.collection_name,
+                pdf_paths,
+                self.chunker.parse_contracts,
+                self.manifest,
+                source_key="source",
+                root_dir=self.contracts_dir,
+            )
 
         except Exception as e:
             raise CustomException(e, sys)
@@ -58,5 +86,19 @@ class ContractIngestor:
 
 
 if __name__ == "__main__":
-    ingestor = ContractIngestor()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only upsert new or changed chunks into the latest collection and delete removed ones",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of parser processes (defaults to INGESTION_WORKERS or the CPU count)",
+    )
+    args = arg_parser.parse_args()
+
+    ingestor = ContractIngestor(incremental=args.incremental, workers=args.workers)
     ingestor.run_pipeline()    
\ No newline at end of file
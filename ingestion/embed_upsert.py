@@ -2,13 +2,18 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from qdrant_client import models as qmodels
 
 from src.exception import CustomException
 from src.logger import logging
+from src.qdrant_pool import qdrant_pool
 from src.utils import get_embedding_model
+from ingestion.embedding_store import EmbeddingStore
 
 
 load_dotenv()
@@ -17,22 +22,66 @@ load_dotenv()
 class EmbedUpsert:
     """
     Handles embedding generation and batched upserts into Qdrant.
+
+    Embeddings are read through a persistent EmbeddingStore (EMBEDDING_STORE_DIR,
+    set it to an empty string to disable), so unchanged chunks are never re-encoded.
+    The embedding model is loaded the first time something has to be encoded, so
+    runs served entirely from the store never load it.
     """
 
-    def __init__(self, client):
-        self.client = client
-        self.model = get_embedding_model()
+    def __init__(self, client=None, model_name: str = "all-MiniLM-L6-v2", store_dir: str = None):
+        self.client = client or qdrant_pool.client()
+        self.model_name = model_name
+        self.model = None
+        self._model_lock = threading.Lock()
+
+        if store_dir is None:
+            store_dir = os.getenv("EMBEDDING_STORE_DIR", os.path.join(os.getcwd(), "embedding_store"))
+        self.store = EmbeddingStore(store_dir, model_name) if store_dir else None
+        self._shard_counts = {}
+
+    def _encode(self, texts: List[str]):
+        if self.model is None:
+            with self._model_lock:
+                if self.model is None:
+                    self.model = get_embedding_model(self.model_name)
+
+        return self.model.encode(
+            texts,
+            show_progress_bar=True,
+            batch_size=32,
+        )
 
     def get_embeddings(self, texts: List[str]):
         """
-        Generate embeddings for a list of texts.
+        Generate embeddings for a list of texts, encoding only those not already stored.
         """
         try:
-            return self.model.encode(
-                texts,
-                show_progress_bar=True,
-                batch_size=32,
-            )
+            if self.store is None:
+                return self._encode(texts)
+
+            keys = [self.store.key(text) for text in texts]
+            found = self.store.lookup(keys)
+
+            # Encode each missing text once, even if it occurs several times
+            missing = {}
+            for i, key in enumerate(keys):
+                if i not in found:
+                    missing.setdefault(key, i)
+
+            logging.info(f"Embedding store: {len(found)} hits, {len(missing)} texts to encode")
+
+            if missing:
+                miss_keys = list(missing)
+                encoded = self._encode([texts[missing[key]] for key in miss_keys])
+                self.store.add(miss_keys, encoded)
+                found.update(self.store.lookup(keys))
+
+            if not texts:
+                return np.empty((0, self.store.dim or 0), dtype=np.float32)
+
+            return np.vstack([found[i] for i in range(len(texts))]).astype(np.float32, copy=False)
+
         except Exception as e:
             raise CustomException(e, sys)
 
@@ -53,6 +102,36 @@ class EmbedUpsert:
 
         logging.info(f"Created collection: {collection_name}")
 
+    def _shard_count(self, collection_name: str) -> int:
+        """
+        Number of shards of a collection (1 in local mode), looked up once per collection.
+        """
+        if collection_name not in self._shard_counts:
+            params = self.client.get_collection(collection_name).config.params
+            self._shard_counts[collection_name] = params.shard_number or 1
+        return self._shard_counts[collection_name]
+
+    def _build_batch(self, texts, metadatas, ids, embeddings, collection_name, start, end):
+        """
+        Build one columnar batch: ids, vectors and payloads as parallel lists,
+        avoiding a PointStruct per point. The vector slice is converted in one call.
+        """
+        return qmodels.Batch(
+            ids=ids[start:end],
+            vectors=embeddings[start:end].tolist(),
+            payloads=[
+                {
+                    "text": texts[i],
+                    "metadata": {
+                        **metadatas[i],
+                        "collection_version": collection_name,
+                        "active": True,
+                    },
+                }
+                for i in range(start, end)
+            ],
+        )
+
     def upsert(
         self,
         texts: List[str],
@@ -61,44 +140,62 @@ class EmbedUpsert:
         embeddings,
         collection_name: str,
         batch_size: int = 100,
+        parallel: int = None,
+        wait: bool = True,
     ):
         """
         Upsert embeddings into Qdrant in safe, bounded batches.
+
+        Batches are sent concurrently by `parallel` threads (UPSERT_PARALLELISM) with
+        wait=False, so the server acknowledges them once they are in its write-ahead log.
+        The final batch acts as a consistency barrier: it is sent after every other
+        batch has been acknowledged, with `wait`, and since updates to a shard are
+        applied in order, all points are searchable when it returns. That ordering only
+        holds per shard, so for collections with more than one shard every batch is
+        sent with `wait`.
         """
         try:
+            if not ids:
+                return
+
+            if parallel is None:
+                parallel = int(os.getenv("UPSERT_PARALLELISM", "4"))
+
+            embeddings = np.asarray(embeddings, dtype=np.float32)
             vector_size = embeddings.shape[1]
             self._ensure_collection(collection_name, vector_size)
 
             total_points = len(ids)
+            ranges = [
+                (start, min(start + batch_size, total_points))
+                for start in range(0, total_points, batch_size)
+            ]
 
-            for start in range(0, total_points, batch_size):
-                end = min(start + batch_size, total_points)
-
-                points = [
-                    qmodels.PointStruct(
-                        id=ids[i],
-                        vector=embeddings[i].tolist(),
-                        payload={
-                        "text": texts[i],
-                        "metadata": {
-                            **metadatas[i],
-                            "collection_version": collection_name,
-                            "active": True,
-                        },
-                    },
-                    )
-                    for i in range(start, end)
-                ]
+            # The last batch only waits for the shards it touches
+            head_wait = wait and self._shard_count(collection_name) > 1
 
+            def send(start, end, wait_for_apply):
                 self.client.upsert(
                     collection_name=collection_name,
-                    points=points,
+                    points=self._build_batch(texts, metadatas, ids, embeddings, collection_name, start, end),
+                    wait=wait_for_apply,
                 )
 
+            head, (last_start, last_end) = ranges[:-1], ranges[-1]
+            if parallel > 1 and len(head) > 1:
+                with ThreadPoolExecutor(max_workers=parallel) as executor:
+                    futures = [executor.submit(send, start, end, head_wait) for start, end in head]
+                    for future in futures:
+                        future.result()
+            else:
+                for start, end in head:
+                    send(start, end, head_wait)
+
+            send(last_start, last_end, wait)
+
             logging.info(
                 f"Upserted {total_points} points into collection '{collection_name}'"
             )
 
         except Exception as e:
             raise CustomException(e, sys)
- 
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import hashlib
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+import numpy as np
+
+from src.logger import logging
+
+
+class EmbeddingStore:
+    """
+    Persistent, append-only store of chunk embeddings for one embedding model.
+
+    Layout of `<store_dir>/<model_name>/`:
+        meta.json    - model name and vector dimension
+        vectors.f32  - float32 row-major matrix, read through a numpy memmap
+        index.tsv    - one "<sha256(model_name, text)>\t<row>" line per stored vector
+
+    Vectors are written before their index lines, so an interrupted run can leave
+    unreferenced rows behind but never an index entry without a vector. If
+    vectors.f32 is truncated anyway (disk full, partial copy), index entries past
+    its end are dropped on load and a trailing partial row is cut off before the
+    next append, so the affected texts are simply re-encoded. The store assumes a
+    single writer per directory.
+    """
+
+    def __init__(self, store_dir: str, model_name: str):
+        self.model_name = model_name
+        self.dir = os.path.join(store_dir, model_name.replace("/", "__"))
+        os.makedirs(self.dir, exist_ok=True)
+
+        self.meta_path = os.path.join(self.dir, "meta.json")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.index_path = os.path.join(self.dir, "index.tsv")
+
+        self.dim = None
+        self._index = {}
+        self._vectors = None
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                for line in f:
+                    key, _, row = line.rstrip("\n").partition("\t")
+                    if row:
+                        self._index[key] = int(row)
+
+        rows = self._rows_on_disk()
+        stale = [key for key, row in self._index.items() if row >= rows]
+        if stale:
+            logging.warning(f"{len(stale)} embedding index entries in {self.dir} point past the end of vectors.f32; dropping them")
+            for key in stale:
+                del self._index[key]
+            # Rewrite the index so rows appended later are not matched to the dropped keys
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.writelines(f"{key}\t{row}\n" for key, row in self._index.items())
+            os.replace(tmp_path, self.index_path)
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _rows_on_disk(self):
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _matrix(self):
+        if self._vectors is None:
+            rows = self._rows_on_disk()
+            if rows == 0:
+                return None
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._vectors
+
+    def __len__(self):
+        return len(self._index)
+
+    def lookup(self, keys):
+        """
+        Find stored vectors for the given keys.
+
+        Returns:
+            dict: Position in `keys` -> stored vector, for every key that is present.
+        """
+        matrix = self._matrix()
+        if matrix is None:
+            return {}
+
+        found = {}
+        for i, key in enumerate(keys):
+            row = self._index.get(key)
+            # Rows beyond the mapped matrix (a truncated vectors.f32) are misses
+            if row is not None and row < len(matrix):
+                found[i] = matrix[row]
+        return found
+
+    def add(self, keys, vectors):
+        """
+        Append vectors for keys that are not stored yet.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, "w") as f:
+                json.dump({"model_name": self.model_name, "dim": self.dim}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+        new_rows = [i for i, key in enumerate(keys) if key not in self._index]
+        if not new_rows:
+            return
+
+        start_row = self._rows_on_disk()
+        # Cut off a partially written trailing row so new rows stay aligned
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != start_row * self.dim * 4:
+            os.truncate(self.vectors_path, start_row * self.dim * 4)
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors[new_rows].tobytes())
+
+        with open(self.index_path, "a") as f:
+            for offset, i in enumerate(new_rows):
+                self._index[keys[i]] = start_row + offset
+                f.write(f"{keys[i]}\t{start_row + offset}\n")
+
+        # Remap on next lookup so the new rows are visible
+        self._vectors = None
+        logging.info(f"Stored {len(new_rows)} new embeddings in {self.dir}")
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import hashlib
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from qdrant_client import models as qmodels
+
+from src.logger import logging
+from src.text_cache import file_sha256
+from src.collection_revision import set_collection_revision
+from ingestion.chunking import source_name
+
+
+def get_manifest_path(base_name: str) -> str:
+    manifest_dir = os.getenv("INGESTION_MANIFEST_DIR", os.path.join(os.getcwd(), "manifests"))
+    return os.path.join(manifest_dir, f"{base_name}.json")
+
+
+class IngestionManifest:
+    """
+    Record of what has been ingested into a collection: for every source file, the
+    SHA-256 of its contents and the point IDs it produced.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.collection_name = None
+        self.files = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.collection_name = data.get("collection_name")
+            self.files = data.get("files", {})
+
+    def revision(self) -> str:
+        """
+        Digest of every file's content hash and point IDs: identifies the content of the collection.
+        """
+        files = {source: [entry.get("sha256"), sorted(entry["ids"])] for source, entry in self.files.items()}
+        return hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"collection_name": self.collection_name, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+
+def load_files_from_collection(client, collection_name: str, source_key: str, batch_size: int = 1000):
+    """
+    Rebuild manifest file entries from the points stored in a collection.
+
+    Used when no local manifest matches the collection (e.g. on a fresh CI runner).
+    File hashes are unknown, so every file is re-parsed once, but chunks whose IDs
+    are already stored are not re-embedded or re-uploaded.
+    """
+    files = {}
+    if not client.collection_exists(collection_name):
+        return files
+
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["metadata"],
+            with_vectors=False,
+        )
+        for point in points:
+            source = (point.payload or {}).get("metadata", {}).get(source_key)
+            if source is not None:
+                files.setdefault(source, {"sha256": None, "ids": []})["ids"].append(str(point.id))
+        if offset is None:
+            break
+
+    return files
+
+
+def ingest_incremental(client, embed_upsert, collection_name, paths, parse_fn, manifest, source_key, root_dir=None):
+    """
+    Bring a collection in line with the given source files, touching only what changed.
+
+    Unchanged files (same content hash) are skipped. For changed files only chunks
+    with new IDs are embedded and upserted, and IDs the file no longer produces are
+    deleted. Files that disappeared from the source directory have their points removed.
+    When any point changed, the collection's revision marker (src.collection_revision)
+    is set to the manifest's digest, so caches keyed on the collection version are retired.
+
+    Args:
+        client: Qdrant client.
+        embed_upsert (EmbedUpsert): Embedding and upsert helper.
+        collection_name (str): Collection to update in place.
+        paths (list): Source file paths.
+        parse_fn (callable): Chunker method returning (texts, metadatas, ids) for (path, source).
+        manifest (IngestionManifest): Manifest of the previous run, updated in place.
+        source_key (str): Metadata key holding the source file name.
+        root_dir (str, optional): Ingestion root; files are keyed by their path relative to it.
+
+    Returns:
+        dict: Counts of skipped, changed and removed files and of upserted and deleted points,
+        and the collection revision.
+    """
+    if manifest.collection_name != collection_name:
+        manifest.files = load_files_from_collection(client, collection_name, source_key)
+        manifest.collection_name = collection_name
+
+    texts_list = []
+    metadatas_list = []
+    ids_list = []
+    stale_ids = []
+    updated_files = {}
+    skipped = 0
+
+    for path in paths:
+        source = source_name(path, root_dir)
+        file_hash = file_sha256(path)
+        entry = manifest.files.get(source)
+
+        if entry and entry.get("sha256") == file_hash:
+            updated_files[source] = entry
+            skipped += 1
+            continue
+
+        texts, metadatas, ids = parse_fn(path, source)
+        old_ids = set(entry["ids"]) if entry else set()
+
+        for text, metadata, point_id in zip(texts, metadatas, ids):
+            if point_id not in old_ids:
+                texts_list.append(text)
+                metadatas_list.append(metadata)
+                ids_list.append(point_id)
+
+        stale_ids.extend(old_ids - set(ids))
+        updated_files[source] = {"sha256": file_hash, "ids": ids}
+
+    removed_files = [source for source in manifest.files if source not in updated_files]
+    for source in removed_files:
+        stale_ids.extend(manifest.files[source]["ids"])
+
+    if ids_list:
+        embeddings = embed_upsert.get_embeddings(texts_list)
+        embed_upsert.upsert(texts_list, metadatas_list, ids_list, embeddings, collection_name)
+
+    if stale_ids:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=qmodels.PointIdsList(points=stale_ids),
+        )
+
+    manifest.files = updated_files
+    manifest.save()
+
+    revision = manifest.revision()
+    if ids_list or stale_ids:
+        set_collection_revision(client, collection_name, revision)
+
+    summary = {
+        "files_skipped": skipped,
+        "files_changed": len(updated_files) - skipped,
+        "files_removed": len(removed_files),
+        "points_upserted": len(ids_list),
+        "points_deleted": len(stale_ids),
+        "revision": revision,
+    }
+    logging.info(f"Incremental ingestion into '{collection_name}': {summary}")
+
+    return summary
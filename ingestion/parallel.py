@@ -0,0 +1,97 @@
+import os
+import sys
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from ingestion.chunking import Chunker, source_name
+
+
+_chunker = None
+
+
+def _init_worker():
+    # Files are already spread across processes, so don't fan pages of a single
+    # PDF out to a second level of process pools from inside a worker: each worker
+    # would start its own PDF_EXTRACTION_WORKERS pool, oversubscribing the CPUs
+    # workers x PDF_EXTRACTION_WORKERS times over. extract_pdf_pages() reads the
+    # threshold at call time, and no document has sys.maxsize pages, so every PDF
+    # is extracted in the worker itself.
+    import src.pdf_extraction
+    src.pdf_extraction.PARALLEL_PAGE_THRESHOLD = sys.maxsize
+
+
+def _parse(kind, path, source):
+    global _chunker
+    if _chunker is None:
+        _chunker = Chunker()
+
+    if kind == "contracts":
+        return _chunker.parse_contracts(path, source)
+    if kind == "policies":
+        return _chunker.parse_policies(path, source)
+    raise ValueError(f"Unknown document kind: {kind}")
+
+
+def _parse_chunk(kind, items):
+    results = []
+    for path, source in items:
+        try:
+            results.append(_parse(kind, path, source))
+        except Exception as e:
+            # CustomException cannot be pickled back to the parent process
+            raise RuntimeError(f"Failed to parse {path}: {e}") from None
+    return results
+
+
+def parse_files(paths, kind: str, workers: int = None, chunksize: int = None, root_dir: str = None):
+    """
+    Parse and split source files across a pool of worker processes.
+
+    Paths are distributed in chunks of `chunksize` files, with at most two chunks
+    per worker in flight so memory stays bounded, and results are yielded in input
+    order regardless of which worker finishes first.
+
+    Args:
+        paths (list): File paths to parse.
+        kind (str): "contracts" (PDF) or "policies" (YAML).
+        workers (int): Number of worker processes (INGESTION_WORKERS, defaults to CPU count).
+        chunksize (int): Files per task (INGESTION_PARSE_CHUNKSIZE).
+        root_dir (str, optional): Ingestion root; sources are named by their path relative to it.
+
+    Yields:
+        tuple: (texts, metadatas, ids) for each path.
+    """
+    items = [(path, source_name(path, root_dir)) for path in paths]
+    if workers is None:
+        workers = int(os.getenv("INGESTION_WORKERS", str(os.cpu_count() or 1)))
+    workers = max(1, min(workers, len(items)))
+
+    if workers == 1:
+        for path, source in items:
+            yield _parse(kind, path, source)
+        return
+
+    if chunksize is None:
+        chunksize = int(os.getenv("INGESTION_PARSE_CHUNKSIZE", "0")) or max(1, min(16, len(items) // (workers * 4)))
+
+    chunks = iter([items[i:i + chunksize] for i in range(0, len(items), chunksize)])
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_chunk, kind, chunk))
+            if len(pending) >= workers * 2:
+                break
+
+        while pending:
+            results = pending.popleft().result()
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(_parse_chunk, kind, next_chunk))
+            yield from results
@@ -0,0 +1,124 @@
+import os
+import sys
+import queue
+import threading
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from src.logger import logging
+
+
+_DONE = object()
+
+
+class StreamingPipeline:
+    """
+    Parse -> embed -> upsert pipeline with overlapping stages and bounded memory.
+
+    Parsed chunks are grouped into batches of `batch_size` texts. Embedding and
+    upserting each run in their own thread, connected by queues holding at most
+    `queue_size` batches, so only a few batches are ever held in memory and uploads
+    to Qdrant overlap with encoding. If a stage fails, the other stages drain their
+    queues and the first error is raised from run().
+    """
+
+    def __init__(self, embed_upsert, collection_name: str, batch_size: int = None, queue_size: int = None):
+        self.embed_upsert = embed_upsert
+        self.collection_name = collection_name
+        self.batch_size = batch_size or int(os.getenv("INGESTION_BATCH_SIZE", "256"))
+        self.queue_size = queue_size or int(os.getenv("INGESTION_QUEUE_SIZE", "4"))
+
+        self._errors = []
+        self._stop = threading.Event()
+        self.points_upserted = 0
+
+    def _fail(self, error):
+        self._errors.append(error)
+        self._stop.set()
+
+    def _embed_stage(self, embed_queue, upsert_queue):
+        while True:
+            batch = embed_queue.get()
+            if batch is _DONE:
+                break
+            if self._stop.is_set():
+                continue
+            try:
+                texts, metadatas, ids = batch
+                embeddings = self.embed_upsert.get_embeddings(texts)
+                upsert_queue.put((texts, metadatas, ids, embeddings))
+            except Exception as e:
+                self._fail(e)
+        upsert_queue.put(_DONE)
+
+    def _upsert_stage(self, upsert_queue):
+        while True:
+            batch = upsert_queue.get()
+            if batch is _DONE:
+                break
+            if self._stop.is_set():
+                continue
+            try:
+                texts, metadatas, ids, embeddings = batch
+                self.embed_upsert.upsert(texts, metadatas, ids, embeddings, self.collection_name)
+                self.points_upserted += len(ids)
+            except Exception as e:
+                self._fail(e)
+
+    def run(self, documents):
+        """
+        Stream parsed documents through embedding and upserting.
+
+        Args:
+            documents (iterable): Yields (texts, metadatas, ids) per source file.
+
+        Returns:
+            int: Number of points upserted.
+        """
+        self._errors = []
+        self._stop.clear()
+        self.points_upserted = 0
+
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        upsert_queue = queue.Queue(maxsize=self.queue_size)
+
+        embed_thread = threading.Thread(target=self._embed_stage, args=(embed_queue, upsert_queue), daemon=True)
+        upsert_thread = threading.Thread(target=self._upsert_stage, args=(upsert_queue,), daemon=True)
+        embed_thread.start()
+        upsert_thread.start()
+
+        texts_batch, metadatas_batch, ids_batch = [], [], []
+        try:
+            for texts, metadatas, ids in documents:
+                if self._stop.is_set():
+                    break
+                texts_batch.extend(texts)
+                metadatas_batch.extend(metadatas)
+                ids_batch.extend(ids)
+
+                while len(texts_batch) >= self.batch_size:
+                    embed_queue.put((
+                        texts_batch[:self.batch_size],
+                        metadatas_batch[:self.batch_size],
+                        ids_batch[:self.batch_size],
+                    ))
+                    texts_batch = texts_batch[self.batch_size:]
+                    metadatas_batch = metadatas_batch[self.batch_size:]
+                    ids_batch = ids_batch[self.batch_size:]
+
+            if texts_batch and not self._stop.is_set():
+                embed_queue.put((texts_batch, metadatas_batch, ids_batch))
+
+        except Exception as e:
+            self._fail(e)
+
+        finally:
+            embed_queue.put(_DONE)
+            embed_thread.join()
+            upsert_thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        logging.info(f"Streamed {self.points_upserted} points into collection '{self.collection_name}'")
+
+        return self.points_upserted
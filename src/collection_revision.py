@@ -0,0 +1,62 @@
+import os
+import time
+import uuid
+
+from src.logger import logging
+
+
+# Collection holding one marker point per content collection. Kept apart from the
+# collections it describes so the markers never show up in similarity searches.
+REVISION_COLLECTION = os.getenv("COLLECTION_REVISION_COLLECTION", "collection_revisions")
+
+_REVISION_NAMESPACE = uuid.UUID("0b7e4c1a-5d2f-4e8b-9a63-2f1d7c4e8a90")
+
+
+def _marker_id(collection_name: str) -> str:
+    return str(uuid.uuid5(_REVISION_NAMESPACE, collection_name))
+
+
+def get_collection_revision(client, collection_name: str):
+    """
+    Returns the content revision recorded for a collection, or None if it has never
+    been updated in place.
+    """
+    if not client.collection_exists(REVISION_COLLECTION):
+        return None
+
+    points = client.retrieve(
+        collection_name=REVISION_COLLECTION,
+        ids=[_marker_id(collection_name)],
+        with_payload=True,
+        with_vectors=False,
+    )
+    if not points:
+        return None
+    return (points[0].payload or {}).get("revision")
+
+
+def set_collection_revision(client, collection_name: str, revision: str):
+    """
+    Record a new content revision for a collection whose points were changed in place,
+    so anything keyed on the collection version (e.g. the verdict cache) sees the change.
+    """
+    from qdrant_client.http import models as qmodels
+
+    if not client.collection_exists(REVISION_COLLECTION):
+        client.create_collection(
+            collection_name=REVISION_COLLECTION,
+            vectors_config=qmodels.VectorParams(size=1, distance=qmodels.Distance.DOT),
+        )
+
+    client.upsert(
+        collection_name=REVISION_COLLECTION,
+        points=[
+            qmodels.PointStruct(
+                id=_marker_id(collection_name),
+                vector=[1.0],
+                payload={"collection_name": collection_name, "revision": revision, "updated_at": time.time()},
+            )
+        ],
+        wait=True,
+    )
+    logging.info(f"Collection '{collection_name}' is now at revision {revision[:12]}")
@@ -0,0 +1,127 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise text for use as a cache key: trim and collapse whitespace.
+    """
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of embeddings keyed by (model name, normalised text).
+
+    Entries expire `ttl` seconds after they are stored (0 disables expiry). Cached
+    vectors are read-only numpy arrays shared between callers.
+    """
+
+    def __init__(self, max_size: int = None, ttl: float = None):
+        if max_size is None:
+            max_size = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+        if ttl is None:
+            ttl = float(os.getenv("EMBEDDING_CACHE_TTL", "3600"))
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, model_name: str, text: str):
+        """
+        Return the cached embedding, or None on a miss.
+        """
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, vector):
+        if self.max_size <= 0:
+            return
+
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            self._entries[key] = (vector, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def encode(self, model, texts, model_name: str):
+        """
+        Encode one text or a list of texts, only sending cache misses to the model.
+
+        Args:
+            model: Embedding model exposing SentenceTransformer's encode().
+            texts (str | list): Text or texts to embed.
+            model_name (str): Name of the model, used as part of the cache key.
+
+        Returns:
+            np.ndarray: A vector for a single text, or a matrix with one row per text.
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        vectors = [self.get(model_name, text) for text in texts]
+
+        misses = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                misses.setdefault(normalize_text(texts[i]), []).append(i)
+
+        if misses:
+            miss_texts = list(misses)
+            encoded = model.encode(miss_texts)
+            for text, vector in zip(miss_texts, encoded):
+                self.put(model_name, text, vector)
+                for i in misses[text]:
+                    vectors[i] = vector
+
+        if single:
+            return np.asarray(vectors[0])
+        return np.vstack(vectors)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+query_embedding_cache = EmbeddingCache()
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import threading
+from dotenv import load_dotenv
+
+from src.logger import logging
+
+
+load_dotenv()
+
+
+class LLMHttpPool:
+    """
+    HTTP connection pools shared by every LLM client in the process.
+
+    Clients built by the registry reuse these keep-alive connections instead of
+    opening their own, so TLS handshakes are paid once per connection rather than
+    per client. httpx is imported when the first pool is created.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        timeout: float = None,
+    ):
+        self.max_connections = max_connections or int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+        self.timeout = timeout or float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+
+    def limits(self):
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client(self):
+        """
+        Returns the shared httpx.Client, creating it on first use.
+        """
+        if self._client is None:
+            import httpx
+
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(limits=self.limits(), timeout=self.timeout)
+        return self._client
+
+    def async_client(self):
+        """
+        Returns the shared httpx.AsyncClient. Its connections belong to the event
+        loop that first uses them, i.e. the ASGI server's loop.
+        """
+        if self._async_client is None:
+            import httpx
+
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(limits=self.limits(), timeout=self.timeout)
+        return self._async_client
+
+    def stats(self):
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "timeout": self.timeout,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._async_client = None
+
+    async def aclose(self):
+        async_client = self._async_client
+        self.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+
+def build_openai(model_name: str, http_pool: LLMHttpPool, **params):
+    from langchain_openai import ChatOpenAI
+
+    params.setdefault("openai_api_key", os.getenv("OPENAI_API_KEY"))
+    params.setdefault("max_retries", int(os.getenv("LLM_MAX_RETRIES", "2")))
+    return ChatOpenAI(
+        model_name=model_name,
+        http_client=http_pool.client(),
+        http_async_client=http_pool.async_client(),
+        **params,
+    )
+
+
+def build_openai_compatible(model_name: str, http_pool: LLMHttpPool, **params):
+    """
+    Any server exposing the OpenAI chat completions API (vLLM, llama.cpp, LM Studio, ...).
+    """
+    params.setdefault("base_url", os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8080/v1"))
+    params.setdefault("openai_api_key", os.getenv("LOCAL_LLM_API_KEY", "not-needed"))
+    return build_openai(model_name, http_pool, **params)
+
+
+def build_ollama(model_name: str, http_pool: LLMHttpPool, **params):
+    from langchain_ollama import OllamaLLM
+
+    if os.getenv("OLLAMA_BASE_URL"):
+        params.setdefault("base_url", os.getenv("OLLAMA_BASE_URL"))
+    # The ollama client builds its own httpx clients; give them the same limits
+    params.setdefault("client_kwargs", {"limits": http_pool.limits(), "timeout": http_pool.timeout})
+    return OllamaLLM(model=model_name, **params)
+
+
+class LLMRegistry:
+    """
+    Process-wide, thread-safe cache of LLM clients keyed by (llm_type, model_name, params).
+
+    Only the requested provider is imported and built, once per key. Providers are
+    builder functions `builder(model_name, http_pool, **params)`; register() adds
+    new ones. Clients are wrapped for record/replay (src.replay) when they are built.
+    """
+
+    def __init__(self, http_pool: LLMHttpPool = None):
+        self.http_pool = http_pool or LLMHttpPool()
+        self._lock = threading.Lock()
+        self._builders = {
+            "openai": build_openai,
+            "openai_compatible": build_openai_compatible,
+            "ollama": build_ollama,
+        }
+        self._llms = {}
+        self._stats = {}
+
+    def register(self, llm_type: str, builder):
+        """
+        Add or replace a provider. Clients already built for it are dropped.
+        """
+        with self._lock:
+            self._builders[llm_type] = builder
+            for key in [k for k in self._llms if k[0] == llm_type]:
+                del self._llms[key]
+                del self._stats[key]
+
+    def providers(self):
+        return sorted(self._builders)
+
+    def get(self, llm_type: str = "openai", model_name: str = "gpt-4o", **params):
+        """
+        Return the client for (llm_type, model_name, params), building it on first use.
+
+        Args:
+            llm_type (str): Provider name ("openai", "openai_compatible", "ollama" or a registered one).
+            model_name (str): The name of the model to use.
+            **params: Extra constructor arguments (temperature, base_url, ...).
+        """
+        from src.replay import wrap_llm
+
+        key = (llm_type, model_name, json.dumps(params, sort_keys=True, default=str))
+
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                builder = self._builders.get(llm_type)
+                if builder is None:
+                    raise ValueError(f"Unknown LLM type: {llm_type} (available: {', '.join(self.providers())})")
+
+                start = time.perf_counter()
+                llm = wrap_llm(builder(model_name, self.http_pool, **params))
+                build_seconds = time.perf_counter() - start
+
+                self._llms[key] = llm
+                self._stats[key] = {
+                    "llm_type": llm_type,
+                    "model_name": model_name,
+                    "params": params,
+                    "build_seconds": round(build_seconds, 4),
+                    "hits": 0,
+                }
+                logging.info(f"Built {llm_type} client for {model_name} in {build_seconds:.3f}s")
+            else:
+                self._stats[key]["hits"] += 1
+
+        return llm
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": [dict(s, params={k: str(v) for k, v in s["params"].items()}) for s in self._stats.values()],
+                "http_pool": self.http_pool.stats(),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._llms.clear()
+            self._stats.clear()
+
+
+llm_registry = LLMRegistry()
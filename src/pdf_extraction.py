@@ -0,0 +1,96 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pypdf import PdfReader
+
+
+# Documents with fewer pages than this are extracted in-process; spinning work
+# out to other processes only pays off for long documents.
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "48"))
+MAX_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def extract_page_texts(pages):
+    """
+    Extract the text of already loaded PDF pages, calling extract_text() once per page.
+
+    Args:
+        pages (list): pypdf page objects.
+
+    Returns:
+        list: One string per page; pages without text map to "".
+    """
+    return [page.extract_text() or "" for page in pages]
+
+
+def _extract_page_range(pdf_path, start, end):
+    reader = PdfReader(pdf_path)
+    return extract_page_texts(reader.pages[start:end])
+
+
+def extract_pdf_pages(pdf_path, parallel_threshold: int = None, max_workers: int = None):
+    """
+    Extract the text of every page of a PDF exactly once.
+
+    Long documents are split into contiguous page ranges that are extracted in a
+    shared process pool; each worker opens the file itself since pypdf pages
+    cannot be pickled.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        parallel_threshold (int): Page count from which the process pool is used.
+        max_workers (int): Number of page ranges to split the document into.
+
+    Returns:
+        list: One string per page, in page order; pages without text map to "".
+    """
+    parallel_threshold = parallel_threshold or PARALLEL_PAGE_THRESHOLD
+    max_workers = max_workers or MAX_WORKERS
+
+    try:
+        reader = PdfReader(pdf_path)
+        num_pages = len(reader.pages)
+
+        if num_pages < parallel_threshold or max_workers < 2:
+            return extract_page_texts(reader.pages)
+
+        step = -(-num_pages // max_workers)
+        executor = _get_executor()
+        futures = [
+            executor.submit(_extract_page_range, pdf_path, start, min(start + step, num_pages))
+            for start in range(0, num_pages, step)
+        ]
+
+        texts = []
+        for future in futures:
+            texts.extend(future.result())
+
+        return texts
+
+    except Exception as e:
+        print(f"Error reading PDF file: {e}")
+        return []
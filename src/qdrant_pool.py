@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+from src.logger import logging
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient, AsyncQdrantClient
+
+
+load_dotenv()
+
+
+class QdrantPool:
+    """
+    Long-lived, shared Qdrant clients (sync and async) for the whole process.
+
+    Clients keep their HTTP/gRPC connections open between calls, and collection
+    existence is cached so that a search does not need a get_collections() round trip.
+    The cache is refreshed lazily, only when an unknown collection is looked up or
+    the cached listing is older than `collections_ttl` seconds.
+
+    Setting `location` (e.g. ":memory:", QDRANT_LOCATION) or `path` (QDRANT_PATH) runs
+    Qdrant in local mode inside the process instead of connecting to a server. Local
+    mode is meant for tests and benchmarks and only provides the synchronous client.
+
+    With REPLAY_MODE=record or replay (see src.replay) the clients are wrapped so
+    searches are recorded to, or served from, local cassette files.
+    """
+
+    def __init__(
+        self,
+        url: str = None,
+        api_key: str = None,
+        prefer_grpc: bool = None,
+        timeout: int = None,
+        collections_ttl: float = None,
+        location: str = None,
+        path: str = None,
+    ):
+        self.url = url or os.getenv("QDRANT_URL")
+        self.location = location or os.getenv("QDRANT_LOCATION")
+        self.path = path or os.getenv("QDRANT_PATH")
+        self.api_key = api_key or os.getenv("QDRANT_API_KEY")
+        if prefer_grpc is None:
+            prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in {"1", "true", "yes"}
+        self.prefer_grpc = prefer_grpc
+        self.timeout = timeout or int(os.getenv("QDRANT_TIMEOUT", "30"))
+        if collections_ttl is None:
+            collections_ttl = float(os.getenv("QDRANT_COLLECTIONS_TTL", "300"))
+        self.collections_ttl = collections_ttl
+
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+        self._collections = set()
+        self._collections_refreshed_at = 0.0
+
+    @property
+    def is_local(self) -> bool:
+        return bool(self.location or self.path)
+
+    def _client_kwargs(self):
+        if self.path:
+            return {"path": self.path}
+        if self.location:
+            return {"location": self.location}
+        return {
+            "url": self.url,
+            "api_key": self.api_key,
+            "prefer_grpc": self.prefer_grpc,
+            "timeout": self.timeout,
+        }
+
+    def client(self) -> "QdrantClient":
+        """
+        Returns the shared synchronous client, creating it on first use.
+        """
+        if self._client is None:
+            # qdrant_client is imported here so that importing the pool stays cheap
+            from qdrant_client import QdrantClient
+            from src.replay import wrap_qdrant_client
+
+            with self._lock:
+                if self._client is None:
+                    self._client = wrap_qdrant_client(QdrantClient(**self._client_kwargs()))
+                    if self.is_local:
+                        logging.info(f"Opened local Qdrant ({self.path or self.location})")
+                    else:
+                        logging.info(f"Connected Qdrant client (grpc={self.prefer_grpc})")
+        return self._client
+
+    def async_client(self) -> "AsyncQdrantClient":
+        """
+        Returns the shared asynchronous client, creating it on first use.
+        """
+        if self.is_local:
+            # A second local client would not see the first one's data
+            raise RuntimeError("Local Qdrant mode only provides the synchronous client")
+        if self._async_client is None:
+            from qdrant_client import AsyncQdrantClient
+            from src.replay import wrap_qdrant_client
+
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = wrap_qdrant_client(AsyncQdrantClient(**self._client_kwargs()), is_async=True)
+                    logging.info(f"Connected async Qdrant client (grpc={self.prefer_grpc})")
+        return self._async_client
+
+    def _is_stale(self):
+        return time.monotonic() - self._collections_refreshed_at > self.collections_ttl
+
+    def _store_collections(self, names):
+        with self._lock:
+            self._collections = set(names)
+            self._collections_refreshed_at = time.monotonic()
+
+    def refresh_collections(self):
+        """
+        Re-read the collection listing from the server.
+        """
+        collections = self.client().get_collections().collections
+        self._store_collections(c.name for c in collections)
+
+    async def arefresh_collections(self):
+        response = await self.async_client().get_collections()
+        self._store_collections(c.name for c in response.collections)
+
+    def collection_exists(self, collection_name: str) -> bool:
+        """
+        Check whether a collection exists, using the cached listing when possible.
+        """
+        if collection_name in self._collections and not self._is_stale():
+            return True
+        self.refresh_collections()
+        return collection_name in self._collections
+
+    async def acollection_exists(self, collection_name: str) -> bool:
+        if collection_name in self._collections and not self._is_stale():
+            return True
+        await self.arefresh_collections()
+        return collection_name in self._collections
+
+    def _vectors_config(self, vector_size: int):
+        from qdrant_client.http.models import Distance, VectorParams
+
+        return VectorParams(size=vector_size, distance=Distance.COSINE)
+
+    def ensure_collection(self, collection_name: str, vector_size: int = 384):
+        """
+        Create the collection if it does not already exist.
+        """
+        if self.collection_exists(collection_name):
+            return
+
+        self.client().create_collection(
+            collection_name=collection_name,
+            vectors_config=self._vectors_config(vector_size),
+        )
+        with self._lock:
+            self._collections.add(collection_name)
+        logging.info(f"Created collection: {collection_name}")
+
+    async def aensure_collection(self, collection_name: str, vector_size: int = 384):
+        if await self.acollection_exists(collection_name):
+            return
+
+        await self.async_client().create_collection(
+            collection_name=collection_name,
+            vectors_config=self._vectors_config(vector_size),
+        )
+        with self._lock:
+            self._collections.add(collection_name)
+        logging.info(f"Created collection: {collection_name}")
+
+    def invalidate(self, collection_name: str = None):
+        """
+        Drop cached collection state so the next lookup goes to the server.
+        """
+        with self._lock:
+            if collection_name is None:
+                self._collections = set()
+            else:
+                self._collections.discard(collection_name)
+            self._collections_refreshed_at = 0.0
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._async_client = None
+            self._collections = set()
+            self._collections_refreshed_at = 0.0
+
+    async def aclose(self):
+        async_client = self._async_client
+        self.close()
+        if async_client is not None:
+            await async_client.close()
+
+
+qdrant_pool = QdrantPool()
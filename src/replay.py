@@ -0,0 +1,391 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import importlib
+import threading
+from collections import defaultdict
+from typing import Any
+
+from pydantic import BaseModel
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import BaseLLM
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult, Generation, LLMResult
+
+from src.logger import logging
+
+
+# "off", "record" (call the real services and save every call) or "replay" (serve saved calls)
+REPLAY_MODE = os.getenv("REPLAY_MODE", "off")
+REPLAY_CASSETTE_DIR = os.getenv("REPLAY_CASSETTE_DIR", os.path.join(os.getcwd(), "cassettes"))
+
+# Replayed calls wait for their recorded duration times this factor; 0 replays instantly
+REPLAY_LATENCY_SCALE = float(os.getenv("REPLAY_LATENCY_SCALE", "1.0"))
+
+# Qdrant client calls that are captured; everything else goes to the real client
+QDRANT_RECORDED_METHODS = {
+    "search",
+    "search_batch",
+    "query_points",
+    "query_batch_points",
+    "get_collections",
+    "collection_exists",
+    "scroll",
+    "retrieve",
+}
+
+
+class CassetteMissError(LookupError):
+    """
+    Raised in replay mode when a call was never recorded.
+    """
+
+
+def encode(value):
+    """
+    JSON-safe form of call arguments and results. Pydantic models (Qdrant results
+    and requests) keep their class so they can be rebuilt on replay.
+    """
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {"__model__": f"{cls.__module__}.{cls.__qualname__}", "data": value.model_dump(mode="json")}
+    if isinstance(value, dict):
+        return {str(k): encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, float):
+        # Recorded and replayed embeddings may differ in the last bits
+        return round(value, 6)
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return repr(value)
+
+
+def decode(value):
+    if isinstance(value, dict):
+        if "__model__" in value:
+            module_name, _, class_name = value["__model__"].rpartition(".")
+            cls = getattr(importlib.import_module(module_name), class_name)
+            return cls.model_validate(value["data"])
+        return {k: decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    return value
+
+
+def request_key(kind: str, payload) -> str:
+    return hashlib.sha256(json.dumps([kind, encode(payload)], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded calls stored as JSON lines: one {kind, key, request, response, elapsed}
+    object per call. In replay mode calls with the same key are served in recorded
+    order, wrapping around so a cassette can drive load tests longer than the recording.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries = defaultdict(list)
+        self._positions = defaultdict(int)
+
+        if mode == "replay":
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+        except FileNotFoundError:
+            logging.warning(f"Replay cassette not found: {self.path}")
+        logging.info(f"Loaded {sum(len(v) for v in self._entries.values())} recorded calls from {self.path}")
+
+    def record(self, kind: str, key: str, request, response, elapsed: float):
+        line = json.dumps({
+            "kind": kind,
+            "key": key,
+            "request": encode(request),
+            "response": response,
+            "elapsed": round(elapsed, 6),
+        })
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+    def replay(self, kind: str, key: str):
+        """
+        Returns:
+            tuple: (recorded response, recorded duration in seconds).
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recorded {kind} call matches this request ({key[:12]}) in {self.path}")
+            entry = entries[self._positions[key] % len(entries)]
+            self._positions[key] += 1
+        return entry["response"], entry["elapsed"] * REPLAY_LATENCY_SCALE
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(name: str) -> Cassette:
+    """
+    Process-wide cassette for `name` ("llm" or "qdrant") under REPLAY_CASSETTE_DIR.
+    """
+    with _cassettes_lock:
+        if name not in _cassettes:
+            _cassettes[name] = Cassette(os.path.join(REPLAY_CASSETTE_DIR, f"{name}.jsonl"), REPLAY_MODE)
+        return _cassettes[name]
+
+
+def _message_key(message):
+    # Message and run ids change between runs and must not affect matching
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": [(c["name"], c["args"]) for c in getattr(message, "tool_calls", None) or []],
+        "tool_call_id": getattr(message, "tool_call_id", None),
+    }
+
+
+def _model_id(llm):
+    return [type(llm).__name__, getattr(llm, "model_name", None) or getattr(llm, "model", None)]
+
+
+def _tool_names(kwargs):
+    return sorted(
+        (tool.get("function") or {}).get("name") or tool.get("name", "")
+        for tool in kwargs.get("tools") or []
+        if isinstance(tool, dict)
+    )
+
+
+def _encode_chat_result(result: ChatResult):
+    return {
+        "generations": [
+            {"message": message_to_dict(g.message), "generation_info": g.generation_info}
+            for g in result.generations
+        ],
+        "llm_output": result.llm_output,
+    }
+
+
+def _decode_chat_result(data) -> ChatResult:
+    return ChatResult(
+        generations=[
+            ChatGeneration(message=messages_from_dict([g["message"]])[0], generation_info=g["generation_info"])
+            for g in data["generations"]
+        ],
+        llm_output=data["llm_output"],
+    )
+
+
+class RecordReplayChatModel(BaseChatModel):
+    """
+    Chat model wrapper that records calls to `inner` or replays them from a cassette.
+    Tool binding is delegated to the inner model so provider-specific tool formats are kept.
+    """
+
+    inner: BaseChatModel
+    cassette: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"record-replay-{self.inner._llm_type}"
+
+    def bind_tools(self, tools, **kwargs):
+        bound = self.inner.bind_tools(tools, **kwargs)
+        if isinstance(bound, BaseChatModel):
+            # Some models return a configured copy rather than a binding
+            return self.model_copy(update={"inner": bound})
+        return self.bind(**bound.kwargs)
+
+    def _key(self, messages, stop, kwargs):
+        return request_key("llm", {
+            "model": _model_id(self.inner),
+            "messages": [_message_key(m) for m in messages],
+            "stop": stop,
+            "tools": _tool_names(kwargs),
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            data, delay = self.cassette.replay("llm", key)
+            time.sleep(delay)
+            return _decode_chat_result(data)
+
+        start = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        self.cassette.record(
+            "llm", key, [_message_key(m) for m in messages], _encode_chat_result(result), time.perf_counter() - start
+        )
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            data, delay = self.cassette.replay("llm", key)
+            await asyncio.sleep(delay)
+            return _decode_chat_result(data)
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+        self.cassette.record(
+            "llm", key, [_message_key(m) for m in messages], _encode_chat_result(result), time.perf_counter() - start
+        )
+        return result
+
+
+def _encode_llm_result(result: LLMResult):
+    return {
+        "generations": [
+            [{"text": g.text, "generation_info": g.generation_info} for g in generations]
+            for generations in result.generations
+        ],
+        "llm_output": result.llm_output,
+    }
+
+
+def _decode_llm_result(data) -> LLMResult:
+    return LLMResult(
+        generations=[[Generation(**g) for g in generations] for generations in data["generations"]],
+        llm_output=data["llm_output"],
+    )
+
+
+class RecordReplayLLM(BaseLLM):
+    """
+    Completion-model (e.g. OllamaLLM) counterpart of RecordReplayChatModel.
+    """
+
+    inner: BaseLLM
+    cassette: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"record-replay-{self.inner._llm_type}"
+
+    def _key(self, prompts, stop):
+        return request_key("llm", {"model": _model_id(self.inner), "prompts": prompts, "stop": stop})
+
+    def _generate(self, prompts, stop=None, run_manager=None, **kwargs):
+        key = self._key(prompts, stop)
+        if self.cassette.mode == "replay":
+            data, delay = self.cassette.replay("llm", key)
+            time.sleep(delay)
+            return _decode_llm_result(data)
+
+        start = time.perf_counter()
+        result = self.inner._generate(prompts, stop=stop, **kwargs)
+        self.cassette.record("llm", key, prompts, _encode_llm_result(result), time.perf_counter() - start)
+        return result
+
+    async def _agenerate(self, prompts, stop=None, run_manager=None, **kwargs):
+        key = self._key(prompts, stop)
+        if self.cassette.mode == "replay":
+            data, delay = self.cassette.replay("llm", key)
+            await asyncio.sleep(delay)
+            return _decode_llm_result(data)
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(prompts, stop=stop, **kwargs)
+        self.cassette.record("llm", key, prompts, _encode_llm_result(result), time.perf_counter() - start)
+        return result
+
+
+def wrap_llm(llm, mode: str = None):
+    """
+    Wrap an LLM for recording or replay according to REPLAY_MODE; returned unchanged when off.
+    """
+    mode = mode or REPLAY_MODE
+    if mode == "off":
+        return llm
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown REPLAY_MODE: {mode}")
+
+    cassette = get_cassette("llm")
+    if isinstance(llm, BaseChatModel):
+        return RecordReplayChatModel(inner=llm, cassette=cassette)
+    return RecordReplayLLM(inner=llm, cassette=cassette)
+
+
+class RecordReplayQdrantClient:
+    """
+    Proxy around a QdrantClient or AsyncQdrantClient that records the read calls in
+    QDRANT_RECORDED_METHODS, or replays them without a server (`client` may then be
+    None). Other calls are passed through to the real client.
+    """
+
+    def __init__(self, client, cassette: Cassette, is_async: bool = False):
+        self._client = client
+        self._cassette = cassette
+        self._is_async = is_async
+
+    def _passthrough(self, name):
+        if self._client is None:
+            raise CassetteMissError(f"Qdrant method {name} is not replayable and there is no live client")
+        return getattr(self._client, name)
+
+    def __getattr__(self, name):
+        if name not in QDRANT_RECORDED_METHODS:
+            return self._passthrough(name)
+
+        cassette = self._cassette
+
+        def call_key(args, kwargs):
+            return request_key("qdrant", {"method": name, "args": args, "kwargs": kwargs})
+
+        if self._is_async:
+            async def async_method(*args, **kwargs):
+                key = call_key(args, kwargs)
+                if cassette.mode == "replay":
+                    data, delay = cassette.replay("qdrant", key)
+                    await asyncio.sleep(delay)
+                    return decode(data)
+
+                start = time.perf_counter()
+                result = await self._passthrough(name)(*args, **kwargs)
+                cassette.record("qdrant", key, {"method": name}, encode(result), time.perf_counter() - start)
+                return result
+            return async_method
+
+        def method(*args, **kwargs):
+            key = call_key(args, kwargs)
+            if cassette.mode == "replay":
+                data, delay = cassette.replay("qdrant", key)
+                time.sleep(delay)
+                return decode(data)
+
+            start = time.perf_counter()
+            result = self._passthrough(name)(*args, **kwargs)
+            cassette.record("qdrant", key, {"method": name}, encode(result), time.perf_counter() - start)
+            return result
+        return method
+
+    def close(self):
+        if self._client is not None:
+            return self._client.close()
+
+
+def wrap_qdrant_client(client, is_async: bool = False, mode: str = None):
+    """
+    Wrap a Qdrant client for recording or replay according to REPLAY_MODE.
+    """
+    mode = mode or REPLAY_MODE
+    if mode == "off":
+        return client
+    return RecordReplayQdrantClient(client, get_cassette("qdrant"), is_async=is_async)
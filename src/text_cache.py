@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.pdf_extraction import extract_pdf_pages
+
+
+def compute_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    SHA-256 of a file's contents, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """
+    Content-addressed cache of extracted PDF page text.
+
+    Entries are keyed by the SHA-256 of the PDF bytes, so a resubmitted document is
+    recognised regardless of its file name. Entries live in memory with LRU eviction
+    bounded by `max_bytes`, and are optionally spilled to `cache_dir` as JSON files so
+    they survive restarts and can be shared between processes.
+    """
+
+    def __init__(self, max_bytes: int = None, cache_dir: str = None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("PDF_TEXT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or os.getenv("PDF_TEXT_CACHE_DIR")
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes_held = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(pages):
+        return sum(len(text.encode("utf-8")) for text in pages)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key, pages):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(pages, f)
+        os.replace(tmp_path, path)
+
+    def _store(self, key, pages):
+        size = self._size(pages)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (pages, size)
+            self._bytes_held += size
+            while self._bytes_held > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes_held -= evicted_size
+
+    def get(self, key):
+        """
+        Look up extracted pages by content hash. Returns None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        pages = self._read_disk(key)
+        if pages is not None:
+            self._store(key, pages)
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            return pages
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, pages):
+        self._store(key, pages)
+        self._write_disk(key, pages)
+
+    def get_pages(self, pdf_path: str, content_hash: str = None):
+        """
+        Return the per-page text of a PDF, extracting it only on a cache miss.
+
+        Args:
+            pdf_path (str): Path to the PDF file.
+            content_hash (str, optional): Precomputed SHA-256 of the file contents.
+
+        Returns:
+            list: One string per page; pages without text map to "".
+        """
+        key = content_hash or file_sha256(pdf_path)
+
+        pages = self.get(key)
+        if pages is None:
+            pages = extract_pdf_pages(pdf_path)
+            if pages:
+                self.put(key, pages)
+
+        return pages
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes_held": self._bytes_held,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes_held = 0
+
+
+pdf_text_cache = PdfTextCache()
+
+
+def get_pdf_pages(pdf_path: str, content_hash: str = None):
+    """
+    Shortcut for the process-wide PDF text cache.
+    """
+    return pdf_text_cache.get_pages(pdf_path, content_hash)
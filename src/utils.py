@@ -2,21 +2,16 @@ import os
 import re
 import sys
 import yaml
-import torch
 import platform
 from pypdf import PdfReader
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
 
-from langchain_ollama import OllamaLLM
-from langchain_openai import ChatOpenAI
-
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+# torch, sentence-transformers, scikit-learn, LangChain and the LLM client libraries
+# are imported inside the functions that need them, so importing this module stays cheap
 
 from src.exception import CustomException
+from src.qdrant_pool import qdrant_pool
+from src.llm_registry import llm_registry
 
 
 load_dotenv()
@@ -80,6 +75,8 @@ def get_device():
     Returns:
         device: The device to be used (CPU, CUDA, or MPS).
     """
+    import torch
+
     # if torch.backends.mps.is_available():
     #     return "mps"
     if torch.cuda.is_available():
@@ -97,40 +94,33 @@ def get_embedding_model(model_name="all-MiniLM-L6-v2"):
     Returns:
         SentenceTransformer: An instance of the specified embedding model.
     """
+    from sentence_transformers import SentenceTransformer
 
     device = get_device()
     return SentenceTransformer(model_name, device=device)
 
 
-def get_llm(type="openai", model_name="gpt-4o"):
+def get_llm(type="openai", model_name="gpt-4o", **params):
     """
     Get a language model based on the specified type and model name.
     Args:
-        type (str): The type of language model to use ("openai" or "ollama").
+        type (str): The type of language model to use ("openai", "openai_compatible" or "ollama").
         model_name (str): The name of the model to use.
+        **params: Extra constructor arguments for the client.
     Returns:
-        llm: An instance of the specified language model.
+        llm: The shared client for this type, model and params from the LLM registry,
+            wrapped for recording or replay when REPLAY_MODE is set.
     """
 
-    llms = {
-        "openai": ChatOpenAI(model_name=model_name, openai_api_key = openai_api_key),
-        "ollama": OllamaLLM(model=model_name)
-    }
-    llm = llms[type]
-
-    return llm
+    return llm_registry.get(type, model_name, **params)
 
 
 def db_client_connect(collection_name: str, vector_size: int = 384):
     """
-    Connect to a client collection.
+    Connect to a client collection using the shared Qdrant client pool.
 
     Args:
         collection_name (str): Name of the collection.
-        url (str, optional): Qdrant Cloud URL.
-        api_key (str, optional): Qdrant Cloud API key.
-        host (str): Local Qdrant host.
-        port (int): Local Qdrant port.
         vector_size (int): Embedding dimension.
 
     Returns:
@@ -138,24 +128,8 @@ def db_client_connect(collection_name: str, vector_size: int = 384):
     """
 
     try:
-        # Cloud or local connection
-        client = QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key
-        )
-
-        # Create collection if it doesn't exist
-        collections = client.get_collections().collections
-        if collection_name not in [c.name for c in collections]:
-            client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance=Distance.COSINE,
-                ),
-            )
-
-        return client
+        qdrant_pool.ensure_collection(collection_name, vector_size)
+        return qdrant_pool.client()
 
     except Exception as e:
         print(f"Error getting Qdrant collection '{collection_name}': {e}")
@@ -175,6 +149,7 @@ def get_device():
     Returns:
         torch.device: The device to be used (CPU, CUDA, or MPS).
     """
+    import torch
 
     if platform.system() == "Darwin":
         if torch.backends.mps.is_available():
@@ -210,6 +185,14 @@ def get_next_collection_name(client, base_name: str) -> str:
     return f"{base_name}_v{next_version}"
 
 
+def get_current_collection_name(client, base_name: str) -> str:
+    """
+    Returns the latest base_name_vN collection, or base_name_v1 if none exist yet.
+    """
+    latest_version = get_latest_collection_version(client, base_name)
+    return f"{base_name}_v{max(latest_version, 1)}"
+
+
 def compute_confidence(structured):
     score = 0.0
 
@@ -231,6 +214,9 @@ def compute_confidence(structured):
 
 
 def evaluate_models(X_train, y_train, X_test, y_test, models, params ):
+    from sklearn.metrics import r2_score
+    from sklearn.model_selection import GridSearchCV
+
     try:
         report = {}
         
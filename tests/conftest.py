@@ -0,0 +1,26 @@
+import pytest
+
+from agent.verdict_cache import PolicyVersion, verdict_cache
+
+
+class FixedPolicyVersion(PolicyVersion):
+    """
+    Policy version that never asks Qdrant; tests change `value` to simulate a new policy set.
+    """
+
+    def __init__(self, value: str = "policies_v1"):
+        super().__init__(ttl=0)
+        self.value = value
+
+    def _resolve(self):
+        return self.value
+
+
+@pytest.fixture
+def fixed_policy_version(monkeypatch):
+    """
+    Pins the process-wide verdict cache to a FixedPolicyVersion.
+    """
+    policy_version = FixedPolicyVersion()
+    monkeypatch.setattr(verdict_cache, "policy_version", policy_version)
+    return policy_version
@@ -0,0 +1,185 @@
+import io
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agent.api as api
+import agent.asgi as asgi
+import agent.batch as batch
+from agent.runner import EmptyDocumentError
+from agent.templates import PolicyComplianceResponse
+
+
+class EchoExecutor:
+    """
+    Stand-in agent whose verdict echoes the question; questions containing "boom" fail.
+    Async calls for lower-numbered questions take longer, so they finish out of order.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _output(self, inputs):
+        with self._lock:
+            self.calls += 1
+        if "boom" in inputs["query"]:
+            raise RuntimeError("agent failed")
+        return {"output": PolicyComplianceResponse(
+            compliant_policies=["P1"],
+            violated_policies=[],
+            compliance_status="Compliant",
+            reasoning=f"{inputs['query']} | {inputs['chunk']}",
+        ).model_dump_json()}
+
+    def invoke(self, inputs, config=None):
+        return self._output(inputs)
+
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(0.01 * (4 - int(inputs["query"][-1])))
+        return self._output(inputs)
+
+
+class StubRegistry:
+    def __init__(self, executor):
+        self.executor = executor
+
+    def get(self, *args, **kwargs):
+        return self.executor
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """
+    Replaces PDF extraction: files whose content starts with "empty" have no text.
+    Returns the list of extracted paths.
+    """
+    extracted = []
+
+    def load_document_pages(pdf_path):
+        extracted.append(pdf_path)
+        with open(pdf_path, "rb") as f:
+            if f.read().startswith(b"empty"):
+                raise EmptyDocumentError("No text extracted from PDF")
+        return [f"text of {pdf_path}"]
+
+    monkeypatch.setattr(batch, "load_document_pages", load_document_pages)
+    monkeypatch.setattr(batch, "retrieve_policy_texts_batch", lambda queries: {q: [] for q in queries})
+    return extracted
+
+
+@pytest.fixture
+def documents(tmp_path):
+    paths = {}
+    for name, content in (("a.pdf", b"contract a"), ("b.pdf", b"empty"), ("c.pdf", b"contract c")):
+        paths[name] = tmp_path / name
+        paths[name].write_bytes(content)
+    return [(name, str(path)) for name, path in paths.items()]
+
+
+QUERIES = ["question 1", "boom 2", "question 3"]
+
+
+def check_results(results, documents):
+    # One result per (document, query), document-major in input order
+    assert [(r["document"], r["query"]) for r in results] == [(name, q) for name, _ in documents for q in QUERIES]
+
+    by_pair = {(r["document"], r["query"]): r for r in results}
+    for name, path in documents:
+        for query in QUERIES:
+            result = by_pair[(name, query)]
+            if name == "b.pdf":
+                assert result["error"] == "No text extracted from PDF"
+            elif "boom" in query:
+                assert result["verdict"] == "unknown" and result["error"] == "agent failed"
+            else:
+                assert result["verdict"] == "Compliant" and "error" not in result
+                assert result["reasoning"] == f"{query} | text of {path}"
+
+
+def test_run_agent_batch_isolates_errors_and_keeps_order(extractions, documents):
+    executor = EchoExecutor()
+
+    results = batch.run_agent_batch(executor, QUERIES, documents, max_concurrency=4)
+
+    check_results(results, documents)
+    # The empty document fails once and never reaches the agent
+    assert executor.calls == 6
+    # Each document is extracted once however many queries use it
+    assert sorted(extractions) == sorted(path for _, path in documents)
+
+
+def test_arun_agent_batch_isolates_errors_and_keeps_order(extractions, documents):
+    executor = EchoExecutor()
+
+    results = asyncio.run(batch.arun_agent_batch(executor, QUERIES, documents, max_concurrency=4))
+
+    check_results(results, documents)
+    assert executor.calls == 6
+    assert sorted(extractions) == sorted(path for _, path in documents)
+
+
+def test_batch_size_limit(monkeypatch, extractions, documents):
+    monkeypatch.setattr(batch, "BATCH_MAX_ITEMS", 8)
+
+    with pytest.raises(batch.BatchTooLargeError):
+        batch.run_agent_batch(EchoExecutor(), QUERIES, documents)
+    with pytest.raises(batch.BatchTooLargeError):
+        asyncio.run(batch.arun_agent_batch(EchoExecutor(), QUERIES, documents))
+    assert extractions == []
+
+
+def test_flask_batch_endpoint(monkeypatch, extractions):
+    monkeypatch.setattr(api, "agent_registry", StubRegistry(EchoExecutor()))
+    client = api.app.test_client()
+
+    def post(files, queries):
+        return client.post(
+            "/compliance/check/batch",
+            data={"file": [(io.BytesIO(content), name) for name, content in files], "query": queries},
+            content_type="multipart/form-data",
+        )
+
+    files = [("a.pdf", b"contract a"), ("b.pdf", b"empty")]
+    response = post(files, ["question 1", "boom 2"])
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [(r["document"], r["query"]) for r in results] == [
+        ("a.pdf", "question 1"), ("a.pdf", "boom 2"), ("b.pdf", "question 1"), ("b.pdf", "boom 2"),
+    ]
+    assert [r["verdict"] for r in results] == ["Compliant", "unknown", "unknown", "unknown"]
+    assert len(extractions) == 2
+
+    monkeypatch.setattr(batch, "BATCH_MAX_ITEMS", 3)
+    response = post(files, ["question 1", "boom 2"])
+    assert response.status_code == 400
+    assert "exceeds 3 items" in response.get_json()["error"]
+
+
+def test_asgi_batch_endpoint(monkeypatch, extractions):
+    monkeypatch.setattr(asgi, "agent_registry", StubRegistry(EchoExecutor()))
+    client = TestClient(asgi.app)
+
+    def post(files, queries):
+        return client.post(
+            "/compliance/check/batch",
+            files=[("file", (name, content, "application/pdf")) for name, content in files],
+            data={"query": queries},
+        )
+
+    files = [("a.pdf", b"contract a"), ("b.pdf", b"empty")]
+    response = post(files, ["question 1", "boom 2"])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["document"], r["query"]) for r in results] == [
+        ("a.pdf", "question 1"), ("a.pdf", "boom 2"), ("b.pdf", "question 1"), ("b.pdf", "boom 2"),
+    ]
+    assert [r["verdict"] for r in results] == ["Compliant", "unknown", "unknown", "unknown"]
+    assert len(extractions) == 2
+
+    monkeypatch.setattr(batch, "BATCH_MAX_ITEMS", 3)
+    response = post(files, ["question 1", "boom 2"])
+    assert response.status_code == 400
+    assert "exceeds 3 items" in response.json()["error"]
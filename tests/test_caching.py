@@ -0,0 +1,173 @@
+import os
+import time
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache
+from agent.templates import PolicyComplianceResponse
+from agent.semantic_cache import SemanticVerdictCache
+import agent.verdict_cache as verdict_cache_module
+from agent.verdict_cache import VerdictCache, MemoryVerdictBackend, DiskVerdictBackend, PolicyVersion
+from ingestion.chunking import Chunker
+from ingestion.embed_upsert import EmbedUpsert
+from ingestion.incremental import IngestionManifest, ingest_incremental
+from src.qdrant_pool import QdrantPool
+from tests.conftest import FixedPolicyVersion
+
+
+class CountingModel:
+    """
+    Stand-in embedding model that records how many texts it encoded.
+    """
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts):
+        self.encoded += len(texts)
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+
+def test_embedding_cache_reuses_normalized_queries():
+    cache = EmbeddingCache(max_size=10, ttl=0)
+    model = CountingModel()
+
+    first = cache.encode(model, "termination clause", model_name="m")
+    second = cache.encode(model, "  termination   clause ", model_name="m")
+
+    assert np.array_equal(first, second)
+    assert model.encoded == 1
+    assert cache.stats()["hits"] == 1
+
+    # Same text under another model name is a separate entry
+    cache.encode(model, "termination clause", model_name="other")
+    assert model.encoded == 2
+
+
+def test_embedding_cache_batches_misses_and_expires():
+    cache = EmbeddingCache(max_size=2, ttl=0.05)
+    model = CountingModel()
+
+    matrix = cache.encode(model, ["a", "bb", "a"], model_name="m")
+    assert matrix.shape == (3, 2)
+    assert model.encoded == 2
+
+    time.sleep(0.1)
+    cache.encode(model, "a", model_name="m")
+    assert cache.stats()["expirations"] == 1
+    assert model.encoded == 3
+
+
+def test_verdict_cache_keys_and_policy_invalidation(tmp_path):
+    response = PolicyComplianceResponse(
+        compliant_policies=["P1"], violated_policies=[], compliance_status="Compliant", reasoning="ok"
+    )
+
+    for backend in (MemoryVerdictBackend(max_size=10), DiskVerdictBackend(str(tmp_path))):
+        policy_version = FixedPolicyVersion("policies_v1")
+        cache = VerdictCache(backend, policy_version)
+
+        scope = cache.scope_key("hash", "openai", "gpt-4o", "select")
+        key = cache.make_key(scope, "Is there a termination clause?")
+        assert cache.get(key) is None
+        cache.put(key, response)
+
+        # Whitespace and case in the query don't change the key; the model does
+        assert cache.make_key(scope, " is there a  termination clause? ") == key
+        assert cache.scope_key("hash", "ollama", "llama3", "select") != scope
+        assert cache.get(key) == response
+
+        # A new policy collection version retires the entry
+        policy_version.value = "policies_v2"
+        assert cache.scope_key("hash", "openai", "gpt-4o", "select") != scope
+        assert cache.stats()["hits"] == 1
+
+
+def test_semantic_cache_matches_similar_questions():
+    vectors = {
+        "Is there a termination clause?": [1.0, 0.0, 0.0],
+        "Does this contract define termination?": [0.95, 0.1, 0.0],
+        "What is the governing law?": [0.0, 1.0, 0.0],
+    }
+    cache = SemanticVerdictCache(enabled=True, threshold=0.9, embed=lambda q: np.array(vectors[q]))
+    response = PolicyComplianceResponse(
+        compliant_policies=[], violated_policies=["P2"], compliance_status="Non-Compliant", reasoning="missing"
+    )
+
+    cache.put("doc", "Is there a termination clause?", response)
+
+    assert cache.get("doc", "Does this contract define termination?") == response
+    assert cache.get("doc", "What is the governing law?") is None
+    assert cache.get("other-doc", "Does this contract define termination?") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["documents"]) == (1, 2, 1)
+
+
+def test_disk_verdict_backend_bounds_and_prunes_retired_versions(tmp_path):
+    response = PolicyComplianceResponse(
+        compliant_policies=["P1"], violated_policies=[], compliance_status="Compliant", reasoning="ok"
+    )
+    backend = DiskVerdictBackend(str(tmp_path), max_entries=3, max_age=0, prune_every=1)
+    policy_version = FixedPolicyVersion("policies_v1")
+    cache = VerdictCache(backend, policy_version)
+
+    for i in range(5):
+        cache.put(f"v1-{i}", response)
+        os.utime(backend._path(f"v1-{i}"), (1000 + i, 1000 + i))
+
+    # Only the newest max_entries survive
+    assert len(backend) == 3
+    assert cache.get("v1-0") is None and cache.get("v1-4") == response
+
+    # The first write against a new policy version removes the retired entries
+    policy_version.value = "policies_v2"
+    cache.put("v2-0", response)
+    assert len(backend) == 1 and cache.get("v2-0") == response
+
+    # Entries past max_age are misses and are pruned
+    backend.max_age = 60
+    os.utime(backend._path("v2-0"), (time.time() - 120, time.time() - 120))
+    assert cache.get("v2-0") is None
+    assert backend.prune() == 1 and len(backend) == 0
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+class OnesEmbedUpsert(EmbedUpsert):
+    def __init__(self, client):
+        self.client = client
+        self._shard_counts = {}
+
+    def get_embeddings(self, texts):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_incremental_policy_change_retires_cached_verdicts(tmp_path, monkeypatch):
+    pool = QdrantPool(location=":memory:")
+    monkeypatch.setattr(verdict_cache_module, "qdrant_pool", pool)
+    monkeypatch.setenv("POLICY_COLLECTION_NAME", "policies_v1")
+    monkeypatch.setenv("POLICY_COLLECTION_BASENAME", "policies")
+
+    policy_file = tmp_path / "security.yaml"
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+
+    def ingest(rule):
+        policy_file.write_text(f"security:\n  - content: \"{rule}\"\n")
+        ingest_incremental(
+            pool.client(), OnesEmbedUpsert(pool.client()), "policies_v1", [str(policy_file)],
+            Chunker().parse_policies, manifest, source_key="source_file",
+        )
+
+    response = PolicyComplianceResponse(
+        compliant_policies=["P1"], violated_policies=[], compliance_status="Compliant", reasoning="ok"
+    )
+    ingest("Encrypt data at rest")
+    cache = VerdictCache(MemoryVerdictBackend(max_size=10), PolicyVersion(ttl=0))
+
+    key = cache.make_key(cache.scope_key("hash", "openai", "gpt-4o", "select"), "Is data encrypted?")
+    cache.put(key, response)
+    assert cache.get(key) == response
+
+    # Same collection, same version number, different policies
+    ingest("Encrypt data at rest and in transit")
+    key = cache.make_key(cache.scope_key("hash", "openai", "gpt-4o", "select"), "Is data encrypted?")
+    assert cache.get(key) is None
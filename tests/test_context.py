@@ -0,0 +1,107 @@
+import sys
+import numpy as np
+import pytest
+
+import agent.context as context
+from src.embedding_cache import EmbeddingCache
+
+
+KEYWORDS = ["termination", "law", "encrypt"]
+
+
+class KeywordModel:
+    """
+    Stand-in embedding model: one dimension per keyword, counting its occurrences.
+    """
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.array([[t.lower().count(k) + 0.01 for k in KEYWORDS] for t in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+def page(keyword, words=60):
+    # Well under the splitter's 1000 characters, so each page is one chunk
+    return " ".join([keyword] + ["clause"] * words)
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    model = KeywordModel()
+    monkeypatch.setattr(context, "load_embedding_model", lambda: model)
+    monkeypatch.setattr(context, "embed_query", model.encode)
+    monkeypatch.setattr(context, "chunk_embedding_cache", EmbeddingCache(max_size=100, ttl=0))
+    monkeypatch.setattr(context, "retrieve_policy_texts", lambda query: [])
+    # Character estimate, so token counts don't depend on a tiktoken download
+    monkeypatch.setattr(context, "_encoding", False)
+
+
+def selected_pages(result):
+    return [int(line[len("[Page "):-1]) for line in result.splitlines() if line.startswith("[Page ")]
+
+
+def test_document_within_budget_is_sent_whole():
+    pages = [page("termination", 5), "", page("law", 5)]
+
+    assert context.select_context(pages, "termination?", token_budget=1000) == f"{pages[0]}\n\n{pages[2]}"
+    # A budget of 0 disables selection
+    assert context.select_context(pages, "termination?", token_budget=0) == f"{pages[0]}\n\n{pages[2]}"
+
+
+def test_selection_respects_budget_and_keeps_document_order():
+    pages = [page("law"), page("termination"), page("law"), page("termination termination")]
+    chunk_tokens = context.count_tokens(pages[0])
+
+    result = context.select_context(pages, "termination", policy_texts=[], token_budget=2 * chunk_tokens + 10)
+
+    # The two termination pages, in page order and labelled 1-based; a third doesn't fit
+    assert result == f"[Page 2]\n{pages[1]}\n\n[Page 4]\n{pages[3]}"
+
+
+def test_policy_similarity_is_weighted_against_query_similarity(monkeypatch):
+    pages = [page("termination"), page("encrypt"), page("law")]
+    budget = context.count_tokens(pages[0]) + 5
+    policies = ["Data must be encrypted: encrypt encrypt encrypt"]
+
+    # Query similarity dominates at the default weight
+    assert selected_pages(context.select_context(pages, "termination", policy_texts=policies, token_budget=budget)) == [1]
+
+    # Only policy similarity counts at weight 0
+    monkeypatch.setattr(context, "QUERY_WEIGHT", 0.0)
+    assert selected_pages(context.select_context(pages, "termination", policy_texts=policies, token_budget=budget)) == [2]
+
+    # Policies are retrieved for the query when not given
+    monkeypatch.setattr(context, "retrieve_policy_texts", lambda query: policies)
+    assert selected_pages(context.select_context(pages, "termination", token_budget=budget)) == [2]
+
+
+def test_top_chunk_is_truncated_when_nothing_fits():
+    pages = [page("law"), page("termination"), page("law")]
+
+    result = context.select_context(pages, "termination", policy_texts=[], token_budget=10)
+
+    label, text = result.split("\n", 1)
+    assert label == "[Page 2]"
+    assert pages[1].startswith(text) and text
+    assert context.count_tokens(text) <= 10
+
+
+def test_token_counting_with_and_without_tiktoken(monkeypatch):
+    class WordEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+    monkeypatch.setattr(context, "_encoding", WordEncoding())
+    assert context.count_tokens("one two three") == 3
+    assert context.truncate_tokens("one two three", 2) == "one two"
+
+    # tiktoken missing: fall back to ~4 characters per token
+    monkeypatch.setattr(context, "_encoding", None)
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    assert context.count_tokens("x" * 40) == 11
+    assert context._encoding is False
+    assert context.count_tokens(context.truncate_tokens("x" * 40, 5)) == 5
@@ -0,0 +1,43 @@
+import pytest
+
+from evals.report import build_report
+
+
+def _result(correct, confidence, latency, cached=False):
+    return {
+        "true_verdict": "Compliant",
+        "pred_verdict": "Compliant" if correct else "Non-Compliant",
+        "correct": correct,
+        "confidence_score": confidence,
+        "latency_seconds": latency,
+        "cached": cached,
+        "llm_calls": 2,
+        "prompt_tokens": 100,
+        "completion_tokens": 10,
+    }
+
+
+def test_report_accuracy_latency_and_calibration():
+    results = [
+        _result(True, 1.0, 1.0),
+        _result(True, 0.9, 2.0),
+        _result(False, 0.5, 3.0),
+        _result(True, 0.5, 4.0, cached=True),
+        {"true_verdict": "Compliant", "correct": False, "confidence_score": None, "error": "timeout"},
+    ]
+    report = build_report(results)
+
+    assert report["cases"] == 5
+    assert report["accuracy"] == pytest.approx(0.6)
+    assert report["errors"] == 1 and report["cached"] == 1
+    assert report["confusion"] == {"Compliant": {"Compliant": 3, "Non-Compliant": 1}}
+
+    # Cached and failed cases do not count towards latency or tokens
+    assert report["latency"]["count"] == 3
+    assert report["latency"]["p50_ms"] == pytest.approx(2000.0)
+    assert report["tokens"]["prompt"] == 300
+
+    calibration = report["calibration"]
+    assert [b["count"] for b in calibration["bins"]] == [2, 2]
+    # (2 * |0.5 - 0.5| + 2 * |1.0 - 0.95|) / 4
+    assert calibration["expected_calibration_error"] == pytest.approx(0.025)
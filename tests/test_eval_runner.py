@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+import agent.map_reduce as map_reduce
+import evals.eval_pipeline as eval_pipeline
+from agent.metrics import track_usage
+from agent.registry import AgentRegistry
+from benchmarks.fakes import FakeComplianceChatModel
+
+
+class FakeExecutor:
+    """
+    Stand-in for the agent: one fake LLM call per invoke.
+    """
+
+    def __init__(self):
+        self.llm = FakeComplianceChatModel(latency=0)
+        self.invocations = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, inputs, config=None):
+        with self._lock:
+            self.invocations += 1
+        return {"output": self.llm.invoke(inputs["query"]).content}
+
+
+def test_track_usage_counts_map_reduce_sections(monkeypatch):
+    monkeypatch.setattr(map_reduce, "SECTION_TOKENS", 20)
+    pages = [" ".join(["clause"] * 15) for _ in range(4)]
+    executor = FakeExecutor()
+
+    with track_usage() as usage:
+        map_reduce.run_map_reduce(executor, "Is there a termination clause?", pages, max_concurrency=4)
+
+    # Calls made on the section worker threads are attributed to this context
+    assert executor.invocations == 4
+    assert usage.llm_calls == 4 and usage.prompt_tokens > 0
+
+    # ...and not to runs outside it
+    executor.invoke({"query": "Another question?"})
+    assert usage.llm_calls == 4
+
+
+@pytest.fixture
+def eval_setup(tmp_path, monkeypatch, fixed_policy_version):
+    executor = FakeExecutor()
+    registry = AgentRegistry(factory=lambda **kwargs: executor)
+    registry.get("fake", "fake-model", "agent")
+
+    monkeypatch.setattr(eval_pipeline, "agent_registry", registry)
+    monkeypatch.setattr(eval_pipeline, "load_document_pages", lambda pdf_path: ["The Supplier encrypts data."])
+
+    pdf_path = tmp_path / "contract.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 contract")
+    case = {"id": "c1", "query": "Is data encrypted?", "pdf_path": str(pdf_path), "true_verdict": "Compliant"}
+    return executor, case, eval_pipeline.EvalCache(str(tmp_path / "cache"))
+
+
+def test_eval_cache_reuses_outputs_and_run_figures(eval_setup):
+    executor, case, cache = eval_setup
+
+    first = eval_pipeline.evaluate_case(executor, case, cache)
+    second = eval_pipeline.evaluate_case(executor, case, cache)
+
+    assert executor.invocations == 1
+    assert not first["cached"] and second["cached"]
+    assert first["llm_calls"] == second["llm_calls"] == 1
+    assert second["pred_verdict"] == first["pred_verdict"]
+    assert second["latency_seconds"] == pytest.approx(first["latency_seconds"])
+
+
+def test_uncached_cases_bypass_verdict_caches(eval_setup):
+    executor, case, _ = eval_setup
+
+    first = eval_pipeline.evaluate_case(executor, case, cache=None)
+    second = eval_pipeline.evaluate_case(executor, case, cache=None)
+
+    assert executor.invocations == 2
+    assert first["llm_calls"] == second["llm_calls"] == 1
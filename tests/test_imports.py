@@ -0,0 +1,20 @@
+import os
+import sys
+import subprocess
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["torch", "sentence_transformers", "sklearn", "langchain_openai", "langchain_ollama"]
+
+
+def test_utils_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, src.utils, ingestion.chunking; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "test")}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip().splitlines()[-1] == "[]"
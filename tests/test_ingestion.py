@@ -1,11 +1,18 @@
 import os
 import pytest
+import numpy as np
 from dotenv import load_dotenv
 from qdrant_client import QdrantClient
 
-from ingestion.chunking import Chunker
+from ingestion.chunking import Chunker, chunk_id
 from ingestion.embed_upsert import EmbedUpsert
+from ingestion.embedding_store import EmbeddingStore
+from ingestion.incremental import IngestionManifest, ingest_incremental
+from ingestion.parallel import parse_files
+from ingestion.streaming import StreamingPipeline
 from src.utils import get_next_collection_name
+from src.collection_revision import get_collection_revision
+from benchmarks.corpus import write_contracts, write_policies
 
 
 load_dotenv()
@@ -32,6 +39,253 @@ def test_chunking(chunked_contract):
     # logging.info("Chunking test passed ✅")
 
 
+def test_embedding_store(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "test-model")
+    keys = [store.key("first chunk"), store.key("second chunk")]
+    vectors = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], dtype=np.float32)
+
+    assert store.lookup(keys) == {}
+    store.add(keys, vectors)
+
+    # Reopen from disk and read the vectors back through the memmap
+    reopened = EmbeddingStore(str(tmp_path), "test-model")
+    found = reopened.lookup([keys[1], store.key("unknown"), keys[0]])
+
+    assert set(found) == {0, 2}
+    assert np.array_equal(found[0], vectors[1])
+    assert np.array_equal(found[2], vectors[0])
+
+
+def test_embedding_store_treats_truncated_vectors_as_misses(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "test-model")
+    keys = [store.key(f"chunk {i}") for i in range(3)]
+    store.add(keys, np.arange(9, dtype=np.float32).reshape(3, 3))
+
+    # Lose the last row and a half, as after an interrupted copy
+    os.truncate(store.vectors_path, 18)  # 1.5 rows of 3 float32s
+    reopened = EmbeddingStore(str(tmp_path), "test-model")
+
+    found = reopened.lookup(keys)
+    assert list(found) == [0]
+    assert len(reopened) == 1
+
+    # Re-adding the lost vectors realigns the file, and no key maps to another's row
+    reopened.add(keys[1:], np.array([[10, 11, 12], [13, 14, 15]], dtype=np.float32))
+    found = EmbeddingStore(str(tmp_path), "test-model").lookup(keys)
+    assert [found[i].tolist() for i in range(3)] == [[0, 1, 2], [10, 11, 12], [13, 14, 15]]
+
+
+def test_embed_upsert_loads_model_only_to_encode(tmp_path, monkeypatch):
+    import ingestion.embed_upsert as embed_upsert
+
+    loaded = []
+
+    class CountingModel:
+        def encode(self, texts, **kwargs):
+            return np.ones((len(texts), 4), dtype=np.float32)
+
+    def get_embedding_model(model_name):
+        loaded.append(model_name)
+        return CountingModel()
+
+    monkeypatch.setattr(embed_upsert, "get_embedding_model", get_embedding_model)
+
+    EmbedUpsert(QdrantClient(":memory:"), store_dir=str(tmp_path)).get_embeddings(["a", "b"])
+    assert loaded == ["all-MiniLM-L6-v2"]
+
+    # Everything is already stored: the model is never loaded
+    reader = EmbedUpsert(QdrantClient(":memory:"), store_dir=str(tmp_path))
+    assert reader.get_embeddings(["b", "a"]).shape == (2, 4)
+    assert loaded == ["all-MiniLM-L6-v2"] and reader.model is None
+
+
+def test_chunk_ids_are_deterministic(chunked_contract):
+    texts, metadatas, ids = chunked_contract
+    _, _, ids_again = Chunker().parse_contracts("./tests/test_contract.pdf")
+
+    assert ids == ids_again
+    assert len(set(ids)) == len(ids)
+    assert chunk_id("a.pdf", 0, 0, "text") != chunk_id("a.pdf", 0, 0, "edited text")
+
+
+class LocalEmbedUpsert(EmbedUpsert):
+    """
+    EmbedUpsert with a fixed-vector encoder, for running against an in-memory Qdrant.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.encoded = 0
+        self._shard_counts = {}
+
+    def get_embeddings(self, texts):
+        self.encoded += len(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_streaming_pipeline(chunked_contract):
+    texts, metadatas, ids = chunked_contract
+    client = QdrantClient(":memory:")
+
+    pipeline = StreamingPipeline(LocalEmbedUpsert(client), "contracts_v1", batch_size=2, queue_size=1)
+    upserted = pipeline.run(iter([(texts, metadatas, ids)]))
+
+    assert upserted == len(ids)
+    assert client.count("contracts_v1").count == len(set(ids))
+
+
+def test_concurrent_upsert():
+    client = QdrantClient(":memory:")
+    embed_upsert = LocalEmbedUpsert(client)
+    texts = [f"chunk {i}" for i in range(10)]
+    ids = [chunk_id("doc.pdf", 0, i, text) for i, text in enumerate(texts)]
+
+    embeddings = embed_upsert.get_embeddings(texts)
+    embed_upsert.upsert(texts, [{"chunk": i} for i in range(10)], ids, embeddings, "contracts_v1", batch_size=3, parallel=3)
+
+    assert client.count("contracts_v1").count == 10
+    point = client.retrieve("contracts_v1", ids=[ids[7]], with_payload=True)[0]
+    assert point.payload["text"] == "chunk 7"
+    assert point.payload["metadata"]["collection_version"] == "contracts_v1"
+
+
+@pytest.mark.parametrize("shards, head_waits", [(1, False), (3, True)])
+def test_upsert_waits_for_every_batch_on_sharded_collections(shards, head_waits):
+    client = QdrantClient(":memory:")
+    embed_upsert = LocalEmbedUpsert(client)
+    embed_upsert._shard_counts["contracts_v1"] = shards
+
+    waits = []
+    upsert = client.upsert
+
+    def record_upsert(**kwargs):
+        waits.append(kwargs["wait"])
+        return upsert(**kwargs)
+
+    client.upsert = record_upsert
+    texts = [f"chunk {i}" for i in range(7)]
+    embed_upsert.upsert(texts, [{}] * 7, list(range(7)), embed_upsert.get_embeddings(texts), "contracts_v1",
+                        batch_size=2, parallel=2)
+
+    # The last batch always waits; the others too when the collection has several shards
+    assert waits == [head_waits] * 3 + [True]
+    assert client.count("contracts_v1").count == 7
+    # Local mode reports no shard number
+    assert LocalEmbedUpsert(client)._shard_count("contracts_v1") == 1
+
+
+def test_streaming_pipeline_propagates_errors():
+    class FailingEmbedUpsert(LocalEmbedUpsert):
+        def get_embeddings(self, texts):
+            raise RuntimeError("encoder failed")
+
+    documents = ((["text"] * 3, [{}] * 3, ["a", "b", "c"]) for _ in range(10))
+    pipeline = StreamingPipeline(FailingEmbedUpsert(QdrantClient(":memory:")), "c", batch_size=2, queue_size=1)
+
+    with pytest.raises(RuntimeError, match="encoder failed"):
+        pipeline.run(documents)
+
+
+def write_policy(path, rules):
+    with open(path, "w") as f:
+        f.write("security:\n")
+        for rule in rules:
+            f.write(f"  - content: \"{rule}\"\n")
+
+
+def test_incremental_ingestion(tmp_path):
+    client = QdrantClient(":memory:")
+    embed_upsert = LocalEmbedUpsert(client)
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    chunker = Chunker()
+
+    first = tmp_path / "first.yaml"
+    second = tmp_path / "second.yaml"
+    write_policy(first, ["Encrypt data at rest", "Rotate keys yearly"])
+    write_policy(second, ["Log all access"])
+
+    def run(paths):
+        return ingest_incremental(
+            client, embed_upsert, "policies_v1", [str(p) for p in paths],
+            chunker.parse_policies, manifest, source_key="source_file",
+        )
+
+    assert get_collection_revision(client, "policies_v1") is None
+    summary = run([first, second])
+    assert summary["points_upserted"] == 3
+    assert client.count("policies_v1").count == 3
+    revision = get_collection_revision(client, "policies_v1")
+    assert revision == summary["revision"]
+
+    # Nothing changed: no parsing, embedding or upload, and the revision stays
+    summary = run([first, second])
+    assert summary["files_skipped"] == 2
+    assert embed_upsert.encoded == 3
+    assert get_collection_revision(client, "policies_v1") == revision
+
+    # One rule edited, one file removed: a new revision is recorded
+    write_policy(first, ["Encrypt data at rest", "Rotate keys quarterly"])
+    summary = run([first])
+    assert summary["points_upserted"] == 1
+    assert summary["points_deleted"] == 2
+    assert client.count("policies_v1").count == 2
+    assert get_collection_revision(client, "policies_v1") not in (None, revision)
+
+
+def test_incremental_ingestion_same_file_name_in_subdirectories(tmp_path):
+    client = QdrantClient(":memory:")
+    embed_upsert = LocalEmbedUpsert(client)
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    chunker = Chunker()
+
+    root = tmp_path / "policies"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    write_policy(root / "a" / "rules.yaml", ["Encrypt data at rest"])
+    write_policy(root / "b" / "rules.yaml", ["Encrypt data at rest", "Log all access"])
+    paths = [str(root / "a" / "rules.yaml"), str(root / "b" / "rules.yaml")]
+
+    def run():
+        return ingest_incremental(
+            client, embed_upsert, "policies_v1", paths,
+            chunker.parse_policies, manifest, source_key="source_file", root_dir=str(root),
+        )
+
+    summary = run()
+    assert summary["points_upserted"] == 3
+    assert client.count("policies_v1").count == 3
+    assert sorted(manifest.files) == ["a/rules.yaml", "b/rules.yaml"]
+
+    # Neither file evicts the other's points or manifest entry
+    summary = run()
+    assert summary["files_skipped"] == 2
+    assert summary["points_deleted"] == 0
+    assert client.count("policies_v1").count == 3
+
+
+def test_parallel_parsing_matches_serial(tmp_path):
+    # Same file names in two subdirectories, so results are told apart by source
+    contracts = write_contracts(str(tmp_path / "contracts" / "x"), count=3, pages=2, seed=1) \
+        + write_contracts(str(tmp_path / "contracts" / "y"), count=2, pages=3, seed=2)
+    policies = write_policies(str(tmp_path / "policies"), files=3, rules_per_category=2)
+
+    results = {}
+    for kind, paths, root in (("contracts", contracts, tmp_path / "contracts"), ("policies", policies, tmp_path / "policies")):
+        serial = list(parse_files(paths, kind, workers=1, root_dir=str(root)))
+        results[kind] = list(parse_files(paths, kind, workers=2, chunksize=1, root_dir=str(root)))
+
+        assert len(serial) == len(paths)
+        assert results[kind] == serial
+
+    # Results follow input order, whichever worker finishes first
+    assert [metadatas[0]["source"] for _, metadatas, _ in results["contracts"]] == [
+        "x/contract_0000.pdf", "x/contract_0001.pdf", "x/contract_0002.pdf", "y/contract_0000.pdf", "y/contract_0001.pdf",
+    ]
+    assert [metadatas[0]["source_file"] for _, metadatas, _ in results["policies"]] == [
+        "policies_000.yaml", "policies_001.yaml", "policies_002.yaml",
+    ]
+
+
 @pytest.mark.skipif(
     not os.getenv("QDRANT_URL") or not os.getenv("QDRANT_API_KEY"),
     reason="Qdrant credentials not set"
@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+
+import pytest
+
+import agent.jobs as jobs
+from agent.jobs import JobStore, JobManager, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(f"sqlite:///{tmp_path / 'jobs.db'}")
+
+
+@pytest.fixture
+def manager(store, tmp_path):
+    manager = JobManager(store=store, workers=2, worker_mode="threads", files_dir=str(tmp_path / "files"))
+    yield manager
+    manager.shutdown()
+
+
+def _upload(tmp_path, name="upload.pdf"):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4")
+    return str(path)
+
+
+def _wait(store, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job.status in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job stayed {store.get(job_id).status}")
+
+
+def test_submit_runs_job_through_status_transitions(manager, store, tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def fake_run_agent(agent_executor, query, pdf_path, document_mode=None):
+        release.wait(5)
+        return {"verdict": f"checked {query}"}
+
+    monkeypatch.setattr(jobs, "get_compliance_agent", lambda llm_type, model_name: None)
+    monkeypatch.setattr(jobs, "run_agent", fake_run_agent)
+    monkeypatch.setattr(jobs, "build_response", lambda response: response)
+
+    job = manager.submit(_upload(tmp_path), "Is data encrypted?", document_name="contract.pdf")
+    assert job.status == QUEUED
+
+    running = _wait(store, job.id, {RUNNING})
+    assert running.owner == jobs.worker_id() and running.lease_expires_at > time.time()
+
+    release.set()
+    finished = _wait(store, job.id, {SUCCEEDED})
+    assert manager.result(job.id) == {"verdict": "checked Is data encrypted?"}
+    assert finished.finished_at >= finished.started_at
+    assert not os.path.exists(job.pdf_path)
+
+
+def test_failed_job_records_error(manager, store, tmp_path, monkeypatch):
+    def failing_run_agent(*args, **kwargs):
+        raise RuntimeError("LLM unavailable")
+
+    monkeypatch.setattr(jobs, "get_compliance_agent", lambda llm_type, model_name: None)
+    monkeypatch.setattr(jobs, "run_agent", failing_run_agent)
+
+    job = manager.submit(_upload(tmp_path), "Is data encrypted?")
+    failed = _wait(store, job.id, {FAILED})
+    assert failed.error == "LLM unavailable"
+    assert manager.result(job.id) is None
+
+
+def test_claims_are_exclusive_and_stale_owners_cannot_finish(store):
+    job = store.create("q", "/tmp/none.pdf", None, None, "openai", "gpt-4o")
+
+    assert store.start(job.id, "worker-a") is not None
+    assert store.start(job.id, "worker-b") is None
+
+    assert not store.renew(job.id, "worker-b")
+    assert not store.finish(job.id, "worker-b", result={"x": 1})
+    assert store.finish(job.id, "worker-a", result={"x": 2})
+    assert store.get(job.id).status == SUCCEEDED
+
+
+def test_requeue_only_takes_over_expired_leases(store):
+    live = store.create("live", "/tmp/a.pdf", None, None, "openai", "gpt-4o")
+    dead = store.create("dead", "/tmp/b.pdf", None, None, "openai", "gpt-4o")
+    queued = store.create("queued", "/tmp/c.pdf", None, None, "openai", "gpt-4o")
+
+    store.start(live.id, "other-process", lease_seconds=60)
+    store.start(dead.id, "crashed-process", lease_seconds=-1)
+
+    assert store.requeue_interrupted() == [dead.id, queued.id]
+    assert store.get(live.id).status == RUNNING
+    assert store.get(dead.id).status == QUEUED and store.get(dead.id).owner is None
+
+
+def test_purge_removes_only_old_finished_jobs(store):
+    old = store.create("old", "/tmp/a.pdf", None, None, "openai", "gpt-4o")
+    store.start(old.id, "w")
+    store.finish(old.id, "w", result={})
+    pending = store.create("pending", "/tmp/b.pdf", None, None, "openai", "gpt-4o")
+
+    assert store.purge_expired(retention_seconds=60) == 0
+    assert store.purge_expired(retention_seconds=-1) == 1
+    assert store.get(old.id) is None
+    assert store.get(pending.id).status == QUEUED
+
+
+@pytest.mark.parametrize("failing", ["create", "_dispatch"])
+def test_failed_submit_leaves_no_files_or_rows(manager, store, tmp_path, monkeypatch, failing):
+    target = store if failing == "create" else manager
+    created = []
+    create = store.create
+
+    def track_create(*args):
+        job = create(*args)
+        created.append(job.id)
+        return job
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(store, "create", track_create)
+    monkeypatch.setattr(target, failing, fail)
+
+    with pytest.raises(RuntimeError, match="queue unavailable"):
+        manager.submit(_upload(tmp_path), "Is data encrypted?")
+
+    assert os.listdir(manager.files_dir) == []
+    assert all(store.get(job_id) is None for job_id in created)
+
+
+def test_flask_submit_removes_upload_when_queueing_fails(monkeypatch):
+    import io
+    import agent.api as api
+
+    uploads = []
+
+    class FailingManager:
+        def submit(self, pdf_path, *args, **kwargs):
+            uploads.append(pdf_path)
+            raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(api, "get_job_manager", lambda: FailingManager())
+    response = api.app.test_client().post(
+        "/compliance/jobs",
+        data={"file": (io.BytesIO(b"%PDF-1.4"), "contract.pdf"), "query": "Is data encrypted?"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 500
+    assert len(uploads) == 1 and not os.path.exists(uploads[0])
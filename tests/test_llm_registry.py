@@ -0,0 +1,22 @@
+import pytest
+
+from src.llm_registry import LLMRegistry, LLMHttpPool
+
+
+def test_registry_builds_requested_backend_once_per_params():
+    built = []
+
+    def build_fake(model_name, http_pool, **params):
+        built.append((model_name, params))
+        return object()
+
+    registry = LLMRegistry(LLMHttpPool())
+    registry.register("fake", build_fake)
+
+    first = registry.get("fake", "model-a")
+    assert registry.get("fake", "model-a") is first
+    assert registry.get("fake", "model-a", temperature=0) is not first
+    assert built == [("model-a", {}), ("model-a", {"temperature": 0})]
+
+    with pytest.raises(ValueError):
+        registry.get("missing", "model-a")
@@ -0,0 +1,92 @@
+import pytest
+
+import agent.context as context
+from agent.map_reduce import split_sections, merge_responses
+from agent.templates import PolicyComplianceResponse
+
+
+@pytest.fixture(autouse=True)
+def character_token_counts(monkeypatch):
+    # ~4 characters per token, so section sizes don't depend on a tiktoken download
+    monkeypatch.setattr(context, "_encoding", False)
+
+
+def response(status, compliant=(), violated=(), reasoning="", tools=(), documents=()):
+    return PolicyComplianceResponse(
+        compliant_policies=list(compliant),
+        violated_policies=list(violated),
+        compliance_status=status,
+        reasoning=reasoning,
+        tools_used=list(tools),
+        similar_documents=list(documents),
+    )
+
+
+def test_split_sections_groups_pages_and_attributes_page_numbers():
+    page = "x" * 96  # 25 tokens
+    pages = [page, page, "", page, page, page]
+
+    sections = split_sections(pages, section_tokens=50)
+
+    # Empty pages are skipped but keep their place in the numbering
+    assert [(first, last) for first, last, _ in sections] == [(1, 2), (4, 5), (6, 6)]
+    assert sections[0][2] == f"{page}\n\n{page}"
+
+
+def test_split_sections_splits_oversized_pages():
+    long_page = ". ".join(["Sentence number one"] * 200)  # ~1000 tokens
+
+    sections = split_sections(["Short page.", long_page], section_tokens=300)
+
+    assert len(sections) > 2
+    assert sections[0][:2] == (1, 2)
+    assert all((first, last) == (2, 2) for first, last, _ in sections[1:])
+    assert all(context.count_tokens(text) <= 300 for _, _, text in sections)
+
+
+def test_merge_non_compliant_section_takes_precedence():
+    merged = merge_responses([
+        ((1, 2), response("Compliant", compliant=["P1", "P2"], reasoning="all good")),
+        ((3, 4), response("Non-Compliant", compliant=["P1"], violated=["P2"], reasoning="P2 missing")),
+    ])
+
+    assert merged.compliance_status == "Non-Compliant"
+    assert merged.violated_policies == ["P2"]
+    # A Non-Compliant verdict lists no compliant policies
+    assert merged.compliant_policies == []
+    assert merged.reasoning == "Pages 1-2: all good\n\nPages 3-4: P2 missing"
+
+
+def test_merge_violation_overrides_compliant_status():
+    merged = merge_responses([
+        ((1, 1), response("Compliant", compliant=["P1"])),
+        ((2, 2), response("Compliant", compliant=["P3"], violated=["P1"])),
+    ])
+
+    assert merged.compliance_status == "Non-Compliant"
+    assert merged.violated_policies == ["P1"]
+
+
+def test_merge_deduplicates_policies_tools_and_documents():
+    merged = merge_responses([
+        ((1, 3), response("Compliant", compliant=["P1", "P2"], tools=["find_matching_policies"], documents=["a.pdf"])),
+        ((4, 6), response("Compliant", compliant=["P2", "P3", "P1"], tools=["find_matching_policies"],
+                          documents=["b.pdf", "a.pdf"])),
+    ])
+
+    assert merged.compliance_status == "Compliant"
+    assert merged.compliant_policies == ["P1", "P2", "P3"]
+    assert merged.violated_policies == []
+    assert merged.tools_used == ["find_matching_policies"]
+    assert merged.similar_documents == ["a.pdf", "b.pdf"]
+
+
+def test_merge_other_statuses_use_the_most_common():
+    merged = merge_responses([
+        ((1, 1), response("Compliant")),
+        ((2, 2), response("Partially Compliant")),
+        ((3, 3), response("Partially Compliant")),
+    ])
+
+    assert merged.compliance_status == "Partially Compliant"
+    assert merge_responses([]).compliance_status == "unknown"
@@ -0,0 +1,41 @@
+from prometheus_client import REGISTRY
+from langchain.agents import create_tool_calling_agent, AgentExecutor
+from langchain_core.tools import StructuredTool
+
+from agent.templates import system_prompt
+from agent.metrics import track_usage
+from benchmarks.fakes import FakeComplianceChatModel
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def find_matching_policies(queries: str) -> str:
+    """Find policies matching the queries."""
+    return "Policy BENCH-001: Data must be encrypted."
+
+
+def test_agent_llm_and_tool_runs_are_recorded():
+    tool = StructuredTool.from_function(find_matching_policies)
+    llm = FakeComplianceChatModel(latency=0)
+    agent = create_tool_calling_agent(llm=llm, prompt=system_prompt, tools=[tool])
+    # No callbacks passed anywhere: the metrics handler is attached by the configure hook
+    agent_executor = AgentExecutor(agent=agent, tools=[tool])
+
+    before = {
+        "calls": _sample("compliance_llm_calls_total"),
+        "tokens": _sample("compliance_llm_tokens_total", {"kind": "prompt"}),
+        "tools": _sample("compliance_tool_calls_total", {"tool": "find_matching_policies"}),
+        "llm_seconds": _sample("compliance_stage_seconds_count", {"stage": "llm"}),
+    }
+
+    with track_usage() as usage:
+        agent_executor.invoke({"query": "Is customer data encrypted?", "chunk": "All data is encrypted at rest."})
+
+    # One tool-calling turn and one answering turn
+    assert _sample("compliance_llm_calls_total") - before["calls"] == 2
+    assert _sample("compliance_llm_tokens_total", {"kind": "prompt"}) > before["tokens"]
+    assert _sample("compliance_tool_calls_total", {"tool": "find_matching_policies"}) - before["tools"] == 1
+    assert _sample("compliance_stage_seconds_count", {"stage": "llm"}) - before["llm_seconds"] == 2
+    assert usage.llm_calls == 2 and usage.prompt_tokens > 0
@@ -0,0 +1,49 @@
+from src.pdf_extraction import extract_pdf_pages, shutdown_executor
+from src.text_cache import PdfTextCache
+
+
+test_pdf = "./tests/test_contract.pdf"
+
+
+def test_extract_pdf_pages():
+    pages = extract_pdf_pages(test_pdf)
+
+    assert pages, "No pages extracted from contract PDF."
+    assert any(pages), "All extracted pages are empty."
+
+
+def test_parallel_extraction_matches_sequential():
+    sequential = extract_pdf_pages(test_pdf)
+    parallel = extract_pdf_pages(test_pdf, parallel_threshold=1, max_workers=3)
+    shutdown_executor()
+
+    assert parallel == sequential, "Parallel extraction changed page text or order."
+
+
+def test_pdf_text_cache(tmp_path):
+    cache = PdfTextCache(cache_dir=str(tmp_path))
+
+    first = cache.get_pages(test_pdf)
+    second = cache.get_pages(test_pdf)
+
+    assert first == second == extract_pdf_pages(test_pdf)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["bytes_held"] > 0
+
+    # A fresh cache over the same directory is served from disk
+    reloaded = PdfTextCache(cache_dir=str(tmp_path))
+    assert reloaded.get_pages(test_pdf) == first
+    assert reloaded.stats()["disk_hits"] == 1
+
+
+def test_pdf_text_cache_evicts_lru():
+    cache = PdfTextCache(max_bytes=10)
+    cache.put("a", ["12345"])
+    cache.put("b", ["12345"])
+    cache.get("a")
+    cache.put("c", ["12345"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ["12345"]
+    assert cache.stats()["bytes_held"] <= 10
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+import agent.pipeline as pipeline
+import agent.reasoning as reasoning
+import agent.runner as runner
+import agent.registry as registry_module
+from agent.metrics import track_usage
+from agent.registry import AgentRegistry
+from agent.templates import parser, PolicyComplianceResponse
+from agent.verdict_cache import verdict_cache, MemoryVerdictBackend
+from benchmarks.fakes import FakeComplianceChatModel
+
+
+POLICIES = [SimpleNamespace(payload={"text": "Data must be encrypted.", "metadata": {"policy_id": "SEC-1", "active": True}})]
+SIMILAR = [SimpleNamespace(payload={"text": "Supplier agreement 2023", "metadata": {}})]
+
+
+class RecordingChatModel(FakeComplianceChatModel):
+    """
+    Fake chat model that keeps the system prompt of every call.
+    """
+
+    prompts: List[str] = []
+
+    def _respond(self, messages):
+        self.prompts.append(messages[0].content)
+        return super()._respond(messages)
+
+
+@pytest.fixture(autouse=True)
+def fake_retrieval(monkeypatch):
+    async def afind(query):
+        return POLICIES
+
+    async def afind_similar(query):
+        return SIMILAR
+
+    monkeypatch.setattr(pipeline, "find_matching_policies", lambda query: POLICIES)
+    monkeypatch.setattr(pipeline, "find_similar_documents", lambda query: SIMILAR)
+    monkeypatch.setattr(pipeline, "afind_matching_policies", afind)
+    monkeypatch.setattr(pipeline, "afind_similar_documents", afind_similar)
+
+
+INPUTS = {"query": "Is customer data encrypted?", "chunk": "All data is encrypted at rest."}
+
+
+def check_output(result, llm, usage):
+    assert usage.llm_calls == 1 and len(llm.prompts) == 1
+    # Retrieved context is in the prompt, without internal payload fields
+    assert "1. Data must be encrypted. (policy_id=SEC-1)" in llm.prompts[0]
+    assert "1. Supplier agreement 2023" in llm.prompts[0]
+    assert "All data is encrypted at rest." in llm.prompts[0]
+
+    response = parser.parse(result["output"])
+    assert isinstance(response, PolicyComplianceResponse)
+    assert response.compliance_status in ("Compliant", "Non-Compliant")
+    assert response.reasoning == f"Synthetic verdict for: {INPUTS['query']}"
+
+
+def test_pipeline_invoke_makes_one_llm_call():
+    llm = RecordingChatModel(latency=0)
+
+    with track_usage() as usage:
+        result = pipeline.CompliancePipeline(llm).invoke(INPUTS)
+
+    check_output(result, llm, usage)
+
+
+def test_pipeline_ainvoke_makes_one_llm_call():
+    llm = RecordingChatModel(latency=0)
+
+    async def run():
+        with track_usage() as usage:
+            return await pipeline.CompliancePipeline(llm).ainvoke(INPUTS), usage
+
+    result, usage = asyncio.run(run())
+
+    check_output(result, llm, usage)
+
+
+def test_execution_mode_is_part_of_registry_and_verdict_cache_keys(monkeypatch, fixed_policy_version):
+    monkeypatch.setattr(reasoning, "get_llm", lambda llm_type, model_name: FakeComplianceChatModel(latency=0))
+    monkeypatch.setattr(registry_module, "EXECUTION_MODE", "agent")
+    registry = AgentRegistry()
+    monkeypatch.setattr(runner, "agent_registry", registry)
+    monkeypatch.setattr(verdict_cache, "backend", MemoryVerdictBackend(max_size=10))
+
+    pipeline_executor = registry.get("openai", "gpt-4o", "pipeline")
+    agent_executor = registry.get("openai", "gpt-4o")
+
+    assert isinstance(pipeline_executor, pipeline.CompliancePipeline)
+    assert agent_executor is not pipeline_executor
+    assert registry.get("openai", "gpt-4o", "pipeline") is pipeline_executor
+    assert registry.key_for(pipeline_executor) == ("openai", "gpt-4o", "pipeline")
+    assert [s["execution_mode"] for s in registry.stats()] == ["pipeline", "agent"]
+
+    pipeline_scope = runner.cache_scope(pipeline_executor, "hash", "select")
+    assert pipeline_scope == verdict_cache.scope_key("hash", "openai", "gpt-4o", "select", "pipeline")
+    assert pipeline_scope != runner.cache_scope(agent_executor, "hash", "select")
@@ -0,0 +1,41 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from src.replay import Cassette, CassetteMissError, RecordReplayChatModel, RecordReplayQdrantClient
+
+
+def test_llm_calls_replay_in_recorded_order(tmp_path):
+    path = str(tmp_path / "llm.jsonl")
+    recorder = RecordReplayChatModel(
+        inner=FakeListChatModel(responses=["first", "second"]),
+        cassette=Cassette(path, "record"),
+    )
+    question = [HumanMessage(content="Is the termination clause compliant?")]
+    assert recorder.invoke(question).content == "first"
+    assert recorder.invoke(question).content == "second"
+
+    # Replay needs no inner responses and serves the recorded answers in order
+    player = RecordReplayChatModel(inner=FakeListChatModel(responses=[]), cassette=Cassette(path, "replay"))
+    assert [player.invoke(question).content for _ in range(3)] == ["first", "second", "first"]
+
+    with pytest.raises(CassetteMissError):
+        player.invoke([HumanMessage(content="Never recorded")])
+
+
+def test_qdrant_search_replays_without_a_client(tmp_path):
+    path = str(tmp_path / "qdrant.jsonl")
+    client = QdrantClient(location=":memory:")
+    client.create_collection("policies", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert("policies", points=[PointStruct(id=1, vector=[1.0, 0.0], payload={"text": "Encrypt data"})])
+
+    recorder = RecordReplayQdrantClient(client, Cassette(path, "record"))
+    recorded = recorder.query_points("policies", query=[1.0, 0.1], limit=1).points
+
+    player = RecordReplayQdrantClient(None, Cassette(path, "replay"))
+    replayed = player.query_points("policies", query=[1.0, 0.1], limit=1).points
+
+    assert [p.payload for p in replayed] == [p.payload for p in recorded] == [{"text": "Encrypt data"}]
+    assert replayed[0].score == pytest.approx(recorded[0].score)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from qdrant_client.http import models as qmodels
+
+import agent.tools as tools
+from src.qdrant_pool import QdrantPool
+from src.embedding_cache import EmbeddingCache
+
+
+TOPICS = ["encrypt", "retention", "termination", "audit"]
+
+POLICIES = [
+    "Customer data must be encrypted at rest and encrypt backups.",
+    "Records retention is limited to seven years.",
+    "Either party may give notice of termination with 30 days notice.",
+    "Suppliers accept an annual audit of their controls.",
+    "Encryption keys are rotated; encrypt all transfers.",
+]
+
+
+class TopicModel:
+    """
+    Stand-in embedding model: one dimension per topic word, plus a small constant.
+    """
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.array([[t.lower().count(topic) + 0.1 for topic in TOPICS] for t in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def local_policies(monkeypatch):
+    model = TopicModel()
+    pool = QdrantPool(location=":memory:")
+    pool.client().create_collection(
+        collection_name="policies_v1",
+        vectors_config=qmodels.VectorParams(size=len(TOPICS), distance=qmodels.Distance.COSINE),
+    )
+    pool.client().upsert(
+        collection_name="policies_v1",
+        points=[
+            qmodels.PointStruct(id=i, vector=model.encode(text).tolist(), payload={"text": text})
+            for i, text in enumerate(POLICIES)
+        ],
+    )
+
+    monkeypatch.setattr(tools, "qdrant_pool", pool)
+    monkeypatch.setattr(tools, "policy_collection", "policies_v1")
+    monkeypatch.setattr(tools, "load_embedding_model", lambda: model)
+    # Keep the fake vectors out of the process-wide query embedding cache
+    monkeypatch.setattr(tools, "query_embedding_cache", EmbeddingCache(max_size=100, ttl=0))
+    return pool
+
+
+def hits(points):
+    return [(point.id, round(point.score, 5)) for point in points]
+
+
+QUERIES = ["How is data encrypted?", "What is the termination notice?", "Are audits allowed?"]
+
+
+def test_batch_search_matches_per_query_search(local_policies):
+    batched = tools.find_matching_policies_batch(QUERIES, top_k=2)
+
+    assert len(batched) == len(QUERIES)
+    for query, points in zip(QUERIES, batched):
+        assert hits(points) == hits(tools.find_matching_policies(query, top_k=2))
+
+    # Both encryption policies for the first query; the matching topic first for the others
+    assert {point.id for point in batched[0]} == {0, 4}
+    assert [points[0].id for points in batched[1:]] == [2, 3]
+    assert tools.find_matching_policies_batch([]) == []
+
+
+def test_matching_policy_tool_accepts_one_query_or_a_list(local_policies):
+    single = tools.matching_policy_tool.invoke({"queries": QUERIES[0], "top_k": 2})
+    assert hits(single) == hits(tools.find_matching_policies(QUERIES[0], top_k=2))
+
+    grouped = tools.matching_policy_tool.invoke({"queries": QUERIES, "top_k": 2})
+    assert list(grouped) == QUERIES
+    for query in QUERIES:
+        assert hits(grouped[query]) == hits(tools.find_matching_policies(query, top_k=2))
+
+    # The schema takes either form
+    assert tools.MatchingPolicyInput(queries="one").queries == "one"
+    assert tools.MatchingPolicyInput(queries=["one", "two"]).queries == ["one", "two"]